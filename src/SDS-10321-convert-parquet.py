@@ -1,6 +1,8 @@
+from base.startup import profile_startup
+profile_startup()
+
 import datetime
 from dateutil.tz import tzutc
-import awswrangler as wr
 import boto3
 import argparse
 import concurrent.futures
@@ -49,6 +51,9 @@ class ConvertParquet:
         return result
 
     def process_file(self, file_name):
+        # imported on first use, awswrangler pulls in pandas and pyarrow
+        import awswrangler as wr
+
         logger.info(f'Processing file {file_name}')
         try:
             parquet_file_name = f"s3://{self.config.bucket}/{file_name}"
@@ -1,3 +1,6 @@
+from base.startup import profile_startup
+profile_startup()
+
 import argparse
 from base.base_s3_split_by_date import s3_split_by_date_run, BaseS3SplitByDate, S3SplitByDateConfig, S3SplitByDateParams
 from base.logger import get_logger
@@ -17,12 +20,14 @@ if __name__ == '__main__':
     parser.add_argument('target_key')
     parser.add_argument('date_regexp')
     parser.add_argument('--dry-run', default=False, required=False, action='store_true')
+    parser.add_argument('--concurrency', default=1, required=False, type=int)
 
     args = parser.parse_args()
     logger.info(f'Starting s3_to_event with args: {args}')
 
     config = S3SplitByDateConfig(args.env)
-    params = S3SplitByDateParams(args.env, bool(args.dry_run), args.bucket, args.source_key, args.target_key, args.date_regexp)
+    params = S3SplitByDateParams(args.env, bool(args.dry_run), args.bucket, args.source_key, args.target_key, args.date_regexp,
+                                 move_concurrency=args.concurrency)
 
     s3_split_by_date_run(config, params, S3SplitByDate(config, params))
 
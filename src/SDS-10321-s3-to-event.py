@@ -1,3 +1,6 @@
+from base.startup import profile_startup
+profile_startup()
+
 import argparse
 from base.base_s3_to_event import BaseS3ToEvent, S3ToEventConfig, S3ToEventParams, s3_to_event_run
 from base.logger import get_logger
@@ -1,6 +1,10 @@
+from base.startup import profile_startup
+profile_startup()
+
 import argparse
-from base.base_s3_to_event import BaseS3ToEvent, S3ToEventConfig, S3ToEventParams, s3_to_event_run
+from base.base_s3_to_event import BaseS3ToEvent, LambdaRunner, S3ToEventConfig, S3ToEventParams, s3_to_event_run
 from base.logger import get_logger
+from base.s3_listing_index import S3ListingIndex
 
 logger = get_logger(__name__)
 
@@ -19,6 +23,11 @@ if __name__ == '__main__':
     parser.add_argument('error_prefix')
     parser.add_argument('limit')
     parser.add_argument('--dry_run', default=False, required=False, action='store_true')
+    parser.add_argument('--concurrency', default=1, required=False, type=int)
+    parser.add_argument('--fire_and_forget', default=False, required=False, action='store_true')
+    parser.add_argument('--resume', default=False, required=False, action='store_true')
+    parser.add_argument('--listing_index', default=False, required=False, action='store_true')
+    parser.add_argument('--listing_full_refresh_interval', default=S3ListingIndex.FULL_REFRESH_INTERVAL, required=False, type=int)
 
     args = parser.parse_args()
     logger.info(f'Starting s3_to_event with args: {args}')
@@ -32,7 +41,13 @@ if __name__ == '__main__':
         output_prefix=args.output_prefix,
         error_prefix=args.error_prefix,
         limit=int(args.limit),
+        lambda_concurrency=args.concurrency,
+        lambda_invocation_type=LambdaRunner.INVOCATION_TYPE_EVENT if args.fire_and_forget else LambdaRunner.INVOCATION_TYPE_REQUEST_RESPONSE,
     )
     logger.info(f'Config: {config}, Params: {params}')
 
-    s3_to_event_run(config, params, S3ToEvent(config, params), args.dry_run)
+    if args.listing_index:
+        with S3ListingIndex(config.listing_index_file_name, args.listing_full_refresh_interval) as listing_index:
+            s3_to_event_run(config, params, S3ToEvent(config, params, listing_index), args.dry_run, args.resume)
+    else:
+        s3_to_event_run(config, params, S3ToEvent(config, params), args.dry_run, args.resume)
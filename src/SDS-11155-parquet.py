@@ -1,5 +1,6 @@
-import awswrangler as awr
-import pyarrow.parquet as pq
+from base.startup import profile_startup
+profile_startup()
+
 import re
 from base.cfg import BaseConfig, BaseParams
 from base.logger import get_logger
@@ -50,6 +51,9 @@ class SchemaManager:
             return "".join(f[0])
 
     def get_file_data_types(self, file: str, date_str: str):
+        # imported on first use, awswrangler pulls in pandas and pyarrow
+        import awswrangler as awr
+
         logger.info(f"Reading types for {date_str}: {file}")
         parquet_columns_types, partitions_types = awr.s3.read_parquet_metadata(path=f's3://{self.params.bucket}/{file}', dataset=False)
         # pr = awr.s3.read_parquet(f"s3://{self.params.bucket}/{file}")
@@ -10,11 +10,16 @@ Parameters:
      query_execution_id: athena query execution id
 
 Output: SQL printed in console
+
+Usage example (from src):
+    python -m base.athena_query dev <query_execution_id>
 """
 
+from base.startup import profile_startup
+profile_startup()
 
 import argparse
-from cfg import BaseConfig
+from base.cfg import BaseConfig
 
 
 class AthenaQuery:
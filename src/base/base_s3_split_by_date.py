@@ -1,6 +1,11 @@
-from botocore.exceptions import ClientError
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import BotoCoreError, ClientError
 import datetime
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
 
 from base.cfg import BaseConfig, BaseParams
 from base.logger import get_logger
@@ -13,7 +18,8 @@ class S3SplitByDateConfig(BaseConfig):
 
 
 class S3SplitByDateParams(BaseParams):
-    def __init__(self, env: str, dry_run: bool, bucket: str, source_key: str, target_key: str, date_regexp: str, date_format: str = '%Y-%m-%d', date_shift: int=0):
+    def __init__(self, env: str, dry_run: bool, bucket: str, source_key: str, target_key: str, date_regexp: str, date_format: str = '%Y-%m-%d', date_shift: int=0,
+                 move_concurrency: int = 1):
         super().__init__(env, dry_run)
         self.bucket = bucket
         self.source_key = source_key
@@ -21,12 +27,31 @@ class S3SplitByDateParams(BaseParams):
         self.date_regexp = date_regexp
         self.date_format = date_format
         self.date_shift = date_shift
+        self.move_concurrency = move_concurrency
+
+
+@dataclass
+class MoveResult:
+    source_key: str
+    target_key: str
+    size: int
+    attempts: int
+    error: Optional[str]
+    duration: float
 
 
 class BaseS3SplitByDate:
+    # copy_object is limited to 5 GB, larger files are copied with multipart
+    MULTIPART_COPY_THRESHOLD = 1024 * 1024 * 1024
+    MAX_ATTEMPTS = 3
+    RETRY_BACKOFF = 0.5
+    DELETE_BATCH_SIZE = 1000
+    PARTITION_LISTING_LIMIT = 100
+
     def __init__(self, config: S3SplitByDateConfig, params: S3SplitByDateParams):
         self.config = config
         self.params = params
+        self._date_pattern = re.compile(params.date_regexp)
 
     def list_files(self) -> list:
         paginator = self.config.s3.get_paginator('list_objects_v2')
@@ -37,34 +62,72 @@ class BaseS3SplitByDate:
             result.extend([p for p in page['Contents'] if p['Size'] > 0])
         return result
 
-    def file_exists(self, bucket: str, file_name: str) -> bool:
-        try:
-            _ = self.config.s3.head_object(Bucket=bucket, Key=file_name)
-            return True
-        except ClientError:
-            return False
+    def list_keys(self, bucket: str, prefix: str) -> list:
+        paginator = self.config.s3.get_paginator('list_objects_v2')
 
-    def get_mapping(self, files: list) -> list:
         result = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            if page.get('Contents') is not None:
+                result.extend([f['Key'] for f in page['Contents']])
+        return result
+
+    def get_existing_keys(self, bucket: str, partitions: set) -> set:
+        """
+        Lists the partitions the mapping touches, or the whole target prefix if there are too many of them
+        """
+        partitions = sorted(partitions)
+        prefixes = partitions if len(partitions) <= BaseS3SplitByDate.PARTITION_LISTING_LIMIT else [self.params.target_key + '/']
+        logger.info(f"Listing {len(prefixes)} target prefixes for {len(partitions)} partitions")
+
+        result = set()
+        for prefix in prefixes:
+            result.update(self.list_keys(bucket, prefix))
+        return result
+
+    def get_partition_path(self, date_token: str) -> str:
+        logger.debug(f"Converting {date_token} to date with format {self.params.date_format}")
+        date = datetime.datetime.strptime(date_token, self.params.date_format)
+        if self.params.date_shift != 0:
+            date = date + datetime.timedelta(days=self.params.date_shift)
+        return f"{self.params.target_key}/year={date.year}/month={date.month:02d}/day={date.day:02d}/"
+
+    def get_mapping(self, files: list) -> list:
+        # date is parsed once per distinct date token
+        search = self._date_pattern.search
+        partition_paths = {}
+        candidates = []
         for file in files:
             file_path = file['Key']
-            file_name = file_path.split('/')[-1]
-            logger.debug(f"Processing file {file_name}")
-            match = re.search(self.params.date_regexp, file_name)
+            file_name = file_path.rpartition('/')[2]
+            match = search(file_name)
             if match is not None:
-                logger.debug(f"Converting {match.group(0)} to date with format {self.params.date_format}")
-                date = datetime.datetime.strptime(match.group(0), self.params.date_format)
-                if self.params.date_shift != 0:
-                    date = date + datetime.timedelta(days=self.params.date_shift)
-                target_file_path = f"{self.params.target_key}/year={date.year}/month={date.month:02d}/day={date.day:02d}/{file_name}"
-                if not self.file_exists(self.params.bucket.format(self.config.env), target_file_path):
-                    result.append((file_path, target_file_path))
-                else:
-                    logger.info(f"File already exists: {target_file_path}")
-            pass
+                date_token = match[0]
+                partition_path = partition_paths.get(date_token)
+                if partition_path is None:
+                    partition_path = partition_paths[date_token] = self.get_partition_path(date_token)
+                candidates.append((file_path, partition_path + file_name))
+
+        existing_keys = self.get_existing_keys(self.params.bucket.format(self.config.env), set(partition_paths.values()))
+        if len(existing_keys) == 0:
+            return candidates
+
+        result = []
+        for file_path, target_file_path in candidates:
+            if target_file_path not in existing_keys:
+                result.append((file_path, target_file_path))
+            else:
+                logger.info(f"File already exists: {target_file_path}")
 
         return result
 
+    def copy_file(self, s3, bucket: str, source_key: str, target_key: str, size: int) -> None:
+        copy_source = {'Bucket': bucket, 'Key': source_key}
+        if size < BaseS3SplitByDate.MULTIPART_COPY_THRESHOLD:
+            s3.copy_object(CopySource=copy_source, Bucket=bucket, Key=target_key)
+        else:
+            # managed transfer uses multipart copy
+            s3.copy(copy_source, bucket, target_key)
+
     def move_file(self, source_key: str, target_key: str):
         copy_source = {
             'Bucket': self.params.bucket.format(self.config.env),
@@ -73,6 +136,58 @@ class BaseS3SplitByDate:
         self.config.s3.copy(copy_source, copy_source['Bucket'], target_key)
         self.config.s3.delete_object(Bucket=copy_source['Bucket'], Key=source_key)
 
+    def _copy_with_retries(self, s3, bucket: str, source_key: str, target_key: str, size: int) -> MoveResult:
+        start_time = time.time()
+        error = None
+        attempt = 0
+        for attempt in range(1, BaseS3SplitByDate.MAX_ATTEMPTS + 1):
+            try:
+                self.copy_file(s3, bucket, source_key, target_key, size)
+                error = None
+                break
+            except (ClientError, BotoCoreError, S3UploadFailedError) as e:
+                # failures are recorded per file, the move of the other files continues
+                error = str(e)
+                logger.warning(f"Copy {source_key} to {target_key} failed, attempt {attempt}: {e}")
+                if attempt < BaseS3SplitByDate.MAX_ATTEMPTS:
+                    time.sleep(BaseS3SplitByDate.RETRY_BACKOFF * 2 ** (attempt - 1))
+        return MoveResult(source_key, target_key, size, attempt, error, time.time() - start_time)
+
+    def move_files(self, mapping: list, sizes: dict) -> list[MoveResult]:
+        """
+        Copies files server-side in a worker pool, then deletes copied sources in batches
+        """
+        bucket = self.params.bucket.format(self.config.env)
+        s3 = self.config.s3
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=max(self.params.move_concurrency, 1)) as executor:
+            results = list(executor.map(
+                lambda m: self._copy_with_retries(s3, bucket, m[0], m[1], sizes.get(m[0], 0)), mapping))
+
+        results_by_key = {r.source_key: r for r in results}
+        copied_keys = [r.source_key for r in results if r.error is None]
+        for i in range(0, len(copied_keys), BaseS3SplitByDate.DELETE_BATCH_SIZE):
+            batch = copied_keys[i:i + BaseS3SplitByDate.DELETE_BATCH_SIZE]
+            response = s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': k} for k in batch], 'Quiet': True})
+            for e in response.get('Errors', []):
+                logger.error(f"Delete {e['Key']} failed: {e.get('Message')}")
+                results_by_key[e['Key']].error = f"Delete failed: {e.get('Message')}"
+        end_time = time.time()
+
+        logger.info(BaseS3SplitByDate.summarize(results, end_time - start_time))
+        return results
+
+    @staticmethod
+    def summarize(results: list[MoveResult], elapsed: float) -> str:
+        errors = [r for r in results if r.error is not None]
+        retried = [r for r in results if r.attempts > 1]
+        moved_bytes = sum([r.size for r in results if r.error is None])
+        return (f"Move summary: {len(results) - len(errors)} of {len(results)} files in {elapsed:.2f} seconds "
+                f"({(len(results) - len(errors)) / elapsed if elapsed > 0 else 0:.2f} objects/s, "
+                f"{moved_bytes / elapsed if elapsed > 0 else 0:.0f} bytes/s), "
+                f"retried: {len(retried)}, errors: {len(errors)} {[e.source_key for e in errors]}")
+
     def execute(self):
         source_files = self.list_files()
         logger.info(f'Found {len(source_files)} source files')
@@ -93,10 +208,9 @@ def s3_split_by_date_run(config: S3SplitByDateConfig, params: S3SplitByDateParam
     mapping = split_by_date.get_mapping(source_files)
     logger.info(f'Files to move: {len(mapping)}')
 
-    for source_key, target_key in mapping:
-        logger.info(f'Moving {source_key} to {target_key}')
-        if params.dry_run:
-            logger.info(f'Move skipped (dry-run)')
-        else:
-            split_by_date.move_file(source_key, target_key)
-            logger.info(f'Moving completed')
+    if params.dry_run:
+        for source_key, target_key in mapping:
+            logger.info(f'Moving {source_key} to {target_key} skipped (dry-run)')
+    else:
+        sizes = {f['Key']: f['Size'] for f in source_files}
+        split_by_date.move_files(mapping, sizes)
@@ -2,8 +2,14 @@ import os
 import json
 import time
 from abc import ABC
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+from botocore.exceptions import BotoCoreError, ClientError
 from base.cfg import BaseConfig, BaseParams
 from base.logger import get_logger
+from base.s3_listing_index import S3ListingIndex
 
 logger = get_logger(__name__)
 
@@ -11,15 +17,21 @@ logger = get_logger(__name__)
 class S3ToEventConfig(BaseConfig):
     def __init__(self, env):
         super().__init__(env)
-        self._lambda = self.session.client('lambda', region_name=S3ToEventConfig.REGION)
+        self._lambda = self._services['lambda']
 
     @property
     def lam(self):
         return self._lambda
 
+    @property
+    def listing_index_file_name(self):
+        return os.path.join(self.data_path, S3ListingIndex.DB_FILE_NAME)
+
 
 class S3ToEventParams(BaseParams):
-    def __init__(self, env: str, input_bucket: str, input_prefix: str, output_bucket: [str, None], output_prefix: str, error_prefix: [str, None], limit: int):
+    def __init__(self, env: str, input_bucket: str, input_prefix: str, output_bucket: [str, None], output_prefix: str, error_prefix: [str, None], limit: int,
+                 lambda_concurrency: int = 1, lambda_invocation_type: str = 'RequestResponse',
+                 in_flight_limit: [int, None] = None, completion_deadline: int = 900):
         super().__init__(env)
         self._input_bucket = input_bucket
         self._input_prefix = input_prefix
@@ -27,6 +39,10 @@ class S3ToEventParams(BaseParams):
         self._output_prefix = output_prefix
         self._error_prefix = error_prefix
         self._limit = limit
+        self._lambda_concurrency = lambda_concurrency
+        self._lambda_invocation_type = lambda_invocation_type
+        self._in_flight_limit = in_flight_limit
+        self._completion_deadline = completion_deadline
 
     @property
     def input_bucket(self):
@@ -52,16 +68,36 @@ class S3ToEventParams(BaseParams):
     def limit(self):
         return self._limit
 
+    @property
+    def lambda_concurrency(self):
+        return self._lambda_concurrency
+
+    @property
+    def lambda_invocation_type(self):
+        return self._lambda_invocation_type
+
+    @property
+    def in_flight_limit(self):
+        return self._limit if self._in_flight_limit is None else self._in_flight_limit
+
+    @property
+    def completion_deadline(self):
+        return self._completion_deadline
+
 
 class BaseS3ToEvent(ABC):
-    def __init__(self, config: S3ToEventConfig, params: S3ToEventParams):
+    def __init__(self, config: S3ToEventConfig, params: S3ToEventParams, listing_index: [S3ListingIndex, None] = None):
         self.config = config
         self.params = params
+        self.listing_index = listing_index
 
     def get_excluded_files(self) -> list:
         return []
 
     def list_files(self) -> list:
+        if self.listing_index is not None:
+            return [p for p in self.list_indexed_objects(self.params.input_bucket, self.params.input_prefix) if p['Size'] > 0]
+
         paginator = self.config.s3.get_paginator('list_objects_v2')
         operation_parameters = {'Bucket': self.params.input_bucket, 'Prefix': self.params.input_prefix}
 
@@ -74,6 +110,16 @@ class BaseS3ToEvent(ABC):
             )
         return result
 
+    def list_indexed_objects(self, bucket_name: str, file_prefix: str) -> list:
+        self.listing_index.refresh(self.config.s3, bucket_name, file_prefix)
+        return self.listing_index.list_objects(bucket_name, file_prefix)
+
+    def list_output_file_names(self, bucket_name: str, file_prefix: str) -> list:
+        if self.listing_index is not None:
+            return [f['Key'] for f in self.list_indexed_objects(bucket_name, file_prefix)]
+        else:
+            return BaseS3ToEvent.list_bucket_file_names(self.config.s3, bucket_name, file_prefix)
+
     @staticmethod
     def list_bucket_file_names(s3, bucket_name: str, file_prefix: str) -> list:
         result = []
@@ -103,115 +149,349 @@ class BaseS3ToEvent(ABC):
     @staticmethod
     def extract_file_name(key: str) -> str:
         # return str(key.split('.')[0]).split('/')[-1]
-        return key.split('/')[-1].split('_timestamp')[0]
+        return key.rpartition('/')[2].partition('_timestamp')[0]
 
     def get_files_to_process(self) -> list:
         files = self.list_files()
         logger.info(f"Collected {len(files)} input files")
 
-        raw_output_files = BaseS3ToEvent.list_bucket_file_names(self.config.s3, self.params.output_bucket, self.params.output_prefix)
-        output_files = set([BaseS3ToEvent.extract_file_name(f) for f in raw_output_files])
-        logger.info(f"Collected {len(output_files)} output files")
-
-        raw_error_files = BaseS3ToEvent.list_bucket_file_names(self.config.s3, self.params.input_bucket, self.params.error_prefix)
-        error_files = set([BaseS3ToEvent.extract_file_name(f) for f in raw_error_files])
-        logger.info(f"Collected {len(error_files)} error files")
+        raw_output_files = self.list_output_file_names(self.params.output_bucket, self.params.output_prefix)
+        raw_error_files = self.list_output_file_names(self.params.input_bucket, self.params.error_prefix) \
+            if self.params.error_prefix is not None else []
 
-        # get all files which are not in the output files, if error files are specified, use then also as filter
-        process_files = [f for f in files if BaseS3ToEvent.extract_file_name(f['Key']) not in output_files]
-        if len(error_files) > 0:
-            process_files = [f for f in process_files if BaseS3ToEvent.extract_file_name(f['Key']) in error_files]
-        logger.info(f"Files to process: {len(process_files)}")
+        reconciliation = reconcile_files(files, raw_output_files, raw_error_files, self.get_excluded_files())
+        logger.info(f"Reconciliation: {reconciliation}")
 
-        filtered_files = [p for p in process_files if p['Key'] not in self.get_excluded_files()]
-        logger.info(f"Filtered files to process: {len(filtered_files)}")
+        return reconciliation.pending
 
-        return filtered_files
-
-    def transform_to_event(self, ls: list) -> dict:
+    def transform_to_record(self, list_item: dict) -> dict:
         return {
-            'Records': [{
-                'body': json.dumps({
-                    'Records': [
-                        {'s3': {'bucket': {'name': self.params.input_bucket}, 'object': {'key': list_item['Key'], 'size': list_item['Size']}}}
-                        ]
-                })
-            } for list_item in ls]
+            'body': json.dumps({
+                'Records': [
+                    {'s3': {'bucket': {'name': self.params.input_bucket}, 'object': {'key': list_item['Key'], 'size': list_item['Size']}}}
+                    ]
+            })
         }
 
+    def transform_to_event(self, ls: list) -> dict:
+        return {'Records': [self.transform_to_record(list_item) for list_item in ls]}
+
+
+@dataclass
+class FileReconciliation:
+    pending: list
+    done: list
+    errored: list
+    excluded: list
+
+    def __repr__(self):
+        return (f"(pending: {len(self.pending)}, done: {len(self.done)}, "
+                f"errored: {len(self.errored)}, excluded: {len(self.excluded)})")
+
+
+def reconcile_files(files: list, output_keys: list, error_keys: list, excluded_keys: list) -> FileReconciliation:
+    """
+    Joins input files with output and error listings by file name, each key is normalised once.
+    Files without output are pending, if error files exist only files with an error file are pending
+    """
+    extract_file_name = BaseS3ToEvent.extract_file_name
+    output_names = frozenset(map(extract_file_name, output_keys))
+    error_names = frozenset(map(extract_file_name, error_keys))
+    excluded = frozenset(excluded_keys)
+
+    result = FileReconciliation([], [], [], [])
+    for f in files:
+        key = f['Key']
+        name = extract_file_name(key)
+        if name in output_names:
+            result.done.append(f)
+            continue
+
+        has_error = name in error_names
+        if has_error:
+            result.errored.append(f)
+        if error_names and not has_error:
+            continue
+
+        if key in excluded:
+            result.excluded.append(f)
+        else:
+            result.pending.append(f)
+
+    return result
+
+
+@dataclass
+class LambdaInvocationResult:
+    key: str
+    status_code: Optional[int]
+    function_error: Optional[str]
+    payload: Optional[str]
+    duration: float
+
 
 class LambdaRunner:
     LAMBDA_FUNCTION_NAME = 'sds-{}-ingestion-ingest-file-ingestion'
+    INVOCATION_TYPE_REQUEST_RESPONSE = 'RequestResponse'
+    INVOCATION_TYPE_EVENT = 'Event'
 
-    def __init__(self, config: S3ToEventConfig, config_file_name: str) -> None:
+    def __init__(self, config: S3ToEventConfig, spool_file_name: str,
+                 concurrency: int = 1, invocation_type: str = INVOCATION_TYPE_REQUEST_RESPONSE, resume: bool = False) -> None:
         self.config = config
-        with open(config_file_name, 'r') as f:
-            self.events = json.loads(f.read())
+        self.spool_file_name = spool_file_name
+        self.checkpoint_file_name = get_checkpoint_file_name(spool_file_name)
+        self.concurrency = concurrency
+        self.invocation_type = invocation_type
+        self.start_offset = read_checkpoint(self.checkpoint_file_name) if resume else 0
+
+    def read_records(self) -> Iterator[tuple[int, dict]]:
+        """
+        Reads event spool lazily from the start offset, yields records with the offset of the next record
+        """
+        with open(self.spool_file_name, 'rb') as f:
+            f.seek(self.start_offset)
+            offset = self.start_offset
+            for line in f:
+                offset += len(line)
+                if line.strip():
+                    yield offset, json.loads(line)
+
+    @staticmethod
+    def get_record_key(record: dict) -> str:
+        return json.loads(record['body'])['Records'][0]['s3']['object']['key']
+
+    def invoke(self, record: dict) -> LambdaInvocationResult:
+        event_record = {'Records': [record]}
+        key = LambdaRunner.get_record_key(record)
 
-    def run(self):
-        for record in self.events['Records']:
-            event_record = {'Records': [record]}
+        start_time = time.time()
+        try:
             response = self.config.lam.invoke(
                 FunctionName=LambdaRunner.LAMBDA_FUNCTION_NAME.format(self.config.env),
+                InvocationType=self.invocation_type,
                 Payload=json.dumps(event_record).encode('utf-8'),
                 Qualifier='$LATEST'
             )
-            logger.info(f"Lambda run response: {str(response)}")
+        except (ClientError, BotoCoreError) as e:
+            # connection errors and timeouts fail this record only, the other invocations continue
+            logger.error(f"Lambda run error for {key}: {e}")
+            return LambdaInvocationResult(key, None, str(e), None, time.time() - start_time)
+        end_time = time.time()
+        logger.info(f"Lambda run response: {str(response)}")
+
+        function_error = response.get('FunctionError')
+        payload = response['Payload'].read().decode('utf-8') \
+            if function_error is not None and response.get('Payload') is not None else None
+        if function_error is not None:
+            logger.error(f"Lambda function error for {key}: {function_error}, payload: {payload}")
+
+        return LambdaInvocationResult(key, response.get('StatusCode'), function_error, payload, end_time - start_time)
+
+    def run(self) -> list[LambdaInvocationResult]:
+        logger.info(f"Invoking lambda for {self.spool_file_name} from offset {self.start_offset}, "
+                    f"concurrency: {self.concurrency}, invocation type: {self.invocation_type}")
+
+        results = []
+        start_time = time.time()
+        if self.concurrency > 1:
+            # records are submitted in a bounded window to keep memory flat, checkpoint follows completion order
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = deque()
+                for offset, record in self.read_records():
+                    futures.append((offset, executor.submit(self.invoke, record)))
+                    if len(futures) >= self.concurrency * 2:
+                        self._complete(futures.popleft(), results)
+                while len(futures) > 0:
+                    self._complete(futures.popleft(), results)
+        else:
+            for offset, record in self.read_records():
+                results.append(self.invoke(record))
+                write_checkpoint(self.checkpoint_file_name, offset)
+        end_time = time.time()
 
+        logger.info(LambdaRunner.summarize(results, end_time - start_time))
+        return results
 
-def s3_to_event_run(config: S3ToEventConfig, params: S3ToEventParams, s3_to_event: BaseS3ToEvent,
-                    dry_run=False) -> None:
-    logger.info(f"App config: {repr(config)}")
+    def _complete(self, offset_future: tuple[int, Future], results: list[LambdaInvocationResult]) -> None:
+        offset, future = offset_future
+        results.append(future.result())
+        write_checkpoint(self.checkpoint_file_name, offset)
 
-    files_to_process = s3_to_event.get_files_to_process()
+    @staticmethod
+    def summarize(results: list[LambdaInvocationResult], elapsed: float) -> str:
+        if len(results) == 0:
+            return "Lambda run summary: no records"
+
+        status_codes = {}
+        for r in results:
+            status_codes[r.status_code] = status_codes.get(r.status_code, 0) + 1
+        errors = [r for r in results if r.function_error is not None]
+        durations = sorted([r.duration for r in results])
+        p95_duration = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+
+        return (f"Lambda run summary: {len(results)} records in {elapsed:.2f} seconds "
+                f"({len(results) / elapsed if elapsed > 0 else 0:.2f} records/s), "
+                f"status codes: {status_codes}, errors: {len(errors)} {[e.key for e in errors]}, "
+                f"latency avg: {sum(durations) / len(durations):.2f}, p95: {p95_duration:.2f}, max: {durations[-1]:.2f} seconds")
+
+
+class CompletionTracker:
+    """
+    Tracks dispatched input files until their output file appears.
+    Lambda function errors are failed immediately, files without output after the deadline are reported as stragglers
+    """
+    INITIAL_DELAY = 1.0
+    MAX_DELAY = 30.0
+
+    def __init__(self, s3_to_event: BaseS3ToEvent, deadline: float):
+        self.s3_to_event = s3_to_event
+        self.deadline = deadline
+        self.in_flight = {}
+        self.completed = []
+        self.failed = []
+        self.stragglers = []
+        self._delay = CompletionTracker.INITIAL_DELAY
+
+    def add(self, files: list, results: list[LambdaInvocationResult]) -> None:
+        failed_keys = {r.key for r in results if r.function_error is not None or r.status_code is None}
+        dispatched_at = time.time()
+        for f in files:
+            if f['Key'] in failed_keys:
+                self.failed.append(f['Key'])
+            else:
+                self.in_flight[BaseS3ToEvent.extract_file_name(f['Key'])] = (f['Key'], dispatched_at)
+
+    def check(self) -> int:
+        """
+        Matches in-flight files with the output listing by file name, outputs may sit in partitions below the output prefix
+        """
+        params = self.s3_to_event.params
+        output_files = set([BaseS3ToEvent.extract_file_name(f)
+                            for f in self.s3_to_event.list_output_file_names(params.output_bucket, params.output_prefix)])
+
+        done_names = [n for n in self.in_flight if n in output_files]
+        for n in done_names:
+            self.completed.append(self.in_flight.pop(n)[0])
+
+        now = time.time()
+        expired_names = [n for n, (_, dispatched_at) in self.in_flight.items() if now - dispatched_at > self.deadline]
+        for n in expired_names:
+            key = self.in_flight.pop(n)[0]
+            logger.warning(f"No output for {key} after {self.deadline} seconds")
+            self.stragglers.append(key)
+
+        return len(done_names)
+
+    def wait(self) -> None:
+        logger.info(f"In flight: {len(self.in_flight)}, sleeping {self._delay:.0f} seconds ...")
+        time.sleep(self._delay)
+        if self.check() > 0:
+            self._delay = CompletionTracker.INITIAL_DELAY
+        else:
+            self._delay = min(self._delay * 2, CompletionTracker.MAX_DELAY)
 
-    if len(files_to_process) == 0:
-        logger.info(f"No files to process")
-    else:
-        event = s3_to_event.transform_to_event(files_to_process[:params.limit])
-        logger.info(f"Generated event")
+    def __repr__(self):
+        return (f"(completed: {len(self.completed)}, in flight: {len(self.in_flight)}, "
+                f"failed: {len(self.failed)}, stragglers: {len(self.stragglers)})")
 
-        event_file_name = os.path.join(config.data_path, f's3_event_{config.env}.json')
-        with open(event_file_name, 'w') as f:
-            f.write(json.dumps(event))
-        logger.info(f"Event saved to {event_file_name}")
 
-        if dry_run:
-            logger.info(f"Dry run, skipping actions")
-        else:
-            lr = LambdaRunner(config, event_file_name)
-            lr.run()
+def get_spool_file_name(config: S3ToEventConfig) -> str:
+    return os.path.join(config.data_path, f's3_event_{config.env}.jsonl')
 
 
-def s3_to_event_run_automated(config: S3ToEventConfig, params: S3ToEventParams, s3_to_event: BaseS3ToEvent,
-                              dry_run=False) -> None:
-    logger.info(f"App config: {repr(config)}")
+def get_checkpoint_file_name(spool_file_name: str) -> str:
+    return f'{spool_file_name}.checkpoint'
 
-    files_to_process = s3_to_event.get_files_to_process()
 
-    while len(files_to_process) > 0:
-        event = s3_to_event.transform_to_event(files_to_process[:params.limit])
-        logger.info(f"Generated event")
+def read_checkpoint(checkpoint_file_name: str) -> int:
+    if not os.path.exists(checkpoint_file_name):
+        return 0
+    with open(checkpoint_file_name, 'r') as f:
+        return int(f.read() or 0)
+
+
+def write_checkpoint(checkpoint_file_name: str, offset: int) -> None:
+    with open(checkpoint_file_name, 'w') as f:
+        f.write(str(offset))
+
+
+def write_event_spool(config: S3ToEventConfig, records: Iterable[dict]) -> str:
+    """
+    Writes event records as JSON lines one by one, previous checkpoint is reset
+    """
+    spool_file_name = get_spool_file_name(config)
+    num_records = 0
+    with open(spool_file_name, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
+            num_records += 1
+    write_checkpoint(get_checkpoint_file_name(spool_file_name), 0)
+    logger.info(f"Event spool with {num_records} records saved to {spool_file_name}")
+
+    return spool_file_name
 
-        event_file_name = os.path.join(config.data_path, f's3_event_{config.env}.json')
-        with open(event_file_name, 'w') as f:
-            f.write(json.dumps(event))
-        logger.info(f"Event saved to {event_file_name}")
 
-        if dry_run:
-            logger.info(f"Dry run, skipping actions")
+def s3_to_event_run(config: S3ToEventConfig, params: S3ToEventParams, s3_to_event: BaseS3ToEvent,
+                    dry_run=False, resume=False) -> None:
+    logger.info(f"App config: {repr(config)}")
+
+    spool_file_name = get_spool_file_name(config)
+    if resume and os.path.exists(spool_file_name):
+        logger.info(f"Resuming from {spool_file_name}")
+    else:
+        resume = False
+        files_to_process = s3_to_event.get_files_to_process()
+
+        if len(files_to_process) == 0:
+            logger.info(f"No files to process")
             return
-        else:
-            num_last_files_to_process = len(files_to_process)
 
-            lr = LambdaRunner(config, event_file_name)
-            lr.run()
+        spool_file_name = write_event_spool(config, map(s3_to_event.transform_to_record, files_to_process[:params.limit]))
+
+    if dry_run:
+        logger.info(f"Dry run, skipping actions")
+    else:
+        lr = LambdaRunner(config, spool_file_name, params.lambda_concurrency, params.lambda_invocation_type, resume)
+        lr.run()
+
 
-            while len(files_to_process) > 0:
-                logger.info(f"Files to process: {len(files_to_process)}, sleeping ...")
-                time.sleep(10)
+def s3_to_event_run_automated(config: S3ToEventConfig, params: S3ToEventParams, s3_to_event: BaseS3ToEvent,
+                              dry_run=False) -> None:
+    logger.info(f"App config: {repr(config)}")
+
+    files_to_process = s3_to_event.get_files_to_process()
 
-                files_to_process = s3_to_event.get_files_to_process()
-                if len(files_to_process) == num_last_files_to_process - params.limit:
-                    logger.info(f"Files to process: {len(files_to_process)}, waking up")
-                    break
+    if dry_run:
+        if len(files_to_process) > 0:
+            write_event_spool(config, map(s3_to_event.transform_to_record, files_to_process[:params.limit]))
+        logger.info(f"Dry run, skipping actions")
+        return
+
+    tracker = CompletionTracker(s3_to_event, params.completion_deadline)
+    dispatched_keys = set()
+    pending = deque(files_to_process)
+
+    while len(pending) > 0 or len(tracker.in_flight) > 0:
+        # dispatch as soon as the in-flight window has room
+        room = min(params.in_flight_limit - len(tracker.in_flight), params.limit, len(pending))
+        if room > 0:
+            batch = [pending.popleft() for _ in range(room)]
+            spool_file_name = write_event_spool(config, map(s3_to_event.transform_to_record, batch))
+
+            lr = LambdaRunner(config, spool_file_name, params.lambda_concurrency, params.lambda_invocation_type)
+            tracker.add(batch, lr.run())
+            dispatched_keys.update([f['Key'] for f in batch])
+            logger.info(f"Dispatched {len(batch)} files, pending: {len(pending)}, tracker: {tracker}")
+        elif len(tracker.in_flight) > 0:
+            tracker.wait()
+
+        if len(pending) == 0 and len(tracker.in_flight) == 0:
+            # pick up files arrived in the meantime, files already dispatched are not retried
+            pending.extend([f for f in s3_to_event.get_files_to_process() if f['Key'] not in dispatched_keys])
+
+    logger.info(f"Completed: {tracker}")
+    if len(tracker.failed) > 0:
+        logger.error(f"Failed files: {tracker.failed}")
+    if len(tracker.stragglers) > 0:
+        logger.error(f"Files without output: {tracker.stragglers}")
@@ -1,26 +1,83 @@
 import os
+import threading
 import boto3
+import botocore.session
 from abc import ABC
+from botocore.config import Config
+from botocore.credentials import CredentialProvider, Credentials, create_credential_resolver
 from collections import UserDict
+from base.startup import check_credentials_expiration, get_credentials_expiration, read_credentials_file
+
+
+class CachedCredentialProvider(CredentialProvider):
+    """
+    Serves the expiring keys written by saml2aws/sso2aws from the credentials file parsed once per process,
+    ahead of the default provider chain. Profiles without expiration are left to the default chain
+    """
+    METHOD = 'cached-shared-credentials-file'
+    CANONICAL_NAME = 'CachedSharedCredentials'
+
+    def __init__(self, profile_name: str, credentials_file_name: str = None):
+        super().__init__()
+        self.profile_name = profile_name
+        self.credentials_file_name = credentials_file_name
+
+    def load(self):
+        if get_credentials_expiration(self.profile_name, self.credentials_file_name) is None:
+            return None
+        check_credentials_expiration(self.profile_name, self.credentials_file_name)
+
+        profile = read_credentials_file(self.credentials_file_name)[self.profile_name]
+        return Credentials(profile['aws_access_key_id'], profile['aws_secret_access_key'], profile.get('aws_session_token'),
+                           method=CachedCredentialProvider.METHOD)
+
+
+def get_cached_session(profile_name: str, region_name: str) -> boto3.session.Session:
+    """
+    Profile session resolving credentials with CachedCredentialProvider first, settings of the profile in ~/.aws/config still apply
+    """
+    session = botocore.session.Session(profile=profile_name)
+
+    def create_resolver():
+        resolver = create_credential_resolver(session, region_name=region_name)
+        resolver.providers.insert(0, CachedCredentialProvider(profile_name))
+        return resolver
+    session.lazy_register_component('credential_provider', create_resolver)
+
+    return boto3.session.Session(botocore_session=session, region_name=region_name)
 
 class ServiceDict(UserDict):
-    def __init__(self, session):
+    """
+    Clients are created on first access and shared by all threads, boto3 clients are thread safe
+    """
+    def __init__(self, session, client_config: Config = None):
         super().__init__()
         self.session = session
+        self.client_config = client_config
+        self._lock = threading.Lock()
 
     def __missing__(self, key):
-        return self.session.client(key)
+        # session is not thread safe, creation is serialised
+        with self._lock:
+            if key not in self.data:
+                self.data[key] = self.session.client(key, config=self.client_config)
+            return self.data[key]
 
 
 class BaseConfig(ABC):
     REGION = 'eu-west-1'
+    MAX_POOL_CONNECTIONS = 50
 
-    def __init__(self, env):
+    def __init__(self, env, max_pool_connections: int = MAX_POOL_CONNECTIONS):
         self.env = env
-        self.session = boto3.session.Session(profile_name=env, region_name=BaseConfig.REGION)
+        check_credentials_expiration(env)
+        self.session = get_cached_session(env, BaseConfig.REGION)
         self._data_path = os.path.join(os.path.dirname(__file__), "../../data/")
 
-        self._services = ServiceDict(self.session)
+        self._services = ServiceDict(self.session, Config(
+            max_pool_connections=max_pool_connections,
+            retries={'mode': 'adaptive', 'max_attempts': 10}
+        ))
 
     def __repr__(self):
         return f"(env: {self.env}, data_path: {self._data_path} ({os.path.abspath(self.data_path)}))"
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import datetime
+
+from base.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class S3ListingIndex:
+    """
+    Local SQLite copy of S3 prefix listings.
+    Incremental refresh lists from the folder of the last seen key (StartAfter), so keys added to the latest
+    partition in any order are picked up. Objects added with a lower key elsewhere and deleted objects are
+    picked up by the full refresh, which runs once the last one is older than full_refresh_interval seconds
+    """
+    DB_FILE_NAME = 's3_listing_index.db'
+    FULL_REFRESH_INTERVAL = 600
+
+    def __init__(self, db_file_name: str, full_refresh_interval: float = FULL_REFRESH_INTERVAL):
+        self.db_file_name = db_file_name
+        self.full_refresh_interval = full_refresh_interval
+        db_folder = os.path.dirname(os.path.abspath(db_file_name))
+        if not os.path.exists(db_folder):
+            os.makedirs(db_folder)
+
+        self._connection = sqlite3.connect(db_file_name)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS s3_objects (
+                bucket TEXT NOT NULL,
+                prefix TEXT NOT NULL,
+                key TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                PRIMARY KEY (bucket, prefix, key)
+            );
+            CREATE TABLE IF NOT EXISTS s3_prefixes (
+                bucket TEXT NOT NULL,
+                prefix TEXT NOT NULL,
+                last_key TEXT,
+                refreshed_at TEXT,
+                full_refreshed_at TEXT,
+                PRIMARY KEY (bucket, prefix)
+            );
+        ''')
+        columns = [r[1] for r in self._connection.execute('PRAGMA table_info(s3_prefixes)')]
+        if 'full_refreshed_at' not in columns:
+            with self._connection:
+                self._connection.execute('ALTER TABLE s3_prefixes ADD COLUMN full_refreshed_at TEXT')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def get_last_key(self, bucket: str, prefix: str) -> [str, None]:
+        row = self._connection.execute(
+            'SELECT last_key FROM s3_prefixes WHERE bucket = ? AND prefix = ?', (bucket, prefix)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def clear(self, bucket: str, prefix: str) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM s3_objects WHERE bucket = ? AND prefix = ?', (bucket, prefix))
+            self._connection.execute('DELETE FROM s3_prefixes WHERE bucket = ? AND prefix = ?', (bucket, prefix))
+
+    def get_full_refreshed_at(self, bucket: str, prefix: str) -> [datetime.datetime, None]:
+        row = self._connection.execute(
+            'SELECT full_refreshed_at FROM s3_prefixes WHERE bucket = ? AND prefix = ?', (bucket, prefix)
+        ).fetchone()
+        return None if row is None or row[0] is None else datetime.datetime.fromisoformat(row[0])
+
+    def is_full_refresh_due(self, bucket: str, prefix: str) -> bool:
+        full_refreshed_at = self.get_full_refreshed_at(bucket, prefix)
+        return full_refreshed_at is None or \
+            (datetime.datetime.now() - full_refreshed_at).total_seconds() >= self.full_refresh_interval
+
+    @staticmethod
+    def get_start_after(prefix: str, last_key: str) -> str:
+        """
+        Folder of the last seen key below the prefix, or the last seen key itself for flat prefixes
+        """
+        folder = last_key.rpartition('/')[0] + '/'
+        return folder if len(folder) > len(prefix) else last_key
+
+    def refresh(self, s3, bucket: str, prefix: str, full: bool = False) -> int:
+        full = full or self.is_full_refresh_due(bucket, prefix)
+        full_refreshed_at = datetime.datetime.now().isoformat() if full else None
+        if full:
+            self.clear(bucket, prefix)
+
+        last_key = self.get_last_key(bucket, prefix)
+
+        paginator = s3.get_paginator('list_objects_v2')
+        operation_parameters = {'Bucket': bucket, 'Prefix': prefix}
+        if last_key is not None:
+            operation_parameters['StartAfter'] = S3ListingIndex.get_start_after(prefix, last_key)
+
+        num_objects = 0
+        for page in paginator.paginate(**operation_parameters):
+            contents = page.get('Contents')
+            if contents is None:
+                continue
+
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO s3_objects (bucket, prefix, key, size, etag, last_modified) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(bucket, prefix, c['Key'], c['Size'], c.get('ETag'), S3ListingIndex.format_last_modified(c.get('LastModified')))
+                     for c in contents]
+                )
+                # keys are returned in UTF-8 binary order, the last key of the page is the highest one
+                last_key = max(last_key or '', contents[-1]['Key'])
+            num_objects += len(contents)
+
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO s3_prefixes (bucket, prefix, last_key, refreshed_at, full_refreshed_at) '
+                'VALUES (?, ?, ?, ?, COALESCE(?, (SELECT full_refreshed_at FROM s3_prefixes WHERE bucket = ? AND prefix = ?)))',
+                (bucket, prefix, last_key, datetime.datetime.now().isoformat(), full_refreshed_at, bucket, prefix)
+            )
+
+        logger.info(f"Listing index refreshed for s3://{bucket}/{prefix}: {num_objects} objects listed{' (full)' if full else ''}")
+        return num_objects
+
+    def list_objects(self, bucket: str, prefix: str) -> list:
+        cursor = self._connection.execute(
+            'SELECT key, size, etag, last_modified FROM s3_objects WHERE bucket = ? AND prefix = ? ORDER BY key',
+            (bucket, prefix)
+        )
+        return [{'Key': key, 'Size': size, 'ETag': etag, 'LastModified': last_modified}
+                for key, size, etag, last_modified in cursor]
+
+    def list_keys(self, bucket: str, prefix: str) -> list:
+        cursor = self._connection.execute(
+            'SELECT key FROM s3_objects WHERE bucket = ? AND prefix = ? ORDER BY key', (bucket, prefix)
+        )
+        return [r[0] for r in cursor]
+
+    @staticmethod
+    def format_last_modified(value) -> [str, None]:
+        if value is None:
+            return None
+        elif isinstance(value, datetime.datetime):
+            return value.isoformat()
+        else:
+            return str(value)
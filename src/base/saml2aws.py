@@ -48,6 +48,7 @@ def get_credentials_section(section_name: str, obj: dict) -> list[str]:
     credentials.append(f"aws_access_key_id = {obj['AccessKeyId']}")
     credentials.append(f"aws_secret_access_key = {obj['SecretAccessKey']}")
     credentials.append(f"aws_session_token = {obj['SessionToken']}")
+    credentials.append(f"x_security_token_expires = {obj['Expiration']}")
     credentials.append(f"glue_iam_role = {GLUE_ARNS[section_name]}")
 
     return credentials
@@ -3,13 +3,15 @@ Script Name: sso2aws
 Author: Roman
 Date: 07.01.2025
 Description: Reads temporary credentials sso.txt file and saves it locally
-Parameters: None
+Parameters: --expiration (optional) expiry of the credentials shown by the SSO web interface, ISO-8601
 Input: "sso.txt" file with credentials from SSO web interface
 Output: {user profile}/.aws/credentials
 """
 
 
 import os
+import argparse
+import datetime
 
 HOME_PATH = os.path.expanduser(os.getenv('USERPROFILE')).replace("\\", "/")
 SSO_FILE_NAME = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../data/sso.txt")).replace("\\", "/")
@@ -21,9 +23,11 @@ def read_sso_file() -> list[str]:
     with open(SSO_FILE_NAME, 'r', encoding='utf-8') as f:
         return f.readlines()
 
-def transform_lines(lines: list[str]) -> list[str]:
+def transform_lines(lines: list[str], expiration: datetime.datetime | None = None) -> list[str]:
     result = []
     default_line_number = -1
+    # sso.txt carries no expiry, it is written only when given and is checked by base.startup.check_credentials_expiration
+    expires_lines = [] if expiration is None else [f"x_security_token_expires = {expiration.isoformat()}\n"]
 
     for line in lines:
         env = next((vl for v in line.split('-') if (vl := v.lower()) in ENVS), None)
@@ -34,10 +38,11 @@ def transform_lines(lines: list[str]) -> list[str]:
             result.append(f"[{env}]\n")
             if env == 'dev':
                 default_line_number = len(result)
+            result.extend(expires_lines)
 
     # generate default from dev
     if default_line_number > -1:
-        default_result = result[default_line_number:default_line_number + 4]
+        default_result = result[default_line_number:default_line_number + 4 + len(expires_lines)]
         result.extend([
             '\n',
             '\n',
@@ -63,11 +68,22 @@ def write_credentials_file(file_name: str, lines: list[str]) -> None:
     print(f"Credentials written to {credentials_file_name}")
 
 
+def parse_expiration(value: str) -> datetime.datetime:
+    expiration = datetime.datetime.fromisoformat(value)
+    if expiration.tzinfo is None:
+        expiration = expiration.astimezone()
+    return expiration
+
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--expiration', type=parse_expiration, default=None, help='Credentials expiry, ISO-8601, local time if no offset')
+    args = parser.parse_args()
+
     print("Reading SSO file...")
     sso_file_lines = read_sso_file()
     print(f"SSO file: {len(sso_file_lines)} lines read")
 
-    transformed_lines = transform_lines(sso_file_lines)
+    transformed_lines = transform_lines(sso_file_lines, args.expiration)
 
     write_credentials_file(CREDENTIALS_FILE_NAME, transformed_lines)
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import atexit
+import threading
+import datetime
+import configparser
+import importlib.abc
+
+PROFILE_STARTUP_ARG = '--profile-startup'
+CREDENTIALS_EXPIRATION_KEY = 'x_security_token_expires'
+
+_start_time = time.perf_counter()
+_import_times = {}
+_credentials_files = {}
+_credentials_files_lock = threading.Lock()
+
+
+class _TimingLoader(importlib.abc.Loader):
+    def __init__(self, loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        start_time = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            _import_times[self._name] = time.perf_counter() - start_time
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimingLoader(spec.loader, fullname)
+                return spec
+        return None
+
+
+def _print_startup_profile(top: int = 20) -> None:
+    # time of a module includes its nested imports
+    print(f"Startup profile: {len(_import_times)} modules imported, "
+          f"{time.perf_counter() - _start_time:.3f} seconds total", file=sys.stderr)
+    for name, elapsed in sorted(_import_times.items(), key=lambda i: i[1], reverse=True)[:top]:
+        print(f"  {elapsed:8.3f}  {name}", file=sys.stderr)
+
+
+def profile_startup() -> None:
+    """
+    Enables import timing if --profile-startup is passed, must be called before other imports of the script.
+    The argument is removed from sys.argv, the breakdown is printed on exit
+    """
+    if PROFILE_STARTUP_ARG in sys.argv:
+        sys.argv.remove(PROFILE_STARTUP_ARG)
+        sys.meta_path.insert(0, _ImportTimer())
+        atexit.register(_print_startup_profile)
+
+
+def get_credentials_file_name() -> str:
+    return os.environ.get('AWS_SHARED_CREDENTIALS_FILE', os.path.expanduser('~/.aws/credentials'))
+
+
+def read_credentials_file(credentials_file_name: str = None) -> configparser.ConfigParser:
+    """
+    Parses the shared credentials file once per process, the file is parsed again after it was rewritten
+    """
+    file_name = credentials_file_name or get_credentials_file_name()
+    modified_at = os.stat(file_name).st_mtime_ns if os.path.exists(file_name) else None
+    with _credentials_files_lock:
+        cached = _credentials_files.get(file_name)
+        if cached is None or cached[0] != modified_at:
+            parser = configparser.ConfigParser()
+            parser.read(file_name)
+            cached = _credentials_files[file_name] = (modified_at, parser)
+        return cached[1]
+
+
+def get_credentials_expiration(profile_name: str, credentials_file_name: str = None) -> [datetime.datetime, None]:
+    parser = read_credentials_file(credentials_file_name)
+    if not parser.has_section(profile_name):
+        return None
+
+    expiration = parser[profile_name].get(CREDENTIALS_EXPIRATION_KEY)
+    if expiration is None:
+        return None
+
+    expires_at = datetime.datetime.fromisoformat(expiration)
+    return expires_at if expires_at.tzinfo is not None else expires_at.replace(tzinfo=datetime.timezone.utc)
+
+
+def check_credentials_expiration(profile_name: str, credentials_file_name: str = None) -> None:
+    """
+    Fails fast if credentials written by saml2aws/sso2aws for the profile have expired,
+    instead of failing on the first AWS call. Profiles without expiration are not checked
+    """
+    expires_at = get_credentials_expiration(profile_name, credentials_file_name)
+    if expires_at is not None and expires_at <= datetime.datetime.now(datetime.timezone.utc):
+        raise RuntimeError(f"Credentials of profile {profile_name} expired at {expires_at.isoformat()}, run saml2aws or sso2aws to refresh them")
@@ -1,6 +1,7 @@
+from base.startup import profile_startup
+profile_startup()
+
 import boto3
-import pandas as pd
-import numpy as np
 
 session = boto3.session.Session(profile_name='prod', region_name='eu-west-1')
 glue = session.client('glue')
@@ -41,6 +42,10 @@ def list_crawls(crawler_name):
 
 
 if __name__ == "__main__":
+    # imported on use, pandas and numpy are only needed for the report
+    import pandas as pd
+    import numpy as np
+
     # crawler_list = [c for c in list_crawlers() if c in ['sds-dev-store-operations-shop-crawler', 'sds-dev-store-payment-shop-crawler-1to1']]
     crawler_list = list_crawlers()
     dfr = None
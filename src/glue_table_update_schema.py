@@ -20,6 +20,9 @@ Date:
 """
 
 
+from base.startup import profile_startup
+profile_startup()
+
 import argparse
 from time import sleep
 from base.cfg import BaseConfig
@@ -1,7 +1,12 @@
 import os
 import sys
+import gzip
+import zlib
+import itertools
+import threading
+from collections import OrderedDict, deque
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
+from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import time
@@ -9,13 +14,14 @@ import logging.config
 import json
 from collections import UserDict
 from functools import cache
-from typing import Generator, Optional
+from typing import BinaryIO, Generator, Iterable, Iterator, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
+from request_scheduler import RequestScheduler, ScheduledAdapter, default_scheduler
 
 from dataclasses import dataclass, fields
 import boto3
@@ -54,20 +60,67 @@ def get_logger(name: str) -> logging.Logger:
 logger = get_logger(__name__)
 TIMESTAMP_FORMAT_Z = '%Y-%m-%dT%H:%M:%S.%fZ'
 TIMESTAMP_FORMAT_ZERO = '%Y-%m-%dT%H:%M:%S.%f+0000'
+JQL_DATETIME_FORMAT = '%Y/%m/%d %H:%M'
+
+@cache
+def get_list_adapter(cls: type[BaseModel]) -> TypeAdapter:
+    # validates a list of dicts in one call, without a JSON round-trip per item
+    return TypeAdapter(list[cls])
 
 class ServiceDict(UserDict):
+    """
+    Clients are created on first access and shared by the board workers, boto3 clients are thread safe
+    """
     def __init__(self, session):
         super().__init__()
         self.session = session
+        self._lock = threading.Lock()
 
     def __getattr__(self, attr):
         return self[attr]
 
     def __missing__(self, key):
-        return self.session.client(key)
+        # session is not thread safe, creation is serialised
+        with self._lock:
+            if key not in self.data:
+                self.data[key] = self.session.client(key)
+            return self.data[key]
 
 aws_services = ServiceDict(boto3.Session())
 
+class TTLCache:
+    """
+    Thread safe LRU cache with entries expiring after ttl seconds
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: list) -> dict:
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None:
+                    if entry[1] > now:
+                        self._data.move_to_end(key)
+                        result[key] = entry[0]
+                    else:
+                        del self._data[key]
+        return result
+
+    def put_many(self, values: dict) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._data[key] = (value, expires_at)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
 @dataclass
 class Board:
     board_id: str
@@ -151,6 +204,7 @@ class Fields(BaseModel):
     status: Optional[Named]=None
     environment: Optional[Valued]=Field(None, alias="customfield_11115")
     created: Optional[str]=None
+    updated: Optional[str]=None
     project: Optional[Project]=None
     epic_key: Optional[str]=Field(None, alias="customfield_10005")
     epic_name: Optional[str]=Field(None, alias="customfield_10006")
@@ -163,6 +217,8 @@ class Issue(BaseModel):
     key: str
     fields: Fields
     change_log: Optional[ChangeLog] = Field(None, alias="changelog")
+    # changelog scan result, filled by IssueTransformer.changelog_index
+    _changelog_index: Optional["ChangelogIndex"] = PrivateAttr(None)
 
 class WorkflowTransition(BaseModel):
     id: int
@@ -219,13 +275,17 @@ class EPRIssueStatusChangeHistory(BaseModel):
 class JSMConfig:
     BOARDS_FILE_NAME = "boards.json"
 
-    def __init__(self, secret_name: str, raw_location: str, output_location: str):
+    def __init__(self, secret_name: str, raw_location: str, output_location: str, board_workers: int = 1, incremental: bool = False,
+                 http_pool_size: int = None):
         if secret_name.startswith("sds"):
             self._api_key = wr.secretsmanager.get_secret(secret_name)
         else:
             self._api_key = secret_name
         self._raw_location = raw_location
         self._output_location = output_location
+        self._board_workers = board_workers
+        self._incremental = incremental
+        self._http_pool_size = http_pool_size
 
         cfg_boards_locations = [
             os.path.abspath(os.path.join(os.path.dirname(__file__), f"../config/{JSMConfig.BOARDS_FILE_NAME}")),
@@ -256,11 +316,58 @@ class JSMConfig:
     def output_location(self) -> str:
         return self._output_location
 
+    @property
+    def board_workers(self) -> int:
+        return self._board_workers
+
+    @property
+    def incremental(self) -> bool:
+        return self._incremental
+
+    @property
+    def http_pool_size(self) -> int:
+        # board workers and their prefetch threads share the connection pool
+        if self._http_pool_size is None:
+            return max(APIGetClient.POOL_SIZE, self._board_workers * APIGetClient.PREFETCH_WINDOW)
+        return self._http_pool_size
+
 class APIGetClient:
     DOMAIN_NAME = "https://jira.sixt.com"
+    HOST_NAME = "jira.sixt.com"
+    PREFETCH_WINDOW = 4
+    POOL_SIZE = 16
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, prefetch_window: int = PREFETCH_WINDOW, pool_size: int = POOL_SIZE,
+                 scheduler: RequestScheduler = default_scheduler):
         self._api_key = api_key
+        self.prefetch_window = prefetch_window
+        self.pool_size = pool_size
+        self.scheduler = scheduler
+        self._adapter = None
+        self._adapter_lock = threading.Lock()
+        self._local = threading.local()
+
+    def obtain_adapter(self) -> HTTPAdapter:
+        retries = Retry(
+            total=10,
+            backoff_factor=0.5,
+            # throttled responses must reach the scheduler, urllib3 only retries connection errors
+            status=0,
+            respect_retry_after_header=False,
+        )
+        # throttled responses are retried by the scheduler within the host budget,
+        # pool_block keeps the number of keep-alive connections within pool_size when threads share the adapter
+        return ScheduledAdapter(self.scheduler, pool_connections=1, pool_maxsize=self.pool_size, pool_block=True, max_retries=retries)
+
+    @property
+    def adapter(self) -> HTTPAdapter:
+        """
+        Long-lived adapter, its keep-alive connection pool is shared by prefetch and board worker threads
+        """
+        with self._adapter_lock:
+            if self._adapter is None:
+                self._adapter = self.obtain_adapter()
+            return self._adapter
 
     def obtain_session(self) -> requests.Session:
         session = requests.Session()
@@ -269,91 +376,145 @@ class APIGetClient:
             "Authorization": f"Bearer {self._api_key}",
             "Content-Type": "application/json"
         })
-
-        retries = Retry(
-            total=10,
-            backoff_factor=0.5,
-        )
-        session.mount('https://', HTTPAdapter(max_retries=retries))
+        session.mount('https://', self.adapter)
 
         return session
 
+    @property
+    def session(self) -> requests.Session:
+        """
+        Session of the current thread, requests.Session is not thread safe
+        """
+        if not hasattr(self._local, 'session'):
+            self._local.session = self.obtain_session()
+        return self._local.session
+
+    def close(self):
+        with self._adapter_lock:
+            if self._adapter is not None:
+                self._adapter.close()
+                self._adapter = None
+
+    def fetch_page(self, session: requests.Session, api_url: str, page_size: int, data_key: str, params: Optional[dict], start_at: int) -> tuple[Optional[list], dict]:
+        """
+        Fetches one page, returns page data or None if there is no more data, and full response
+        """
+        page_params = {"startAt": start_at, "maxResults": page_size}
+        request_params = {**({} if params is None else params), **page_params}
+
+        logger.info(f"Reading from RestAPI with params: {str(request_params)}, url: {api_url}")
+
+        start_time = time.time()
+        response = session.get(api_url, params=request_params)
+        end_time = time.time()
+        logger.info(f"Fetching from Rest API completed in {(end_time - start_time):.2f} seconds")
+
+        # sometimes bad request are returning for logical reasons
+        if response.status_code != requests.codes.bad_request:
+            response.raise_for_status()
+
+        try:
+            response_json = response.json()
+        except ValueError as e:
+            logger.error(f"Response is not a valid JSON: {e}")
+            raise
+
+        if 'errorMessages' in response_json:
+            logger.error(f"Data fetch errors: {str(response_json['errorMessages'])}")
+            return None, response_json
+
+        response.raise_for_status()
+
+        if data_key not in response_json or len(response_json[data_key]) == 0:
+            logger.info("No data read, exiting")
+            return None, response_json
+        else:
+            response_result = response_json[data_key]
+            if isinstance(response_result, list):
+                logger.info(f"Fetched {len(response_result)} rows")
+                return response_result, response_json
+            else:
+                logger.error(f"Response result is not a list: {str(response_result)}, full response: {response_json}")
+                raise ValueError(f"Response result is invalid, see log for details")
+
     def fetch_paged(self, url: str, page_size: int, data_key: str, params: dict=None) -> Generator[list, None, None]:
-        start_at = 0
         api_url = APIGetClient.DOMAIN_NAME + url
 
-        with self.obtain_session() as session:
-            while True:
-                page_params = {"startAt": start_at, "maxResults": page_size}
-                request_params = {**({} if params is None else params), **page_params}
-
-                logger.info(f"Reading from RestAPI with params: {str(request_params)}, url: {api_url}")
-
-                start_time = time.time()
-                response = session.get(api_url, params=request_params)
-                end_time = time.time()
-                logger.info(f"Fetching from Rest API completed in {(end_time - start_time):.2f} seconds")
-
-                # sometimes bad request are returning for logical reasons
-                if response.status_code != requests.codes.bad_request:
-                    response.raise_for_status()
-
-                try:
-                    response_json = response.json()
-                except ValueError as e:
-                    logger.error(f"Response is not a valid JSON: {e}")
-                    raise
-
-                if 'errorMessages' in response_json:
-                    logger.error(f"Data fetch errors: {str(response_json['errorMessages'])}")
-                    break
-
-                response.raise_for_status()
-
-                if data_key not in response_json or len(response_json[data_key]) == 0:
-                    logger.info("No data read, exiting")
-                    break
-                else:
-                    response_result = response_json[data_key]
-                    if isinstance(response_result, list):
-                        logger.info(f"Fetched {len(response_result)} rows")
-                        start_at += len(response_result)
-                        yield response_result
-                    else:
-                        logger.error(f"Response result is not a list: {str(response_result)}, full response: {response_json}")
-                        raise ValueError(f"Response result is invalid, see log for details")
+        session = self.session
+        page, response_json = self.fetch_page(session, api_url, page_size, data_key, params, 0)
+        if page is None:
+            return
+        yield page
+        start_at = len(page)
+
+        # when the first page carries total, remaining pages are fetched ahead in a bounded window
+        total = response_json.get('total')
+        if total is not None and total > start_at and self.prefetch_window > 1:
+            step = response_json.get('maxResults') or len(page)
+            offsets = list(range(start_at, total, step))
+            logger.info(f"Prefetching {len(offsets)} pages of {total} rows, window: {self.prefetch_window}")
+
+            for offset, page in self.prefetch_pages(api_url, page_size, data_key, params, offsets):
+                if page is None:
+                    return
+                yield page
+                start_at = offset + len(page)
+
+        # sequential tail, also picks up rows added while prefetching
+        while True:
+            page, _ = self.fetch_page(session, api_url, page_size, data_key, params, start_at)
+            if page is None:
+                break
+            start_at += len(page)
+            yield page
+
+    def prefetch_pages(self, api_url: str, page_size: int, data_key: str, params: Optional[dict], offsets: list[int]) -> Generator[tuple[int, Optional[list]], None, None]:
+        def fetch(start_at: int) -> Optional[list]:
+            return self.fetch_page(self.session, api_url, page_size, data_key, params, start_at)[0]
+
+        executor = ThreadPoolExecutor(max_workers=self.prefetch_window)
+        try:
+            pending_offsets = deque(offsets)
+            futures = deque()
+            while len(pending_offsets) > 0 or len(futures) > 0:
+                while len(pending_offsets) > 0 and len(futures) < self.prefetch_window:
+                    offset = pending_offsets.popleft()
+                    futures.append((offset, executor.submit(fetch, offset)))
+                offset, future = futures.popleft()
+                yield offset, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     @cache
     def fetch_simple(self, url: str, params: dict=None) -> dict:
         api_url = APIGetClient.DOMAIN_NAME + url
 
-        with self.obtain_session() as session:
-            request_params = {} if params is None else params
-            logger.info(f"Reading from RestAPI with params: {str(request_params)}, url: {api_url}")
+        request_params = {} if params is None else params
+        logger.info(f"Reading from RestAPI with params: {str(request_params)}, url: {api_url}")
 
-            start_time = time.time()
-            response = session.get(api_url, params=request_params)
-            end_time = time.time()
-            logger.info(f"Fetching from Rest API completed in {(end_time - start_time):.2f} seconds")
+        start_time = time.time()
+        response = self.session.get(api_url, params=request_params)
+        end_time = time.time()
+        logger.info(f"Fetching from Rest API completed in {(end_time - start_time):.2f} seconds")
 
-            try:
-                response_json = response.json()
-            except ValueError as e:
-                logger.error(f"Response is not a valid JSON: {e}")
-                raise
+        try:
+            response_json = response.json()
+        except ValueError as e:
+            logger.error(f"Response is not a valid JSON: {e}")
+            raise
 
-            if 'errorMessages' in response_json:
-                logger.error(f"Data fetch errors: {str(response_json['errorMessages'])}")
-                return {}
+        if 'errorMessages' in response_json:
+            logger.error(f"Data fetch errors: {str(response_json['errorMessages'])}")
+            return {}
 
-            response.raise_for_status()
+        response.raise_for_status()
 
-            return response_json
+        return response_json
 
 
 class APIDataFetcher:
-    def __init__(self, api_key: str):
-        self.api_client = APIGetClient(api_key)
+    def __init__(self, api_key: str, pool_size: int = APIGetClient.POOL_SIZE):
+        self.api_client = APIGetClient(api_key, pool_size=pool_size)
 
     def fetch_sprints_for_board(self, board: Board) -> list:
         logger.info(f"Fetching sprints for board: {board.board_id}")
@@ -367,62 +528,142 @@ class APIDataFetcher:
         logger.info(f"Fetching sprints for board {board.board_id} completed, {len(sprints)} sprints")
         return sprints
 
-    def fetch_issues_for_board(self, board: Board, filter_id: str) -> list:
-        logger.info(f"Fetching issues for board: {board.board_id}")
-        issues = []
+    def iter_issues_for_board(self, board: Board, filter_id: str, updated_since: Optional[datetime] = None) -> Generator[list, None, None]:
+        logger.info(f"Fetching issues for board: {board.board_id}, updated since: {updated_since}")
 
         quoted_board_names = [f'"{b}"' for b in board.excluded_task_types]
+        if updated_since is None:
+            period_jql = "(created >= startOfDay(-365d) OR updated >= startOfDay(-365d))"
+        else:
+            period_jql = f"updated >= \"{updated_since.strftime(JQL_DATETIME_FORMAT)}\""
         params = {
-            'jql': f"filter={filter_id} AND issuetype NOT IN ({','.join(quoted_board_names)}) AND (created >= startOfDay(-365d) OR updated >= startOfDay(-365d))",
-            'fields': 'summary,labels,components,issuetype,resolutiondate,resolution,status,customfield_11115,customfield_10005,customfield_10006,customfield_10002,customfield_12401,created,project,priority,fixVersions',
+            'jql': f"filter={filter_id} AND issuetype NOT IN ({','.join(quoted_board_names)}) AND {period_jql}",
+            'fields': 'summary,labels,components,issuetype,resolutiondate,resolution,status,customfield_11115,customfield_10005,customfield_10006,customfield_10002,customfield_12401,created,updated,project,priority,fixVersions',
             'expand': 'changelog'
         }
 
         url = f"/rest/api/2/search"
+        issue_count = 0
         for board_issues_data in self.api_client.fetch_paged(url, board.limit, 'issues', params):
-            issues.extend(board_issues_data)
-            pass
+            issue_count += len(board_issues_data)
+            yield board_issues_data
 
-        logger.info(f"Fetching issues for board {board.board_id} completed, {len(issues)} issues")
-        return issues
+        logger.info(f"Fetching issues for board {board.board_id} completed, {issue_count} issues")
 
-    @cache
-    def fetch_issue_by_key(self, key: str) -> any:
-        logger.info(f"Fetching issue by key: {key}")
+    def fetch_issues_by_keys(self, keys: list[str], fields: str) -> list:
+        logger.info(f"Fetching {len(keys)} issues by keys")
+        issues = []
+
+        params = {
+            'jql': f"key in ({','.join(keys)})",
+            'fields': fields,
+            # keys of deleted or hidden issues are reported as warnings instead of failing the query
+            'validateQuery': 'warn'
+        }
 
-        url = f"/rest/api/2/issue/{key}"
-        issue = self.api_client.fetch_simple(url)
-        logger.info(f"Fetching issue completed")
+        url = f"/rest/api/2/search"
+        for issues_data in self.api_client.fetch_paged(url, len(keys), 'issues', params):
+            issues.extend(issues_data)
+            pass
 
-        return issue
+        logger.info(f"Fetching issues by keys completed, {len(issues)} issues")
+        return issues
 
     def fetch_board_configuration(self, board: Board) -> BoardConfiguration:
         logger.info(f"Fetching board configuration for board: {board.board_id}")
 
         url = f"/rest/agile/1.0/board/{board.board_id}/configuration"
         board_configuration = self.api_client.fetch_simple(url)
-        board_configuration_model = BoardConfiguration.model_validate_json(json.dumps(board_configuration))
+        board_configuration_model = BoardConfiguration.model_validate(board_configuration)
 
         logger.info(f"Fetching board configuration {board.board_id} completed: {board_configuration_model}")
         return board_configuration_model
 
-class APIDataWriter:
+class RawLocation:
+    """
+    Raw files are stored under {location}{entity_name}s/ in S3, locally under data/{entity_name}s/
+    """
     def __init__(self, location: str):
         self.location = location
 
+    def is_s3(self) -> bool:
+        return self.location.startswith('s3')
+
+    def get_s3_path(self, entity_name: str, file_name: str) -> tuple[str, str]:
+        bucket = self.location.split('/')[2]
+        key = '/'.join(self.location.split('/')[3:]) + f"{entity_name}s/{file_name}"
+        return bucket, key
+
+    @staticmethod
+    def get_local_file_name(entity_name: str, file_name: str) -> str:
+        return os.path.abspath(os.path.join(os.path.dirname(__file__), f"../data/{entity_name}s/{file_name}"))
+
+    @staticmethod
+    def compress_chunks(lines: Iterable[bytes], chunk_size: int) -> Generator[bytes, None, None]:
+        # wbits=31 produces gzip format
+        compressor = zlib.compressobj(wbits=31)
+        buffer = bytearray()
+        for line in lines:
+            buffer += compressor.compress(line)
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += compressor.flush()
+        yield bytes(buffer)
+
+class APIDataWriter(RawLocation):
+    # S3 multipart upload parts must be at least 5 MB, except the last one
+    PART_SIZE = 8 * 1024 * 1024
+
     def prepare(self):
-        if self.location.startswith('s3'):
+        if self.is_s3():
             logger.info(f"Preparing S3 location: {self.location}")
             wr.s3.delete_objects(self.location)
 
-    def write_entity(self, entity_name: str, entity_id: str, data: list[BaseModel]) -> None:
+    def write_entity(self, entity_name: str, entity_id: str, data: Iterable[BaseModel]) -> None:
+        """
+        Writes entities as gzip compressed JSON lines, compressed data is uploaded in parts as it grows
+        """
         logger.info(f"Writing entity: {entity_name}, {entity_id}")
-        data_object = {f"{entity_name}s": [d.model_dump(by_alias=True) for d in data]}
+        lines = (json.dumps(d.model_dump(by_alias=True)).encode('utf-8') + b'\n' for d in data)
+        file_name = f"{entity_id}.jsonl.gz"
 
-        if self.location.startswith('s3'):
-            logger.info(f"Writing to S3 location: {self.location}: {entity_name}: {entity_id}")
-            bucket = self.location.split('/')[2]
-            key = '/'.join(self.location.split('/')[3:]) + f"{entity_name}s/{entity_id}.json"
+        if self.is_s3():
+            bucket, key = self.get_s3_path(entity_name, file_name)
+            logger.info(f"Writing to S3 location: {self.location}, bucket={bucket}, key={key}: {entity_name}={entity_id}")
+            self.upload_chunks(bucket, key, RawLocation.compress_chunks(lines, APIDataWriter.PART_SIZE))
+        else:
+            logger.info(f"Writing to local file: {self.location}: {entity_name}={entity_id}")
+            local_file_name = RawLocation.get_local_file_name(entity_name, file_name)
+            os.makedirs(os.path.dirname(local_file_name), exist_ok=True)
+            with open(local_file_name, "wb") as f:
+                for chunk in RawLocation.compress_chunks(lines, APIDataWriter.PART_SIZE):
+                    f.write(chunk)
+        logger.info(f"Writing entity {entity_name} completed.")
+
+    @staticmethod
+    def upload_chunks(bucket: str, key: str, chunks: Iterator[bytes]) -> None:
+        first_chunk = next(chunks, b'')
+        second_chunk = next(chunks, None)
+        if second_chunk is None:
+            aws_services.s3.put_object(Body=first_chunk, Bucket=bucket, Key=key)
+            return
+
+        upload_id = aws_services.s3.create_multipart_upload(Bucket=bucket, Key=key)['UploadId']
+        try:
+            parts = []
+            for part_number, chunk in enumerate(itertools.chain([first_chunk, second_chunk], chunks), start=1):
+                response = aws_services.s3.upload_part(Body=chunk, Bucket=bucket, Key=key, PartNumber=part_number, UploadId=upload_id)
+                parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+            aws_services.s3.complete_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts})
+        except Exception:
+            aws_services.s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def write_json(self, entity_name: str, entity_id: str, data_object: dict) -> None:
+        file_name = f"{entity_id}.json"
+        if self.is_s3():
+            bucket, key = self.get_s3_path(entity_name, file_name)
             logger.info(f"Writing to S3 location: {self.location}, bucket={bucket}, key={key}: {entity_name}={entity_id}")
             aws_services.s3.put_object(
                 Body=json.dumps(data_object),
@@ -431,36 +672,58 @@ class APIDataWriter:
             )
         else:
             logger.info(f"Writing to local file: {self.location}: {entity_name}={entity_id}")
-            folder_name = os.path.abspath(os.path.join(os.path.dirname(__file__), f"../data/{entity_name}s"))
-            if not os.path.exists(folder_name):
-                os.makedirs(folder_name)
-            with open(f"{os.path.join(folder_name, entity_id)}.json", "w") as f:
+            local_file_name = RawLocation.get_local_file_name(entity_name, file_name)
+            os.makedirs(os.path.dirname(local_file_name), exist_ok=True)
+            with open(local_file_name, "w") as f:
                 f.write(json.dumps(data_object))
-        logger.info(f"Writing entity {entity_name} completed.")
 
-    def write_sprints(self, board: Board, data: list[BaseModel]) -> None:
+    def write_sprints(self, board: Board, data: Iterable[BaseModel]) -> None:
         self.write_entity('sprint', board.board_id, data)
 
-    def write_issues(self, board: Board, data: list[BaseModel]) -> None:
+    def write_issues(self, board: Board, data: Iterable[BaseModel]) -> None:
         self.write_entity('issue', board.board_id, data)
 
-class APIDataReader:
-    def __init__(self, location: str):
-        self.location = location
+    def write_watermark(self, board: Board, updated: str) -> None:
+        self.write_json('watermark', board.board_id, {'updated': updated})
 
-    def read_entity(self, entity_name: str, entity_id: str, cls: type[BaseModel]) -> list[BaseModel]:
-        if self.location.startswith('s3'):
-            logger.info(f"Reading from S3 location: {self.location}: {entity_name}: {entity_id}")
-            bucket = self.location.split('/')[2]
-            key = '/'.join(self.location.split('/')[3:]) + f"{entity_name}s/{entity_id}.json"
-            data = aws_services.s3.get_object(Bucket=bucket, Key=key)['Body'].read().decode('utf-8')
+class APIDataReader(RawLocation):
+    def open_file(self, entity_name: str, file_name: str) -> Optional[BinaryIO]:
+        if self.is_s3():
+            bucket, key = self.get_s3_path(entity_name, file_name)
+            logger.info(f"Reading from S3 location: {self.location}, bucket={bucket}, key={key}")
+            try:
+                return aws_services.s3.get_object(Bucket=bucket, Key=key)['Body']
+            except aws_services.s3.exceptions.NoSuchKey:
+                return None
         else:
-            file_name = os.path.abspath(os.path.join(os.path.dirname(__file__), f"../data/{entity_name}s/{entity_id}.json"))
-            with open(file_name, "r", encoding="utf-8") as f:
-                data = f.read()
+            local_file_name = RawLocation.get_local_file_name(entity_name, file_name)
+            return open(local_file_name, "rb") if os.path.exists(local_file_name) else None
 
-        json_data = json.loads(data)[f"{entity_name}s"]
-        return [cls.model_validate_json(json.dumps(d)) for d in json_data]
+    def read_json(self, entity_name: str, entity_id: str) -> Optional[dict]:
+        f = self.open_file(entity_name, f"{entity_id}.json")
+        if f is None:
+            return None
+        with f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def iter_entity(self, entity_name: str, entity_id: str, cls: type[BaseModel]) -> Generator[BaseModel, None, None]:
+        """
+        Reads entities line by line, falls back to the previous single JSON document format
+        """
+        f = self.open_file(entity_name, f"{entity_id}.jsonl.gz")
+        if f is not None:
+            with f, gzip.GzipFile(fileobj=f) as lines:
+                for line in lines:
+                    yield cls.model_validate_json(line)
+            return
+
+        data_object = self.read_json(entity_name, entity_id)
+        if data_object is None:
+            raise FileNotFoundError(f"Entity {entity_name}={entity_id} not found in {self.location}")
+        yield from get_list_adapter(cls).validate_python(data_object[f"{entity_name}s"])
+
+    def read_entity(self, entity_name: str, entity_id: str, cls: type[BaseModel]) -> list[BaseModel]:
+        return list(self.iter_entity(entity_name, entity_id, cls))
 
     def read_sprints(self, board: Board) -> list[Sprint]:
         return self.read_entity('sprint', board.board_id, Sprint)
@@ -468,13 +731,28 @@ class APIDataReader:
     def read_issues(self, board: Board) -> list[Issue]:
         return self.read_entity('issue', board.board_id, Issue)
 
+    def read_watermark(self, board: Board) -> Optional[str]:
+        data_object = self.read_json('watermark', board.board_id)
+        return data_object['updated'] if data_object is not None else None
+
 class APIDataLoader:
+    EPIC_CHUNK_SIZE = 100
+    EPIC_PENDING_PAGES = 4
+    WATERMARK_OVERLAP = timedelta(days=1)
+    ISSUES_RETENTION = timedelta(days=365)
+    epic_name_cache = TTLCache(maxsize=10000, ttl=3600)
+
     def __init__(self, jsm_config: JSMConfig):
-        self.fetcher = APIDataFetcher(jsm_config.api_key)
+        self.fetcher = APIDataFetcher(jsm_config.api_key, jsm_config.http_pool_size)
         self.writer = APIDataWriter(jsm_config.raw_location)
+        self.reader = APIDataReader(jsm_config.raw_location)
+        self.incremental = jsm_config.incremental
 
     def prepare(self):
-        self.writer.prepare()
+        if self.incremental:
+            logger.info("Incremental mode, raw location is kept")
+        else:
+            self.writer.prepare()
 
     def load_sprints(self, board: Board) -> list[Sprint]:
         sprints = self.fetcher.fetch_sprints_for_board(board)
@@ -483,38 +761,135 @@ class APIDataLoader:
             return []
         else:
             sprints_with_board = [{**s, 'board_id': board.board_id} for s in sprints]
-            return [Sprint.model_validate_json(json.dumps(d)) for d in sprints_with_board]
+            return get_list_adapter(Sprint).validate_python(sprints_with_board)
 
     def write_sprints(self, board: Board, sprints: list[Sprint]) -> None:
         self.writer.write_sprints(board, sprints)
 
-    def fetch_epic_name(self, epic_key: str) -> str:
-        issue = self.fetcher.fetch_issue_by_key(epic_key)
-        issue_model = Issue.model_validate_json(json.dumps(issue))
+    def resolve_epic_names(self, epic_keys: list[str]) -> dict[str, Optional[str]]:
+        """
+        Resolves epic names with one search per chunk of keys, results are shared across boards
+        """
+        epic_names = APIDataLoader.epic_name_cache.get_many(epic_keys)
+        missing_keys = sorted(set(epic_keys) - set(epic_names))
+        logger.info(f"Epic names: {len(epic_names)} cached, {len(missing_keys)} to fetch")
+
+        for i in range(0, len(missing_keys), APIDataLoader.EPIC_CHUNK_SIZE):
+            chunk = missing_keys[i:i + APIDataLoader.EPIC_CHUNK_SIZE]
+            issues = self.fetcher.fetch_issues_by_keys(chunk, 'customfield_10006')
+            fetched = {k: None for k in chunk}
+            fetched.update({i['key']: i.get('fields', {}).get('customfield_10006') for i in issues})
+            APIDataLoader.epic_name_cache.put_many(fetched)
+            epic_names.update(fetched)
+
+        return epic_names
+
+    def load_issues(self, board: Board, filter_id: str, updated_since: Optional[datetime] = None) -> list[Issue]:
+        issues = [i for page in self.iter_issues(board, filter_id, updated_since) for i in page]
+        if len(issues) == 0:
+            logger.error(f"No issues for board {board.board_id}, skipping")
+        return issues
+
+    def iter_issues(self, board: Board, filter_id: str, updated_since: Optional[datetime] = None) -> Generator[list[Issue], None, None]:
+        """
+        Validates issues page by page as they are fetched. Pages with epics not resolved yet for the board are
+        held back until a chunk of new epic keys or EPIC_PENDING_PAGES pages is collected, so each epic is resolved once
+        per board in full chunks while earlier pages are already written
+        """
+        epic_names = {}
+        pending_pages = []
+        pending_keys = set()
+
+        def release_pages() -> list[list[Issue]]:
+            if len(pending_keys) > 0:
+                epic_names.update(self.resolve_epic_names(sorted(pending_keys)))
+                pending_keys.clear()
+            for issues_model in pending_pages:
+                for issue_model in issues_model:
+                    if issue_model.fields.epic_key is not None:
+                        issue_model.fields.epic_name = epic_names.get(issue_model.fields.epic_key)
+            released = pending_pages.copy()
+            pending_pages.clear()
+            return released
+
+        for page in self.fetcher.iter_issues_for_board(board, filter_id, updated_since):
+            issues_model = get_list_adapter(Issue).validate_python([{**s, 'board_id': board.board_id} for s in page])
+            pending_pages.append(issues_model)
+            pending_keys.update(m.fields.epic_key for m in issues_model if m.fields.epic_key is not None and m.fields.epic_key not in epic_names)
+
+            if len(pending_keys) == 0 or len(pending_keys) >= APIDataLoader.EPIC_CHUNK_SIZE or \
+                    len(pending_pages) >= APIDataLoader.EPIC_PENDING_PAGES:
+                yield from release_pages()
+
+        if len(pending_pages) > 0:
+            yield from release_pages()
+
+    def load_and_write_issues(self, board: Board, filter_id: str) -> list[Issue]:
+        """
+        Streams validated issue pages into the raw writer while they are fetched,
+        the raw payload of a page is released once its models are written
+        """
+        issues = []
 
-        return issue_model.fields.epic_name
+        def written_issues() -> Generator[Issue, None, None]:
+            for page in self.iter_issues(board, filter_id):
+                issues.extend(page)
+                yield from page
 
-    def load_issues(self, board: Board, filter_id: str) -> list[Issue]:
-        issues = self.fetcher.fetch_issues_for_board(board, filter_id)
+        self.write_issues(board, written_issues())
         if len(issues) == 0:
             logger.error(f"No issues for board {board.board_id}, skipping")
-            return []
-        else:
-            issues_with_board = [{**s, 'board_id': board.board_id} for s in issues]
-            issues_model = [Issue.model_validate_json(json.dumps(d)) for d in issues_with_board]
+        return issues
+
+    def load_issues_incremental(self, board: Board, filter_id: str) -> tuple[list[Issue], bool]:
+        """
+        Fetches issues updated since the board watermark and merges them into the previous raw snapshot.
+        Returns merged issues and whether anything changed
+        """
+        watermark = self.reader.read_watermark(board)
+        updated_since = TransformUtils.str_to_date_time(watermark)
+        if updated_since is None:
+            logger.info(f"No watermark for board {board.board_id}, loading all issues")
+            return self.load_issues(board, filter_id), True
+
+        # overlap covers the difference between server and JQL user time zones, duplicates are merged by id
+        delta = self.load_issues(board, filter_id, updated_since - APIDataLoader.WATERMARK_OVERLAP)
+        if len(delta) == 0:
+            logger.info(f"No issues updated since {watermark} for board {board.board_id}")
+            return [], False
+
+        previous = self.reader.read_issues(board)
+        issues = APIDataLoader.merge_issues(previous, delta, datetime.now() - APIDataLoader.ISSUES_RETENTION)
+        logger.info(f"Merged {len(delta)} updated issues into {len(previous)} previous issues: {len(issues)} issues")
+
+        return issues, True
+
+    @staticmethod
+    def merge_issues(previous: list[Issue], delta: list[Issue], retention_start: datetime) -> list[Issue]:
+        issues = {i.id: i for i in previous}
+        issues.update({i.id: i for i in delta})
 
-            logger.info("Loading epic names")
-            for issue_model in [m for m in issues_model if m.fields.epic_key is not None]:
-                issue_model.fields.epic_name = self.fetch_epic_name(issue_model.fields.epic_key)
-            logger.info("Epic names loaded")
+        def retained(issue: Issue) -> bool:
+            dates = [TransformUtils.str_to_date_time(issue.fields.created), TransformUtils.str_to_date_time(issue.fields.updated)]
+            return issue.fields.updated is None or any(d is not None and d >= retention_start for d in dates)
 
-            return issues_model
+        return [i for i in issues.values() if retained(i)]
+
+    @staticmethod
+    def get_watermark(issues: list[Issue]) -> Optional[str]:
+        updated = [i.fields.updated for i in issues if i.fields.updated is not None]
+        return max(updated) if len(updated) > 0 else None
+
+    def write_watermark(self, board: Board, issues: list[Issue]) -> None:
+        watermark = APIDataLoader.get_watermark(issues)
+        if watermark is not None:
+            self.writer.write_watermark(board, watermark)
 
     def load_configuration(self, board: Board) -> BoardConfiguration:
         return self.fetcher.fetch_board_configuration(board)
 
-    def write_issues(self, board: Board, issues: list[Issue]) -> None:
-            self.writer.write_issues(board, issues)
+    def write_issues(self, board: Board, issues: Iterable[Issue]) -> None:
+        self.writer.write_issues(board, issues)
 
 class BoardConfigurationTransformer:
     @staticmethod
@@ -527,12 +902,44 @@ class StatusHistory:
     from_status: str
     to_status: str
 
+@dataclass
+class FieldChange:
+    created: str
+    from_string: Optional[str]
+    to_string: Optional[str]
+
+@dataclass
+class ChangelogIndex:
+    status_history: list[StatusHistory]
+    sprint_values: list[Optional[str]]
+    field_changes: dict[str, list[FieldChange]]
+
 class IssueTransformer:
+    TRACKED_FIELDS = ('Flagged', 'assignee', 'Story Points')
+
+    @staticmethod
+    def changelog_index(issue: Issue) -> ChangelogIndex:
+        """
+        Scans the changelog once, the result is kept on the issue for all transformers
+        """
+        if issue._changelog_index is None:
+            index = ChangelogIndex([], [], {})
+            histories = issue.change_log.histories if issue.change_log is not None else []
+            for h in histories:
+                for item in h.items or []:
+                    if item.field == 'status':
+                        if item.from_string != item.to_string:
+                            index.status_history.append(StatusHistory(h.created, item.from_string, item.to_string))
+                    elif item.field == 'Sprint':
+                        index.sprint_values.extend([item.from_value, item.to_value])
+                    elif item.field in IssueTransformer.TRACKED_FIELDS:
+                        index.field_changes.setdefault(item.field, []).append(FieldChange(h.created, item.from_string, item.to_string))
+            issue._changelog_index = index
+        return issue._changelog_index
+
     @staticmethod
     def transform_status_history(issue: Issue) -> list[WorkflowTransition]:
-        status_history = [StatusHistory(h.created, h1.from_string, h1.to_string)
-                          for h in issue.change_log.histories for h1 in h.items
-                          if h1.field == 'status' and h1.from_string != h1.to_string]
+        status_history = list(IssueTransformer.changelog_index(issue).status_history)
 
         if len(status_history) == 0:
             return []
@@ -551,10 +958,7 @@ class IssueTransformer:
 
     @staticmethod
     def transform_sprints(issue: Issue) -> SprintHistory:
-        all_sprints = [hi.from_value if s == 'from' else hi.to_value
-                       for h in issue.change_log.histories
-                       for hi in h.items if hi.field == 'Sprint'
-                       for s in ['from', 'to']]
+        all_sprints = IssueTransformer.changelog_index(issue).sprint_values
 
         cleaned_sprint_values = [int(s1.strip())
                                           for s in all_sprints
@@ -565,6 +969,10 @@ class IssueTransformer:
             history=list(set(cleaned_sprint_values)),
             active_sprint=int(cleaned_sprint_values[-1]) if len(cleaned_sprint_values) > 0 else None)
 
+    @staticmethod
+    def transform_field_changes(issue: Issue, field: str) -> list[FieldChange]:
+        return IssueTransformer.changelog_index(issue).field_changes.get(field, [])
+
     @staticmethod
     def transform_issues_sprints(issues: list[Issue]) -> dict[int: SprintHistory]:
         return {iss.id: IssueTransformer.transform_sprints(iss)  for iss in issues}
@@ -607,34 +1015,95 @@ class TransformUtils:
         return 1 if value else 0
 
 class BoardPandasTransformer:
+    """
+    Builds data frames column by column, timestamps are parsed per column.
+    EPR models are only built for the first VALIDATION_SAMPLE_SIZE rows to validate the schema
+    """
+    VALIDATION_SAMPLE_SIZE = 10
+
+    @staticmethod
+    def str_to_date_time_column(values: list[Optional[str]]) -> Union[pd.Series, list]:
+        series = pd.Series(values, dtype=object)
+        result = pd.to_datetime(series, format=TIMESTAMP_FORMAT_Z, errors='coerce')
+        result = result.fillna(pd.to_datetime(series, format=TIMESTAMP_FORMAT_ZERO, errors='coerce'))
+        # a column without any value stays a column of None, as built from records
+        return result if result.notna().any() else [None] * len(values)
+
+    @staticmethod
+    def validate_sample(items: list, to_model) -> None:
+        for item in items[:BoardPandasTransformer.VALIDATION_SAMPLE_SIZE]:
+            to_model(item)
+
+    @staticmethod
+    def sprint_record_model(s: Sprint) -> EPRSprintRecords:
+        return EPRSprintRecords(
+            edsr_id=s.id,
+            edsr_name=s.name,
+            edsr_start_datm=TransformUtils.str_to_date_time(s.start_date),
+            edsr_end_datm=TransformUtils.str_to_date_time(s.end_date),
+            edsr_complete_datm=TransformUtils.str_to_date_time(s.complete_date),
+            edsr_activated_datm=TransformUtils.str_to_date_time(s.activated_date)
+        )
 
     @staticmethod
     def transform_sprint_records(sprints: list[Sprint]) -> pd.DataFrame:
-        df = pd.DataFrame([
-            EPRSprintRecords(
-                edsr_id=s.id,
-                edsr_name=s.name,
-                edsr_start_datm=TransformUtils.str_to_date_time(s.start_date),
-                edsr_end_datm=TransformUtils.str_to_date_time(s.end_date),
-                edsr_complete_datm=TransformUtils.str_to_date_time(s.complete_date),
-                edsr_activated_datm=TransformUtils.str_to_date_time(s.activated_date)
-            ).model_dump()
-            for s in sprints
-        ])
-        return df
+        if len(sprints) == 0:
+            return pd.DataFrame()
+        BoardPandasTransformer.validate_sample(sprints, BoardPandasTransformer.sprint_record_model)
+
+        to_date_time = BoardPandasTransformer.str_to_date_time_column
+        columns = {
+            'edsr_id': [s.id for s in sprints],
+            'edsr_name': [s.name for s in sprints],
+            'edsr_start_datm': to_date_time([s.start_date for s in sprints]),
+            'edsr_end_datm': to_date_time([s.end_date for s in sprints]),
+            'edsr_activated_datm': to_date_time([s.activated_date for s in sprints]),
+            'edsr_complete_datm': to_date_time([s.complete_date for s in sprints]),
+        }
+        return pd.DataFrame({k: columns[k] for k in EPRSprintRecords.model_fields})
 
     @staticmethod
     def transform_issues_sprints(issues_sprints: dict[int: SprintHistory]) -> pd.DataFrame:
-        df = pd.DataFrame([
-            EPRIssueSprints(
-                edsr_id=hs,
-                edir_id=issue_id
-            ).model_dump()
-            for issue_id, issues_sprints in issues_sprints.items()
-            for hs in issues_sprints.history
-            if hs is not None
-        ])
-        return df
+        pairs = [(hs, issue_id)
+                 for issue_id, issues_sprints in issues_sprints.items()
+                 for hs in issues_sprints.history
+                 if hs is not None]
+        if len(pairs) == 0:
+            return pd.DataFrame()
+        BoardPandasTransformer.validate_sample(pairs, lambda p: EPRIssueSprints(edsr_id=p[0], edir_id=p[1]))
+
+        return pd.DataFrame({
+            'edsr_id': [p[0] for p in pairs],
+            'edir_id': [p[1] for p in pairs],
+        })
+
+    @staticmethod
+    def issue_record_model(
+            board: Board,
+            iss: Issue,
+            issues_sprints: dict[int: SprintHistory],
+            columns: dict[int, str]) -> EPRIssueRecords:
+        return EPRIssueRecords(
+            edir_id=iss.id,
+            edir_board_id=int(board.board_id),
+            edir_summary=iss.fields.summary,
+            edir_story_points=iss.fields.story_points,
+            edir_labels=TransformUtils.list_to_str(iss.fields.labels),
+            edir_components=TransformUtils.list_named_to_str(iss.fields.components),
+            edir_issue_type=TransformUtils.named_to_str(iss.fields.issue_type),
+            edir_flagged=TransformUtils.bool_to_int(iss.fields.flagged),
+            edir_resolution_datm=TransformUtils.str_to_date_time(iss.fields.resolution_date),
+            edir_resolution=TransformUtils.named_to_str(iss.fields.resolution),
+            edir_status=TransformUtils.named_to_str(iss.fields.status),
+            edir_column_name=columns.get(int(iss.fields.status.id)),
+            edir_environment=TransformUtils.valued_to_str(iss.fields.environment),
+            edir_created_datm=TransformUtils.str_to_date_time(iss.fields.created),
+            edir_active_sprint_id=issues_sprints.get(iss.id).active_sprint,
+            edir_epic_name=iss.fields.epic_name,
+            edir_priority_name=TransformUtils.named_to_str(iss.fields.priority),
+            edir_fix_versions=TransformUtils.list_named_to_str(iss.fields.fix_versions),
+            edir_project_key=iss.fields.project.key
+        )
 
     @staticmethod
     def transform_issue_records(
@@ -642,47 +1111,64 @@ class BoardPandasTransformer:
             issues: list[Issue],
             issues_sprints: dict[int: SprintHistory],
             columns: dict[int, str]) -> pd.DataFrame:
-        df = pd.DataFrame([
-            EPRIssueRecords(
-                edir_id=iss.id,
-                edir_board_id=int(board.board_id),
-                edir_summary=iss.fields.summary,
-                edir_story_points=iss.fields.story_points,
-                edir_labels=TransformUtils.list_to_str(iss.fields.labels),
-                edir_components=TransformUtils.list_named_to_str(iss.fields.components),
-                edir_issue_type=TransformUtils.named_to_str(iss.fields.issue_type),
-                edir_flagged=TransformUtils.bool_to_int(iss.fields.flagged),
-                edir_resolution_datm=TransformUtils.str_to_date_time(iss.fields.resolution_date),
-                edir_resolution=TransformUtils.named_to_str(iss.fields.resolution),
-                edir_status=TransformUtils.named_to_str(iss.fields.status),
-                edir_column_name=columns.get(int(iss.fields.status.id)),
-                edir_environment=TransformUtils.valued_to_str(iss.fields.environment),
-                edir_created_datm=TransformUtils.str_to_date_time(iss.fields.created),
-                edir_active_sprint_id=issues_sprints.get(iss.id).active_sprint,
-                edir_epic_name=iss.fields.epic_name,
-                edir_priority_name=TransformUtils.named_to_str(iss.fields.priority),
-                edir_fix_versions=TransformUtils.list_named_to_str(iss.fields.fix_versions),
-                edir_project_key=iss.fields.project.key
-            ).model_dump()
-            for iss in issues
-        ])
-        return df
+        if len(issues) == 0:
+            return pd.DataFrame()
+        BoardPandasTransformer.validate_sample(
+            issues, lambda iss: BoardPandasTransformer.issue_record_model(board, iss, issues_sprints, columns))
+
+        to_date_time = BoardPandasTransformer.str_to_date_time_column
+        fields = [iss.fields for iss in issues]
+        data = {
+            'edir_id': [iss.id for iss in issues],
+            'edir_board_id': [int(board.board_id)] * len(issues),
+            'edir_summary': [f.summary for f in fields],
+            'edir_story_points': [f.story_points for f in fields],
+            'edir_labels': [TransformUtils.list_to_str(f.labels) for f in fields],
+            'edir_components': [TransformUtils.list_named_to_str(f.components) for f in fields],
+            'edir_issue_type': [TransformUtils.named_to_str(f.issue_type) for f in fields],
+            'edir_flagged': [TransformUtils.bool_to_int(f.flagged) for f in fields],
+            'edir_resolution_datm': to_date_time([f.resolution_date for f in fields]),
+            'edir_resolution': [TransformUtils.named_to_str(f.resolution) for f in fields],
+            'edir_status': [TransformUtils.named_to_str(f.status) for f in fields],
+            'edir_column_name': [columns.get(int(f.status.id)) for f in fields],
+            'edir_environment': [TransformUtils.valued_to_str(f.environment) for f in fields],
+            'edir_created_datm': to_date_time([f.created for f in fields]),
+            'edir_active_sprint_id': [issues_sprints.get(iss.id).active_sprint for iss in issues],
+            'edir_epic_name': [f.epic_name for f in fields],
+            'edir_priority_name': [TransformUtils.named_to_str(f.priority) for f in fields],
+            'edir_fix_versions': [TransformUtils.list_named_to_str(f.fix_versions) for f in fields],
+            'edir_project_key': [f.project.key for f in fields],
+        }
+        return pd.DataFrame({k: data[k] for k in EPRIssueRecords.model_fields})
+
+    @staticmethod
+    def status_change_model(board: Board, issue_id: int, transition: WorkflowTransition) -> EPRIssueStatusChangeHistory:
+        return EPRIssueStatusChangeHistory(
+            efsc_id=issue_id,
+            efsc_board_id=int(board.board_id),
+            efsc_status_name=transition.name,
+            efsc_from_datm=TransformUtils.str_to_date_time(transition.from_date),
+            efsc_to_datm=TransformUtils.str_to_date_time(transition.to_date)
+        )
 
     @staticmethod
     def transform_issue_status_change_history(board: Board, issues: list[Issue]) -> pd.DataFrame:
-        workflow_transitions = {k: v
-                                for k, v in IssueTransformer.transform_issues_status_history(issues).items()
-                                if len(v) > 0}
-        df = pd.DataFrame([
-            EPRIssueStatusChangeHistory(
-                efsc_id=k,
-                efsc_board_id=int(board.board_id),
-                efsc_status_name=v1.name,
-                efsc_from_datm=TransformUtils.str_to_date_time(v1.from_date),
-                efsc_to_datm=TransformUtils.str_to_date_time(v1.to_date)
-            ).model_dump()
-            for k, v in workflow_transitions.items() for v1 in v
-        ])
+        transitions = [(k, v1)
+                       for k, v in IssueTransformer.transform_issues_status_history(issues).items()
+                       for v1 in v]
+        if len(transitions) == 0:
+            return pd.DataFrame()
+        BoardPandasTransformer.validate_sample(
+            transitions, lambda t: BoardPandasTransformer.status_change_model(board, t[0], t[1]))
+
+        to_date_time = BoardPandasTransformer.str_to_date_time_column
+        df = pd.DataFrame({
+            'efsc_id': [t[0] for t in transitions],
+            'efsc_board_id': [int(board.board_id)] * len(transitions),
+            'efsc_status_name': [t[1].name for t in transitions],
+            'efsc_from_datm': to_date_time([t[1].from_date for t in transitions]),
+            'efsc_to_datm': to_date_time([t[1].to_date for t in transitions]),
+        })
 
         df["efsc_work_in_days"] = (df["efsc_to_datm"] - df["efsc_from_datm"]).dt.days.astype('Int64')
 
@@ -723,19 +1209,28 @@ class ParquetWriter:
         logger.info(f"Writing entity {entity_name}:{board_id} completed.")
 
 
+@dataclass
+class BoardResult:
+    board_id: str
+    board_name: str
+    duration: float
+    rows: dict[str, int]
+    error: Optional[str] = None
+
+
 class JSMProcessor:
     def __init__(self, jsm_config: JSMConfig):
-        self.config = config
+        self.config = jsm_config
         self.loader = APIDataLoader(jsm_config)
 
     def prepare(self):
         self.loader.prepare()
 
-    def read_board(self, board: Board) -> tuple[BoardConfiguration, list[Sprint], list[Issue]]:
+    def read_board(self, board: Board) -> tuple[BoardConfiguration, list[Sprint], list[Issue], bool]:
         reader = APIDataReader(self.config.raw_location)
-        return self.loader.load_configuration(board), reader.read_sprints(board), reader.read_issues(board)
+        return self.loader.load_configuration(board), reader.read_sprints(board), reader.read_issues(board), True
 
-    def load_board(self, board: Board) -> tuple[BoardConfiguration, list[Sprint], list[Issue]]:
+    def load_board(self, board: Board) -> tuple[BoardConfiguration, list[Sprint], list[Issue], bool]:
         logger.info("Loading board configuration")
         board_configuration = self.loader.load_configuration(board)
         logger.info("Board configuration loaded")
@@ -747,55 +1242,114 @@ class JSMProcessor:
         logger.info("Sprints raw written")
 
         logger.info("Loading issues")
-        issues = self.loader.load_issues(board, board_configuration.filter.id)
-        logger.info(f"Issues loaded: {len(issues)} issues")
-        self.loader.write_issues(board, issues)
-        logger.info("Issues raw written")
+        if self.config.incremental:
+            issues, issues_changed = self.loader.load_issues_incremental(board, board_configuration.filter.id)
+            logger.info(f"Issues loaded: {len(issues)} issues")
+            if issues_changed:
+                self.loader.write_issues(board, issues)
+        else:
+            issues, issues_changed = self.loader.load_and_write_issues(board, board_configuration.filter.id), True
+            logger.info(f"Issues loaded: {len(issues)} issues")
+        if issues_changed:
+            self.loader.write_watermark(board, issues)
+            logger.info("Issues raw written")
 
-        return board_configuration, sprints, issues
+        return board_configuration, sprints, issues, issues_changed
 
-    def process_board(self, board: Board):
+    def process_board(self, board: Board) -> dict[str, int]:
         logger.info(f"====== Processing board: {board.board_id} ====== ")
 
         # fetches data from API, prod version
-        board_configuration, sprints, issues = self.load_board(board)
+        board_configuration, sprints, issues, issues_changed = self.load_board(board)
 
         # reads data from values stored locally, dev version
-        # board_configuration, sprints, issues = self.read_board(board)
+        # board_configuration, sprints, issues, issues_changed = self.read_board(board)
 
         board_columns = BoardConfigurationTransformer.transform_columns(board_configuration)
 
         writer = ParquetWriter(self.config.output_location)
+        rows = {}
 
         sprint_records = BoardPandasTransformer.transform_sprint_records(sprints)
         writer.write_entity(board.board_id, "epr_dim_sprint_records", sprint_records)
+        rows["epr_dim_sprint_records"] = len(sprint_records)
+
+        if not issues_changed:
+            logger.info(f"No issue changes for board {board.board_id}, issue entities are kept")
+            logger.info(f"====== Processing board: {board.board_id} completed ======")
+            return rows
 
         issues_sprints = IssueTransformer.transform_issues_sprints(issues)
         issue_sprints_records = BoardPandasTransformer.transform_issues_sprints(issues_sprints)
         writer.write_entity(board.board_id, "epr_dim_issue_sprints", issue_sprints_records)
+        rows["epr_dim_issue_sprints"] = len(issue_sprints_records)
 
         issue_records = BoardPandasTransformer.transform_issue_records(board, issues, issues_sprints, board_columns)
         writer.write_entity(board.board_id, "epr_dim_issue_records", issue_records)
+        rows["epr_dim_issue_records"] = len(issue_records)
 
         issue_status_change_history = BoardPandasTransformer.transform_issue_status_change_history(board, issues)
         writer.write_entity(board.board_id, "epr_fct_issue_status_change_history", issue_status_change_history)
+        rows["epr_fct_issue_status_change_history"] = len(issue_status_change_history)
 
         logger.info(f"====== Processing board: {board.board_id} completed ======")
+        return rows
+
+    def run_board(self, board: Board) -> BoardResult:
+        start_time = time.time()
+        try:
+            rows = self.process_board(board)
+            return BoardResult(board.board_id, board.board_name, time.time() - start_time, rows)
+        except Exception as e:
+            logger.exception(f"Processing board {board.board_id} failed: {e}")
+            return BoardResult(board.board_id, board.board_name, time.time() - start_time, {}, str(e))
+
+    def process_boards(self, boards: list[Board]) -> list[BoardResult]:
+        """
+        Processes boards in a worker pool, a failed board does not stop the others
+        """
+        logger.info(f"Processing {len(boards)} boards with {self.config.board_workers} workers")
+
+        start_time = time.time()
+        if self.config.board_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.config.board_workers) as executor:
+                results = list(executor.map(self.run_board, boards))
+        else:
+            results = [self.run_board(board) for board in boards]
+        end_time = time.time()
 
-def execute_loader_for_board(board: Board):
-    p.process_board(board)
+        logger.info(f"Processing boards completed in {(end_time - start_time):.2f} seconds")
+        for r in results:
+            logger.info(f"Board {r.board_id} ({r.board_name}): {r.duration:.2f} seconds, rows: {r.rows}"
+                        + (f", error: {r.error}" if r.error is not None else ""))
+
+        return results
+
+
+JOB_ARGS = [
+    'jsm_secret_name',
+    's3_raw_location',
+    's3_output_location'
+]
+OPTIONAL_JOB_ARGS = [
+    'board_workers',
+    'incremental',
+    'http_pool_size',
+    'max_requests_per_second'
+]
 
 if __name__ == "__main__":
-    args = getResolvedOptions(sys.argv,[
-        'jsm_secret_name',
-        's3_raw_location',
-        's3_output_location'
-    ])
+    args = getResolvedOptions(sys.argv, JOB_ARGS + [a for a in OPTIONAL_JOB_ARGS if f'--{a}' in sys.argv])
     jsm_secret_name = args['jsm_secret_name']
     s3_raw_location = args['s3_raw_location']
     s3_output_location = args['s3_output_location']
+    board_workers = int(args.get('board_workers', 1))
+    incremental = str(args.get('incremental', 'false')).lower() == 'true'
+    http_pool_size = int(args['http_pool_size']) if 'http_pool_size' in args else None
+    if 'max_requests_per_second' in args:
+        default_scheduler.set_budget(APIGetClient.HOST_NAME, rate=float(args['max_requests_per_second']))
 
-    config = JSMConfig(jsm_secret_name, s3_raw_location, s3_output_location)
+    config = JSMConfig(jsm_secret_name, s3_raw_location, s3_output_location, board_workers, incremental, http_pool_size)
 
     p = JSMProcessor(config)
 
@@ -804,14 +1358,8 @@ if __name__ == "__main__":
 
     # run for all boards, prod version
     p.prepare()
-    ## runs boards in sequence
-    for config_board in config.boards:
-        p.process_board(config_board)
-
-# option with multiple threads if performance improvement is needed
-'''
-    
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        for config_board in config.boards:
-            executor.submit(execute_loader_for_board, config_board)
-'''
\ No newline at end of file
+    board_results = p.process_boards(config.boards)
+
+    failed_boards = [r.board_id for r in board_results if r.error is not None]
+    if len(failed_boards) > 0:
+        raise RuntimeError(f"Processing failed for boards: {failed_boards}")
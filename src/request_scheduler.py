@@ -0,0 +1,176 @@
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def get_retry_after(headers) -> Optional[float]:
+    """
+    Retry-After header in seconds, the header is either a number of seconds or an HTTP date
+    """
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostBudget:
+    """
+    Token bucket request rate and adaptive concurrency limit of one host.
+    Throttled responses halve the rate and the concurrency and pause the host,
+    latency spikes decrease the concurrency, fast responses ramp both back up to the maximum
+    """
+    LATENCY_SPIKE_FACTOR = 3.0
+    LATENCY_SAMPLES = 5
+    LATENCY_ALPHA = 0.2
+    THROTTLE_PAUSE = 1.0
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int, min_concurrency: int = 1):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency = max(min_concurrency, max_concurrency // 2)
+
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._successes = 0
+        self._latency = None
+        self._latency_samples = 0
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        self._tokens = min(float(self.burst), self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    self._condition.wait(self._paused_until - now)
+                elif self._in_flight >= self.concurrency:
+                    self._condition.wait()
+                elif self._tokens < 1:
+                    self._condition.wait((1 - self._tokens) / self.rate)
+                else:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+
+    def release(self, status_code: Optional[int], elapsed: float, retry_after: Optional[float] = None):
+        """
+        Completes a request, status_code is None if the request failed without response
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if status_code in THROTTLE_STATUSES:
+                self.throttled(retry_after)
+            elif status_code is not None:
+                self.completed(elapsed)
+            self._condition.notify_all()
+
+    def throttled(self, retry_after: Optional[float]):
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0.0)
+        self._successes = 0
+        pause = retry_after if retry_after is not None else HostBudget.THROTTLE_PAUSE
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"Throttled, pause: {pause:.2f} seconds, concurrency: {self.concurrency}, rate: {self.rate:.2f}")
+
+    def completed(self, elapsed: float):
+        spike = self._latency_samples >= HostBudget.LATENCY_SAMPLES and elapsed > self._latency * HostBudget.LATENCY_SPIKE_FACTOR
+        self._latency = elapsed if self._latency is None else self._latency + HostBudget.LATENCY_ALPHA * (elapsed - self._latency)
+        self._latency_samples += 1
+
+        if spike:
+            self.concurrency = max(self.min_concurrency, self.concurrency - 1)
+            self._successes = 0
+            logger.info(f"Latency spike {elapsed:.2f} seconds, concurrency: {self.concurrency}")
+        else:
+            # additive increase once per window of successful requests
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                self.rate = min(self.max_rate, self.rate * 1.5)
+
+
+class RequestScheduler:
+    """
+    Budgets per host, clients sharing a scheduler share the budget of a host
+    """
+    DEFAULT_RATE = 20.0
+    DEFAULT_BURST = 20
+    DEFAULT_MAX_CONCURRENCY = 16
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST, max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self._budgets = {}
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def set_budget(self, host: str, rate: float = None, burst: int = None, max_concurrency: int = None):
+        with self._lock:
+            self._host_limits[host] = (rate or self.rate, burst or self.burst, max_concurrency or self.max_concurrency)
+            self._budgets.pop(host, None)
+
+    def budget(self, host: str) -> HostBudget:
+        with self._lock:
+            if host not in self._budgets:
+                self._budgets[host] = HostBudget(*self._host_limits.get(host, (self.rate, self.burst, self.max_concurrency)))
+            return self._budgets[host]
+
+
+default_scheduler = RequestScheduler()
+
+
+class ScheduledAdapter(HTTPAdapter):
+    """
+    Sends requests within the host budget, throttled responses are retried after the host pause
+    """
+    MAX_THROTTLE_RETRIES = 10
+
+    def __init__(self, scheduler: RequestScheduler = default_scheduler, max_throttle_retries: int = MAX_THROTTLE_RETRIES, **kwargs):
+        self.scheduler = scheduler
+        self.max_throttle_retries = max_throttle_retries
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        budget = self.scheduler.budget(urlsplit(request.url).hostname)
+        for attempt in range(self.max_throttle_retries + 1):
+            budget.acquire()
+            status_code, retry_after = None, None
+            start_time = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+                status_code, retry_after = response.status_code, get_retry_after(response.headers)
+            finally:
+                budget.release(status_code, time.monotonic() - start_time, retry_after)
+
+            if status_code not in THROTTLE_STATUSES or attempt == self.max_throttle_retries:
+                return response
+            response.close()
@@ -1,6 +1,5 @@
 import argparse
 import boto3
-from botocore.exceptions import ClientError
 import datetime
 import re
 from dataclasses import dataclass
@@ -44,14 +43,19 @@ class SplitByDate:
             result.extend([p for p in page['Contents'] if p['Size'] > 0])
         return result
 
-    def file_exists(self, bucket: str, file_name: str) -> bool:
-        try:
-            _ = self.config.s3.head_object(Bucket=bucket, Key=file_name)
-            return True
-        except ClientError:
-            return False
+    def list_target_keys(self) -> set:
+        paginator = self.config.s3.get_paginator('list_objects_v2')
+        operation_parameters = {'Bucket': self.params.bucket.format(self.config.env), 'Prefix': self.params.target_key + '/'}
+
+        result = set()
+        for page in paginator.paginate(**operation_parameters):
+            if page.get('Contents') is not None:
+                result.update([p['Key'] for p in page['Contents']])
+        return result
 
     def get_mapping(self, files: list) -> list:
+        existing_keys = self.list_target_keys()
+
         result = []
         for file in files:
             file_path = file['Key']
@@ -60,7 +64,7 @@ class SplitByDate:
             if match is not None:
                 date = datetime.datetime.strptime(match.group(0), '%Y-%m-%d')
                 target_file_path = f"{self.params.target_key}/year={date.year}/month={date.month:02d}/day={date.day:02d}/{file_name}"
-                if not self.file_exists(self.params.bucket.format(self.config.env), target_file_path):
+                if target_file_path not in existing_keys:
                     result.append((file_path, target_file_path))
                 else:
                     logger.info(f"File already exists: {target_file_path}")
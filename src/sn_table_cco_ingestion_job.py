@@ -31,6 +31,7 @@ ENDPOINT_DEFAULT_PARAMS = {
 }
 
 ENDPOINT_ROWS_LIMIT = 10000
+READ_PARTITIONS = 4
 
 
 class SNTransformer:
@@ -48,6 +49,7 @@ class SNTransformer:
         'duration',
         'u_affected_services',
     ]
+    DATE_COLUMNS = ['begin', 'end']
     LOCAL_TZ = zoneinfo.ZoneInfo('Europe/Berlin')
     UTC_TZ = zoneinfo.ZoneInfo('UTC')
     SN_DATE_FORMAT = '%d.%m.%Y %H:%M:%S'
@@ -61,14 +63,21 @@ class SNTransformer:
             .strftime(SNTransformer.TARGET_DATE_FORMAT)
 
     @staticmethod
-    def transform_to_list(rows: list) -> list:
+    def convert_dates(values: pd.Series) -> pd.Series:
+        return common.convert_date_column(values, SNTransformer.SN_DATE_FORMAT, SNTransformer.TARGET_DATE_FORMAT)
+
+    @staticmethod
+    def select_columns(rows: list) -> list:
+        """
+        Output columns with ServiceNow date values as they are
+        """
         return [
             {
                 SNTransformer.CSV_COLUMNS[0]: r["number"],
                 SNTransformer.CSV_COLUMNS[1]: r["cmdb_ci"],
                 SNTransformer.CSV_COLUMNS[2]: r["type"],
-                SNTransformer.CSV_COLUMNS[3]: SNTransformer.convert_date_str(r["begin"]) if r["begin"] != "" else "",
-                SNTransformer.CSV_COLUMNS[4]: SNTransformer.convert_date_str(r["end"]) if r["end"] != "" else "",
+                SNTransformer.CSV_COLUMNS[3]: r["begin"],
+                SNTransformer.CSV_COLUMNS[4]: r["end"],
                 SNTransformer.CSV_COLUMNS[5]: r["task_number"],
                 SNTransformer.CSV_COLUMNS[6]: u["task_number.cmdb_ci"],
                 SNTransformer.CSV_COLUMNS[7]: u["task_number.short_description"],
@@ -80,6 +89,23 @@ class SNTransformer:
             if (u := json.loads(r['u_custom_export_fields']))
         ]
 
+    @staticmethod
+    def transform_to_list(rows: list) -> list:
+        return [
+            {
+                **r,
+                **{c: SNTransformer.convert_date_str(r[c]) if r[c] != "" else "" for c in SNTransformer.DATE_COLUMNS},
+            }
+            for r in SNTransformer.select_columns(rows)
+        ]
+
+    @staticmethod
+    def convert_columns(df: pd.DataFrame) -> pd.DataFrame:
+        # dates are converted per column, empty dates stay empty
+        for column in SNTransformer.DATE_COLUMNS:
+            df[column] = SNTransformer.convert_dates(df[column])
+        return df
+
     @staticmethod
     def transform_to_csv_rows(lst: list) -> list:
         result = [SNTransformer.CSV_SEPARATOR.join(SNTransformer.CSV_COLUMNS)]
@@ -97,8 +123,9 @@ class SNTransformer:
 
     @staticmethod
     def transform(rows: list) -> pd.DataFrame:
+        # page columns are converted vectorised, transform_to_list converts cell by cell
         return SNTransformer.transform_to_pd(
-            SNTransformer.transform_to_list(rows)
+            SNTransformer.convert_columns(pd.DataFrame(SNTransformer.select_columns(rows)).astype(str))
         )
 
 if __name__ == "__main__":
@@ -111,26 +138,21 @@ if __name__ == "__main__":
     s3_output_file_location = args['s3_output_file_location']
 
     sn_config = common.SNConfig(sn_secret_name, ENDPOINT_TABLE_NAME)
-    reader = common.SNReader(
+    reader = common.SNPartitionedReader(
         endpoint_url=sn_config.url, 
         user_name=sn_config.user_name, 
         password=sn_config.password, 
         endpoint_default_params=ENDPOINT_DEFAULT_PARAMS, 
-        endpoint_rows_limit=ENDPOINT_ROWS_LIMIT)
+        endpoint_rows_limit=ENDPOINT_ROWS_LIMIT,
+        keyset_fields=common.SNReader.KEYSET_DISPLAY_VALUE_FIELDS,
+        partitions=READ_PARTITIONS)
     writer = common.SNWriter(s3_output_file_location)
     writer.prepare()
     logger.info(f"Prepared {s3_output_file_location} for writing")
 
-    for read_rows in reader.read():
-        # read
-        transformed_rows = SNTransformer.transform_to_list(read_rows)
-        logger.info(f"Transformed {len(transformed_rows)} rows")
-
-        # transform
-        transformed_df = SNTransformer.transform_to_pd(transformed_rows)
-
-        # write
-        writer.write_to_bucket(transformed_df)
-        logger.info(f"Wrote {len(transformed_df)} rows to bucket")
+    # read, transform and write stages overlap, the remaining buffered pages are written on exit
+    with writer:
+        pipeline = common.SNPipeline(SNTransformer.transform, writer)
+        pipeline.run(reader.read())
 
     logger.info(f"Finished writing to {s3_output_file_location}")
\ No newline at end of file
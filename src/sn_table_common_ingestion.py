@@ -1,16 +1,25 @@
 import datetime
+import io
+import math
+import queue
+import threading
 import time
 import awswrangler as wr
 import boto3
 import uuid
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
 import logging.config
 import json
-from typing import Generator
+from typing import Callable, Generator, Iterable, Optional
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from requests.auth import HTTPBasicAuth
-from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
+from request_scheduler import RequestScheduler, ScheduledAdapter, default_scheduler
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -66,6 +75,31 @@ def send_e_mail_notification(sns_email_topic_arn: str, e_mail_addresses: list, m
             Message=json.dumps(message)
         )
 
+LOCAL_TZ = 'Europe/Berlin'
+# DST gap of the local time zone, nonexistent local times are moved forward by it
+LOCAL_TZ_DST_GAP = pd.Timedelta(hours=1)
+INITIAL_DATE = pd.Timestamp(1970, 1, 1)
+
+
+def convert_date_column(values: pd.Series, source_format: str, target_format: str, tz: str = LOCAL_TZ) -> pd.Series:
+    """
+    Converts local time strings of the column to UTC time strings, empty values stay empty.
+    Same results as datetime.replace(tzinfo=...).astimezone(UTC): ambiguous times are taken as summer time,
+    nonexistent times are shifted by the DST gap
+    """
+    dates = pd.to_datetime(values, format=source_format)
+    utc_dates = dates.dt.tz_localize(tz, ambiguous=np.ones(len(dates), dtype=bool), nonexistent=LOCAL_TZ_DST_GAP)\
+        .dt.tz_convert('UTC')
+    return utc_dates.dt.strftime(target_format).fillna('')
+
+
+def date_column_to_seconds(values: pd.Series, source_format: str) -> pd.Series:
+    """
+    Converts date strings measured from 1970-01-01 to a number of seconds
+    """
+    return (pd.to_datetime(values, format=source_format) - INITIAL_DATE) // pd.Timedelta(seconds=1)
+
+
 class SNConfig:
     def __init__(self, secret_name: str, table_name: str):
         self.secret = wr.secretsmanager.get_secret_json(secret_name)
@@ -89,11 +123,22 @@ class SNConfig:
 
 
 class SNReader:
-    def __init__(self, endpoint_url: str, user_name: str, password: str, endpoint_default_params: dict, endpoint_rows_limit: int):
+    KEYSET_FIELDS = ('sys_created_on', 'sys_id')
+    # sys_created_on display value is formatted in the time zone of the user and can not be used in a query
+    KEYSET_DISPLAY_VALUE_FIELDS = ('sys_id',)
+
+    def __init__(self, endpoint_url: str, user_name: str, password: str, endpoint_default_params: dict, endpoint_rows_limit: int,
+                 scheduler: RequestScheduler = default_scheduler, keyset_fields: tuple = None):
+        """
+        keyset_fields enables keyset pagination ordered by these fields, the last one must be unique.
+        Values must be returned in the internal format, with display values sys_id alone should be used
+        """
         self.endpoint_url = endpoint_url
         self._auth = HTTPBasicAuth(user_name, password)
         self._endpoint_default_params = endpoint_default_params
         self._endpoint_rows_limit = endpoint_rows_limit
+        self._scheduler = scheduler
+        self._keyset_fields = keyset_fields
 
     def get_session(self) -> requests.Session:
         s = requests.Session()
@@ -102,13 +147,57 @@ class SNReader:
         retries = Retry(
             total=10,
             backoff_factor=0.5,
+            # throttled responses must reach the scheduler, urllib3 only retries connection errors
+            status=0,
+            respect_retry_after_header=False,
         )
-        s.mount('https://', HTTPAdapter(max_retries=retries))
+        # throttled responses are retried by the scheduler within the host budget
+        s.mount('https://', ScheduledAdapter(self._scheduler, max_retries=retries))
 
         return s
 
+    def fetch(self, session: requests.Session, request_params: dict) -> Optional[list]:
+        """
+        Fetches one page, returns None if there is no more data
+        """
+        # encode params manually: avoid standard url encoding because of ServiceNow API specifics
+        encoded_request_params = "&".join([f"{k}={v}" for k, v in request_params.items()])
+        url = f"{self.endpoint_url}?{encoded_request_params}"
+
+        logger.info(f"Reading from ServiceNow with limit: {self._endpoint_rows_limit}, url: {url}")
+        start_time = time.time()
+        response = session.get(url)
+        end_time = time.time()
+        logger.info(f"Reading from ServiceNow completed in {(end_time - start_time):.2f} seconds")
+
+        response.raise_for_status()
+
+        try:
+            response_json = response.json()
+        except ValueError as e:
+            logger.error(f"Response is not a valid JSON: {e}")
+            raise
+
+        if 'error' in response_json:
+            logger.error(f"Error in data response: {response_json['error']}")
+            raise ValueError(f"Error in data response from ServiceNow, see log for details")
+        if 'result' not in response_json or len(response_json['result']) == 0:
+            logger.info("No data read, exiting")
+            return None
+        else:
+            response_result = response_json['result']
+            if isinstance(response_result, list):
+                return response_result
+            else:
+                logger.error(f"Response result is not a list: {str(response_result)}, full response: {response_json}")
+                raise ValueError(f"Response result is invalid, see log for details")
+
     def read(self) -> Generator[list, None, None]:
-        with SNReader.get_session(self) as session:
+        if self._keyset_fields:
+            yield from self.read_keyset()
+            return
+
+        with self.get_session() as session:
             offset = 0
             while True:
                 cycle_params = {
@@ -117,50 +206,407 @@ class SNReader:
                 }
                 request_params = {**self._endpoint_default_params, **cycle_params}
 
-                # encode params manually: avoid standard url encoding because of ServiceNow API specifics
-                encoded_request_params = "&".join([f"{k}={v}" for k, v in request_params.items()])
-                url = f"{self.endpoint_url}?{encoded_request_params}"
+                logger.info(f"Reading page with offset: {offset}")
+                rows = self.fetch(session, request_params)
+                if rows is None:
+                    break
+                offset += len(rows)
+                yield rows
 
-                logger.info(f"Reading from ServiceNow with offset: {offset}, limit: {self._endpoint_rows_limit}, url: {url}")
-                start_time = time.time()
-                response = session.get(url)
-                end_time = time.time()
-                logger.info(f"Reading from ServiceNow completed in {(end_time - start_time):.2f} seconds")
+    @staticmethod
+    def get_filter_query(query: str) -> str:
+        # ordering of the caller is replaced by the keyset ordering
+        if "^NQ" in query:
+            # the keyset condition would only apply to the last NQ branch
+            raise ValueError(f"Keyset pagination does not support queries with ^NQ: {query}")
+        return "^".join([q for q in query.split("^") if q != "" and not q.startswith("ORDERBY")])
 
-                response.raise_for_status()
+    @staticmethod
+    def get_keyset_query(filter_query: str, keyset_fields: tuple, last_key: Optional[tuple]) -> str:
+        """
+        Query continuing after last_key in keyset_fields order:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) ..., every OR branch repeats the filter of the caller
+        """
+        order_by = "^".join([f"ORDERBY{f}" for f in keyset_fields])
+        if last_key is None:
+            return "^".join([q for q in [filter_query, order_by] if q != ""])
 
-                try:
-                    response_json = response.json()
-                except ValueError as e:
-                    logger.error(f"Response is not a valid JSON: {e}")
-                    raise
-
-                if 'error' in response_json:
-                    logger.error(f"Error in data response: {response_json['error']}")
-                    raise ValueError(f"Error in data response from ServiceNow, see log for details")
-                if 'result' not in response_json or len(response_json['result']) == 0:
-                    logger.info("No data read, exiting")
+        branches = []
+        for i, field in enumerate(keyset_fields):
+            conditions = [f"{f}={v}" for f, v in zip(keyset_fields[:i], last_key[:i])] + [f"{field}>{last_key[i]}"]
+            branches.append("^".join([q for q in [filter_query, *conditions] if q != ""]))
+        return "^NQ".join(branches) + "^" + order_by
+
+    def read_keyset(self) -> Generator[list, None, None]:
+        """
+        Pages by the last read key instead of offset, so the page cost does not grow with the position
+        """
+        filter_query = SNReader.get_filter_query(self._endpoint_default_params.get("sysparm_query", ""))
+        fields = self._endpoint_default_params.get("sysparm_fields")
+        if fields is not None:
+            field_list = fields.split(",")
+            fields = ",".join(field_list + [f for f in self._keyset_fields if f not in field_list])
+
+        with self.get_session() as session:
+            last_key = None
+            while True:
+                cycle_params = {
+                    "sysparm_query": SNReader.get_keyset_query(filter_query, self._keyset_fields, last_key),
+                    "sysparm_limit": self._endpoint_rows_limit,
+                    **({} if fields is None else {"sysparm_fields": fields})
+                }
+                request_params = {**self._endpoint_default_params, **cycle_params}
+
+                logger.info(f"Reading page after key: {last_key}")
+                rows = self.fetch(session, request_params)
+                if rows is None:
                     break
-                else:
-                    response_result = response_json['result']
-                    if isinstance(response_result, list):
-                        offset += len(response_result)
-                        yield response_result
+                last_key = tuple(rows[-1][f] for f in self._keyset_fields)
+                yield rows
+
+
+class SNPartitionedReader(SNReader):
+    """
+    Splits the query into sys_created_on ranges and reads them concurrently, every range with its own session.
+    Row count and date bounds are taken from the aggregate API
+    """
+    PARTITION_FIELD = 'sys_created_on'
+    SN_INTERNAL_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+    # pages buffered per partition before partition readers wait for the consumer
+    QUEUE_PAGES_PER_PARTITION = 2
+
+    def __init__(self, endpoint_url: str, user_name: str, password: str, endpoint_default_params: dict, endpoint_rows_limit: int,
+                 scheduler: RequestScheduler = default_scheduler, keyset_fields: tuple = None, partitions: int = 4):
+        super().__init__(endpoint_url, user_name, password, endpoint_default_params, endpoint_rows_limit, scheduler, keyset_fields)
+        self._user_name = user_name
+        self._password = password
+        self._partitions = partitions
+
+    @property
+    def stats_url(self) -> str:
+        return self.endpoint_url.replace('/api/now/table/', '/api/now/stats/')
+
+    def read_stats(self) -> tuple[int, Optional[datetime.datetime], Optional[datetime.datetime]]:
+        """
+        Returns row count and sys_created_on bounds of the query
+        """
+        field = SNPartitionedReader.PARTITION_FIELD
+        request_params = {
+            "sysparm_query": self._endpoint_default_params.get("sysparm_query", ""),
+            "sysparm_count": "true",
+            "sysparm_min_fields": field,
+            "sysparm_max_fields": field,
+        }
+        encoded_request_params = "&".join([f"{k}={v}" for k, v in request_params.items()])
+        url = f"{self.stats_url}?{encoded_request_params}"
+
+        logger.info(f"Reading stats from ServiceNow, url: {url}")
+        with self.get_session() as session:
+            response = session.get(url)
+        response.raise_for_status()
+        stats = response.json()['result']['stats']
+
+        def to_date(value: Optional[str]) -> Optional[datetime.datetime]:
+            return datetime.datetime.strptime(value, SNPartitionedReader.SN_INTERNAL_DATE_FORMAT) if value else None
+
+        count = int(stats.get('count', 0))
+        min_date, max_date = to_date(stats.get('min', {}).get(field)), to_date(stats.get('max', {}).get(field))
+        logger.info(f"Read stats: count={count}, min={min_date}, max={max_date}")
+        return count, min_date, max_date
+
+    @staticmethod
+    def get_range_queries(min_date: datetime.datetime, max_date: datetime.datetime, partitions: int) -> list[str]:
+        """
+        Disjoint sys_created_on conditions covering all rows, the first and the last range are open
+        """
+        field = SNPartitionedReader.PARTITION_FIELD
+        step = (max_date - min_date) / partitions
+        bounds = [(min_date + step * i).strftime(SNPartitionedReader.SN_INTERNAL_DATE_FORMAT) for i in range(1, partitions)]
+        # bounds are truncated to seconds, equal neighbours would produce empty ranges
+        bounds = sorted(set(bounds))
+
+        queries = []
+        for i in range(len(bounds) + 1):
+            conditions = []
+            if i > 0:
+                conditions.append(f"{field}>={bounds[i - 1]}")
+            if i < len(bounds):
+                conditions.append(f"{field}<{bounds[i]}")
+            queries.append("^".join(conditions))
+        return queries
+
+    def get_partition_reader(self, range_query: str) -> SNReader:
+        query = self._endpoint_default_params.get("sysparm_query", "")
+        if "^NQ" in query:
+            raise ValueError(f"Partitioned read does not support queries with ^NQ: {query}")
+        params = {**self._endpoint_default_params, "sysparm_query": "^".join([q for q in [query, range_query] if q != ""])}
+        return SNReader(self.endpoint_url, self._user_name, self._password, params, self._endpoint_rows_limit,
+                        self._scheduler, self._keyset_fields)
+
+    def read(self) -> Generator[list, None, None]:
+        count, min_date, max_date = self.read_stats()
+        partitions = min(self._partitions, math.ceil(count / self._endpoint_rows_limit))
+        if partitions <= 1 or min_date is None or max_date is None or min_date == max_date:
+            yield from super().read()
+            return
+
+        readers = [self.get_partition_reader(q) for q in SNPartitionedReader.get_range_queries(min_date, max_date, partitions)]
+        logger.info(f"Reading {count} rows in {len(readers)} partitions")
+
+        pages = queue.Queue(maxsize=len(readers) * SNPartitionedReader.QUEUE_PAGES_PER_PARTITION)
+        stop = threading.Event()
+        done = object()
+
+        def read_partition(reader: SNReader):
+            try:
+                for rows in reader.read():
+                    while not stop.is_set():
+                        try:
+                            pages.put(rows, timeout=1)
+                            break
+                        except queue.Full:
+                            pass
+                    if stop.is_set():
+                        return
+                pages.put(done)
+            except Exception as e:
+                pages.put(e)
+
+        with ThreadPoolExecutor(max_workers=len(readers)) as executor:
+            for reader in readers:
+                executor.submit(read_partition, reader)
+            try:
+                remaining = len(readers)
+                while remaining > 0:
+                    item = pages.get()
+                    if item is done:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise item
                     else:
-                        logger.error(f"Response result is not a list: {str(response_result)}, full response: {response_json}")
-                        raise ValueError(f"Response result is invalid, see log for details")
+                        yield item
+            finally:
+                stop.set()
+                # unblock partition readers waiting on a full queue
+                while not pages.empty():
+                    pages.get_nowait()
+
+
+@dataclass
+class WriterReport:
+    files: int = 0
+    bytes: int = 0
+    rows: int = 0
 
 
 class SNWriter:
-    def __init__(self, bucket: str):
+    """
+    Buffers pages as Arrow tables and writes one Parquet file per target size instead of one per page.
+    With partition_column set, files are written to Hive partitions {partition_name}=YYYY-MM-DD of its date.
+    write_to_bucket only buffers, the remaining pages are written by flush(), so use the writer as a
+    context manager, which flushes on a clean exit and drops the buffers on an exception.
+    target_file_size is the Parquet file size, estimated from the buffered Arrow size and the compression
+    ratio of the files written so far
+    """
+    TARGET_FILE_SIZE = 128 * 1024 * 1024
+    ROW_GROUP_SIZE = 100000
+    MAX_ROW_GROUPS = 64
+    # Parquet to Arrow size ratio until the first file is written
+    INITIAL_COMPRESSION_RATIO = 0.25
+
+    def __init__(self, bucket: str, target_file_size: int = TARGET_FILE_SIZE, row_group_size: int = ROW_GROUP_SIZE,
+                 max_row_groups: int = MAX_ROW_GROUPS, partition_column: str = None, partition_date_format: str = None,
+                 partition_name: str = 'date'):
         self._bucket = bucket
+        self._target_file_size = target_file_size
+        self._row_group_size = row_group_size
+        self._max_row_groups = max_row_groups
+        self._partition_column = partition_column
+        self._partition_date_format = partition_date_format
+        self._partition_name = partition_name
+        self._buffers = {}
+        self._arrow_bytes = 0
+        self._lock = threading.Lock()
+        self.report = WriterReport()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            with self._lock:
+                self._buffers.clear()
 
     def prepare(self):
         wr.s3.delete_objects(self._bucket)
 
+    def get_partitions(self, df: pd.DataFrame) -> dict[Optional[str], pd.DataFrame]:
+        if self._partition_column is None:
+            return {None: df}
+        dates = pd.to_datetime(df[self._partition_column], format=self._partition_date_format, errors='coerce')
+        values = dates.dt.strftime('%Y-%m-%d').fillna('__HIVE_DEFAULT_PARTITION__')
+        return {value: part.reset_index(drop=True) for value, part in df.groupby(values, sort=False)}
+
+    def get_compression_ratio(self) -> float:
+        return self.report.bytes / self._arrow_bytes if self._arrow_bytes > 0 else SNWriter.INITIAL_COMPRESSION_RATIO
+
     def write_to_bucket(self, df: pd.DataFrame):
+        """
+        Adds the page to the buffer of its partition, the buffer is written when its estimated Parquet size
+        reaches the target size. Buffered pages are not written until flush()
+        """
+        with self._lock:
+            for partition, part in self.get_partitions(df).items():
+                buffer = self._buffers.setdefault(partition, [])
+                buffer.append(pa.Table.from_pandas(part, preserve_index=False))
+                if sum(t.nbytes for t in buffer) * self.get_compression_ratio() >= self._target_file_size or \
+                        sum(t.num_rows for t in buffer) >= self._row_group_size * self._max_row_groups:
+                    self.write_file(partition, self._buffers.pop(partition))
+
+    def flush(self) -> WriterReport:
+        """
+        Writes the buffers of all partitions
+        """
+        with self._lock:
+            for partition in list(self._buffers):
+                self.write_file(partition, self._buffers.pop(partition))
+        logger.info(f"Written {self.report.files} files, {self.report.bytes} bytes, {self.report.rows} rows")
+        return self.report
+
+    def write_file(self, partition: Optional[str], tables: list):
+        table = pa.concat_tables(tables, promote_options="default")
         file_name = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4()}"
-        path = f"{self._bucket.rstrip('/')}/{file_name}"
-        logger.info(f"Writing to {path}")
-        wr.s3.to_parquet(df=df, path=path, index=False)
+        folder = self._bucket.rstrip('/') if partition is None else f"{self._bucket.rstrip('/')}/{self._partition_name}={partition}"
+        path = f"{folder}/{file_name}"
+
+        data = io.BytesIO()
+        pq.write_table(table, data, row_group_size=self._row_group_size, compression='snappy')
+        size = data.tell()
+        data.seek(0)
+
+        logger.info(f"Writing {table.num_rows} rows, {size} bytes to {path}")
+        wr.s3.upload(local_file=data, path=path)
         logger.info("Written")
+
+        self.report.files += 1
+        self.report.bytes += size
+        self.report.rows += table.num_rows
+        self._arrow_bytes += table.nbytes
+
+
+@dataclass
+class PipelineResult:
+    pages: int
+    rows: int
+
+
+class SNPipeline:
+    """
+    Runs read, transform and write stages concurrently with bounded queues between them:
+    a reader thread, a pool of transform threads and the writer in the calling thread.
+    Full queues block the previous stage, so at most queue_size pages wait between two stages.
+    The writer is not flushed, the caller owns it, e.g. runs the pipeline inside `with writer:`
+    """
+    TRANSFORM_WORKERS = 2
+    QUEUE_SIZE = 2
+    # stages check for failures of other stages while waiting on a queue
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, transform: Callable[[list], pd.DataFrame], writer: "SNWriter",
+                 transform_workers: int = TRANSFORM_WORKERS, queue_size: int = QUEUE_SIZE,
+                 read_error_handler: Callable[[Exception], None] = None):
+        self._transform = transform
+        self._writer = writer
+        self._transform_workers = transform_workers
+        self._queue_size = queue_size
+        self._read_error_handler = read_error_handler
+
+    def run(self, pages: Iterable[list]) -> PipelineResult:
+        read_queue = queue.Queue(maxsize=self._queue_size)
+        write_queue = queue.Queue(maxsize=self._queue_size)
+        stop = threading.Event()
+        errors = []
+        done = object()
+
+        def put(q: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=SNPipeline.POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=SNPipeline.POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+            return done
+
+        def fail(e: Exception):
+            errors.append(e)
+            stop.set()
+
+        def read():
+            try:
+                for rows in pages:
+                    if not put(read_queue, rows):
+                        return
+            except Exception as e:
+                logger.error(f"Exception while reading rows from API: {e}")
+                if self._read_error_handler is not None:
+                    self._read_error_handler(e)
+                fail(e)
+                return
+            finally:
+                # stops the partition readers of a generator abandoned after a failure of another stage
+                if hasattr(pages, 'close'):
+                    pages.close()
+            for _ in range(self._transform_workers):
+                put(read_queue, done)
+
+        def transform():
+            try:
+                while (rows := get(read_queue)) is not done:
+                    df = self._transform(rows)
+                    logger.info(f"Transformed {len(df)} rows")
+                    if not put(write_queue, df):
+                        return
+                put(write_queue, done)
+            except Exception as e:
+                logger.error(f"Exception while transforming rows: {e}")
+                fail(e)
+
+        result = PipelineResult(0, 0)
+        threads = [threading.Thread(target=read, daemon=True)] + \
+                  [threading.Thread(target=transform, daemon=True) for _ in range(self._transform_workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            remaining = self._transform_workers
+            while remaining > 0:
+                df = get(write_queue)
+                if df is done:
+                    if stop.is_set():
+                        break
+                    remaining -= 1
+                    continue
+                self._writer.write_to_bucket(df)
+                result.pages += 1
+                result.rows += len(df)
+                logger.info(f"Wrote {len(df)} rows to bucket")
+        except Exception as e:
+            fail(e)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        if len(errors) > 0:
+            raise errors[0]
+        logger.info(f"Pipeline completed: {result.pages} pages, {result.rows} rows")
+        return result
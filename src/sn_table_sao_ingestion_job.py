@@ -17,6 +17,7 @@ ENDPOINT_DEFAULT_PARAMS = {
 }
 
 ENDPOINT_ROWS_LIMIT = 10000
+READ_PARTITIONS = 4
 
 
 class SNTransformer:
@@ -31,6 +32,8 @@ class SNTransformer:
         'scheduled_downtime',
         'scheduled_availability'
     ]
+    DATE_COLUMNS = ['start', 'end']
+    DURATION_COLUMNS = ['allowed_downtime', 'scheduled_downtime']
     LOCAL_TZ = zoneinfo.ZoneInfo('Europe/Berlin')
     UTC_TZ = zoneinfo.ZoneInfo('UTC')
     SN_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
@@ -44,27 +47,58 @@ class SNTransformer:
             .astimezone(SNTransformer.UTC_TZ)\
             .strftime(SNTransformer.TARGET_DATE_FORMAT)
 
+    @staticmethod
+    def convert_dates(values: pd.Series) -> pd.Series:
+        return common.convert_date_column(values, SNTransformer.SN_DATE_FORMAT, SNTransformer.TARGET_DATE_FORMAT)
+
     @staticmethod
     def date_to_duration(date_str: str) -> str:
         return str(int((datetime.datetime.strptime(date_str, SNTransformer.SN_DATE_FORMAT) -
                         SNTransformer.INITIAL_DATE).total_seconds()))
 
     @staticmethod
-    def transform_to_list(rows: list) -> list:
+    def dates_to_durations(values: pd.Series) -> pd.Series:
+        return common.date_column_to_seconds(values, SNTransformer.SN_DATE_FORMAT)
+
+    @staticmethod
+    def select_columns(rows: list) -> list:
+        """
+        Output columns with ServiceNow date and downtime values as they are
+        """
         return [
             {
-                SNTransformer.CSV_COLUMNS[0]: SNTransformer.convert_date_str(r["start"]),
-                SNTransformer.CSV_COLUMNS[1]: SNTransformer.convert_date_str(r["end"]),
+                SNTransformer.CSV_COLUMNS[0]: r["start"],
+                SNTransformer.CSV_COLUMNS[1]: r["end"],
                 SNTransformer.CSV_COLUMNS[2]: r["type"].capitalize(),
                 SNTransformer.CSV_COLUMNS[3]: r["display_name"].split("|")[0].rstrip(),
                 SNTransformer.CSV_COLUMNS[4]: r["display_name"].split("|")[1].lstrip() if len(r["display_name"].split("|")) > 1 else "",
-                SNTransformer.CSV_COLUMNS[5]: SNTransformer.date_to_duration(r["absolute_downtime"]),
-                SNTransformer.CSV_COLUMNS[6]: SNTransformer.date_to_duration(r["scheduled_downtime"]),
+                SNTransformer.CSV_COLUMNS[5]: r["absolute_downtime"],
+                SNTransformer.CSV_COLUMNS[6]: r["scheduled_downtime"],
                 SNTransformer.CSV_COLUMNS[7]: r["scheduled_availability"],
             }
             for r in rows
         ]
 
+    @staticmethod
+    def transform_to_list(rows: list) -> list:
+        return [
+            {
+                **r,
+                **{c: SNTransformer.convert_date_str(r[c]) for c in SNTransformer.DATE_COLUMNS},
+                **{c: SNTransformer.date_to_duration(r[c]) for c in SNTransformer.DURATION_COLUMNS},
+            }
+            for r in SNTransformer.select_columns(rows)
+        ]
+
+    @staticmethod
+    def convert_columns(df: pd.DataFrame) -> pd.DataFrame:
+        # dates and durations are converted per column
+        for column in SNTransformer.DATE_COLUMNS:
+            df[column] = SNTransformer.convert_dates(df[column])
+        for column in SNTransformer.DURATION_COLUMNS:
+            df[column] = SNTransformer.dates_to_durations(df[column])
+        return df
+
     @staticmethod
     def transform_to_csv_rows(lst: list) -> list:
         result = [SNTransformer.CSV_SEPARATOR.join(SNTransformer.CSV_COLUMNS)]
@@ -84,8 +118,9 @@ class SNTransformer:
 
     @staticmethod
     def transform(rows: list) -> pd.DataFrame:
+        # page columns are converted vectorised, transform_to_list converts cell by cell
         return SNTransformer.transform_to_pd(
-            SNTransformer.transform_to_list(rows)
+            SNTransformer.convert_columns(pd.DataFrame(SNTransformer.select_columns(rows)).astype(str))
         )
 
 if __name__ == "__main__":
@@ -100,39 +135,28 @@ if __name__ == "__main__":
     e_mail_sns_topic = args['e_mail_sns_topic']
 
     sn_config = common.SNConfig(sn_secret_name, ENDPOINT_TABLE_NAME)
-    reader = common.SNReader(
+    reader = common.SNPartitionedReader(
         endpoint_url=sn_config.url, 
         user_name=sn_config.user_name, 
         password=sn_config.password, 
         endpoint_default_params=ENDPOINT_DEFAULT_PARAMS, 
-        endpoint_rows_limit=ENDPOINT_ROWS_LIMIT)
+        endpoint_rows_limit=ENDPOINT_ROWS_LIMIT,
+        keyset_fields=common.SNReader.KEYSET_FIELDS,
+        partitions=READ_PARTITIONS)
     writer = common.SNWriter(s3_output_file_location)
     writer.prepare()
     logger.info(f"Prepared {s3_output_file_location} for writing")
 
-    read_iterator = reader.read()
-    while True:
-        try:
-            read_rows = next(read_iterator)
-        except StopIteration:
-            break
-        except Exception as e:
-            logger.error(f"Exception while reading rows from API: {e}")
-            common.send_e_mail_notification(
-                e_mail_sns_topic,
-                sn_config.error_notification_list,
-                f"Exception while reading rows from API: {e}",
-                ENDPOINT_TABLE_NAME)
-            raise
-
-        transformed_rows = SNTransformer.transform_to_list(read_rows)
-        logger.info(f"Transformed {len(transformed_rows)} rows")
-
-        # transform
-        transformed_df = SNTransformer.transform_to_pd(transformed_rows)
-
-        # write
-        writer.write_to_bucket(transformed_df)
-        logger.info(f"Wrote {len(transformed_df)} rows to bucket")
+    def notify_read_error(e: Exception):
+        common.send_e_mail_notification(
+            e_mail_sns_topic,
+            sn_config.error_notification_list,
+            f"Exception while reading rows from API: {e}",
+            ENDPOINT_TABLE_NAME)
+
+    # read, transform and write stages overlap, the remaining buffered pages are written on exit
+    with writer:
+        pipeline = common.SNPipeline(SNTransformer.transform, writer, read_error_handler=notify_read_error)
+        pipeline.run(reader.read())
 
     logger.info(f"Finished writing to {s3_output_file_location}")
\ No newline at end of file
@@ -17,6 +17,7 @@ ENDPOINT_DEFAULT_PARAMS = {
 }
 
 ENDPOINT_ROWS_LIMIT = 10000
+READ_PARTITIONS = 4
 
 
 class SNTransformer:
@@ -76,26 +77,20 @@ if __name__ == "__main__":
     s3_output_file_location = args['s3_output_file_location']
 
     sn_config = common.SNConfig(sn_secret_name, ENDPOINT_TABLE_NAME)
-    reader = common.SNReader(
+    reader = common.SNPartitionedReader(
         endpoint_url=sn_config.url, 
         user_name=sn_config.user_name, 
         password=sn_config.password, 
         endpoint_default_params=ENDPOINT_DEFAULT_PARAMS, 
-        endpoint_rows_limit=ENDPOINT_ROWS_LIMIT)
+        endpoint_rows_limit=ENDPOINT_ROWS_LIMIT,
+        partitions=READ_PARTITIONS)
     writer = common.SNWriter(s3_output_file_location)
     writer.prepare()
     logger.info(f"Prepared {s3_output_file_location} for writing")
 
-    for read_rows in reader.read():
-        # read
-        transformed_rows = SNTransformer.transform_to_list(read_rows)
-        logger.info(f"Transformed {len(transformed_rows)} rows")
-
-        # transform
-        transformed_df = SNTransformer.transform_to_pd(transformed_rows)
-
-        # write
-        writer.write_to_bucket(transformed_df)
-        logger.info(f"Wrote {len(transformed_df)} rows to bucket")
+    # read, transform and write stages overlap, the remaining buffered pages are written on exit
+    with writer:
+        pipeline = common.SNPipeline(SNTransformer.transform, writer)
+        pipeline.run(reader.read())
 
     logger.info(f"Finished writing to {s3_output_file_location}")
\ No newline at end of file
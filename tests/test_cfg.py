@@ -0,0 +1,39 @@
+import threading
+import pytest
+
+import jsm_ingestion_job
+from base.cfg import ServiceDict
+
+
+class FakeSession:
+    def __init__(self):
+        self.created = []
+        self.lock = threading.Lock()
+
+    def client(self, service_name: str, config=None):
+        with self.lock:
+            self.created.append(service_name)
+        return object()
+
+
+def test_service_dict():
+    session = FakeSession()
+    services = ServiceDict(session)
+
+    assert services.get('s3') is services.get('s3')
+    assert services['s3'] is not services['lambda']
+    assert session.created == ['s3', 'lambda']
+
+
+@pytest.mark.parametrize('service_dict', [ServiceDict, jsm_ingestion_job.ServiceDict])
+def test_service_dict_threads(service_dict: type):
+    session = FakeSession()
+    services = service_dict(session)
+
+    threads = [threading.Thread(target=lambda: services.get('s3')) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert session.created == ['s3']
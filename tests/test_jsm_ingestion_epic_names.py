@@ -0,0 +1,69 @@
+import pytest
+from jsm_ingestion_job import APIDataLoader, Board, TTLCache
+
+
+class FakeFetcher:
+    def __init__(self, pages: list = None):
+        self.pages = pages or []
+        self.calls = []
+
+    def iter_issues_for_board(self, board: Board, filter_id: str, updated_since=None):
+        for page in self.pages:
+            yield [{'id': str(i), 'key': f'GOLF-{i}', 'fields': {'summary': f'issue {i}', 'customfield_10005': epic_key}} for i, epic_key in page]
+
+    def fetch_issues_by_keys(self, keys: list[str], fields: str) -> list:
+        self.calls.append(keys)
+        return [{'key': k, 'fields': {'customfield_10006': f'Epic {k}'}} for k in keys if k != 'GOLF-404']
+
+
+@pytest.fixture
+def loader(monkeypatch) -> APIDataLoader:
+    monkeypatch.setattr(APIDataLoader, 'epic_name_cache', TTLCache(maxsize=100, ttl=3600))
+    monkeypatch.setattr(APIDataLoader, 'EPIC_CHUNK_SIZE', 2)
+    result = APIDataLoader.__new__(APIDataLoader)
+    result.fetcher = FakeFetcher()
+    return result
+
+
+def test_resolve_epic_names(loader: APIDataLoader):
+    epic_names = loader.resolve_epic_names(['GOLF-1', 'GOLF-2', 'GOLF-404'])
+
+    assert epic_names == {'GOLF-1': 'Epic GOLF-1', 'GOLF-2': 'Epic GOLF-2', 'GOLF-404': None}
+    assert loader.fetcher.calls == [['GOLF-1', 'GOLF-2'], ['GOLF-404']]
+
+    assert loader.resolve_epic_names(['GOLF-1', 'GOLF-3'])['GOLF-3'] == 'Epic GOLF-3'
+    assert loader.fetcher.calls[-1] == ['GOLF-3']
+
+
+def test_iter_issues_resolves_epics_once(loader: APIDataLoader, monkeypatch):
+    monkeypatch.setattr(APIDataLoader, 'EPIC_PENDING_PAGES', 3)
+    loader.fetcher = FakeFetcher([
+        [(1, 'GOLF-E1'), (2, None)],
+        [(3, 'GOLF-E1')],
+        [(4, 'GOLF-E2'), (5, 'GOLF-E3')],
+        [(6, 'GOLF-E4')],
+        [(7, 'GOLF-E2')],
+        [(8, 'GOLF-E5')],
+    ])
+
+    pages = list(loader.iter_issues(Board('12874', 'GOLF', False, 0, []), '1'))
+
+    assert [[i.key for i in page] for page in pages] == [['GOLF-1', 'GOLF-2'], ['GOLF-3'], ['GOLF-4', 'GOLF-5'], ['GOLF-6'], ['GOLF-7'], ['GOLF-8']]
+    assert {i.key: i.fields.epic_name for page in pages for i in page} == {
+        'GOLF-1': 'Epic GOLF-E1', 'GOLF-2': None, 'GOLF-3': 'Epic GOLF-E1', 'GOLF-4': 'Epic GOLF-E2',
+        'GOLF-5': 'Epic GOLF-E3', 'GOLF-6': 'Epic GOLF-E4', 'GOLF-7': 'Epic GOLF-E2', 'GOLF-8': 'Epic GOLF-E5'}
+    # new keys are collected into full chunks, keys resolved for the board are not searched again
+    assert loader.fetcher.calls == [['GOLF-E1', 'GOLF-E2'], ['GOLF-E3'], ['GOLF-E4', 'GOLF-E5']]
+
+
+def test_ttl_cache():
+    cache = TTLCache(maxsize=2, ttl=3600)
+    cache.put_many({'a': 1, 'b': 2})
+    assert cache.get_many(['a']) == {'a': 1}
+
+    cache.put_many({'c': 3})
+    assert cache.get_many(['a', 'b', 'c']) == {'a': 1, 'c': 3}
+
+    expired = TTLCache(maxsize=2, ttl=-1)
+    expired.put_many({'a': 1})
+    assert expired.get_many(['a']) == {}
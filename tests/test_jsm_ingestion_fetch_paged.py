@@ -0,0 +1,98 @@
+import threading
+import pytest
+from jsm_ingestion_job import APIGetClient
+from request_scheduler import RequestScheduler, ScheduledAdapter
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> dict:
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, rows: list, max_results: int, requests: list):
+        self.rows = rows
+        self.max_results = max_results
+        self.requests = requests
+
+    def get(self, url: str, params: dict) -> FakeResponse:
+        self.requests.append(params['startAt'])
+        start_at, max_results = params['startAt'], min(params['maxResults'], self.max_results)
+        return FakeResponse({
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(self.rows),
+            'issues': self.rows[start_at:start_at + max_results]
+        })
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.mark.parametrize('prefetch_window', [1, 4])
+def test_fetch_paged(monkeypatch, prefetch_window: int):
+    rows = list(range(95))
+    requests = []
+    client = APIGetClient('key', prefetch_window)
+    monkeypatch.setattr(client, 'obtain_session', lambda: FakeSession(rows, 10, requests))
+
+    pages = list(client.fetch_paged('/rest/api/2/search', 50, 'issues'))
+
+    assert [r for page in pages for r in page] == rows
+    assert sorted(requests) == list(range(0, 100, 10)) + [95]
+
+
+def test_session_per_thread(monkeypatch):
+    rows = list(range(25))
+    requests = []
+    threads = []
+    client = APIGetClient('key', 4)
+
+    def obtain_session():
+        threads.append(threading.current_thread().name)
+        return FakeSession(rows, 10, requests)
+    monkeypatch.setattr(client, 'obtain_session', obtain_session)
+
+    for _ in range(3):
+        assert len([r for page in client.fetch_paged('/rest/api/2/search', 10, 'issues') for r in page]) == 25
+
+    assert len(threads) == len(set(threads))
+    assert threads.count(threading.current_thread().name) == 1
+
+
+def test_sessions_share_adapter():
+    client = APIGetClient('key', 4)
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(client.session))
+    thread.start()
+    thread.join()
+
+    assert client.session is client.session
+    assert client.session is not sessions[0]
+    assert client.session.get_adapter('https://jira.sixt.com') is sessions[0].get_adapter('https://jira.sixt.com')
+
+    client.close()
+
+
+def test_session_adapter():
+    scheduler = RequestScheduler()
+    adapter = APIGetClient('key', pool_size=8, scheduler=scheduler).obtain_session().get_adapter('https://jira.sixt.com')
+
+    assert isinstance(adapter, ScheduledAdapter)
+    assert adapter.scheduler is scheduler
+    assert adapter._pool_maxsize == 8
+    assert adapter._pool_block
@@ -0,0 +1,28 @@
+import pytest
+from datetime import datetime
+from jsm_ingestion_job import APIDataLoader, Issue
+
+
+def issue(issue_id: int, summary: str, created: str, updated: str) -> Issue:
+    return Issue.model_validate({
+        'id': issue_id,
+        'key': f'GOLF-{issue_id}',
+        'fields': {'summary': summary, 'created': created, 'updated': updated}
+    })
+
+
+def test_merge_issues():
+    previous = [
+        issue(1, 'old', '2024-01-01T00:00:00.000+0000', '2024-01-02T00:00:00.000+0000'),
+        issue(2, 'kept', '2025-01-01T00:00:00.000+0000', '2025-01-02T00:00:00.000+0000'),
+        issue(3, 'before', '2025-01-01T00:00:00.000+0000', '2025-01-03T00:00:00.000+0000'),
+    ]
+    delta = [
+        issue(3, 'after', '2025-01-01T00:00:00.000+0000', '2025-02-01T00:00:00.000+0000'),
+        issue(4, 'new', '2025-02-01T00:00:00.000+0000', '2025-02-02T00:00:00.000+0000'),
+    ]
+
+    merged = APIDataLoader.merge_issues(previous, delta, datetime(2024, 6, 1))
+
+    assert [(i.id, i.fields.summary) for i in merged] == [(2, 'kept'), (3, 'after'), (4, 'new')]
+    assert APIDataLoader.get_watermark(merged) == '2025-02-02T00:00:00.000+0000'
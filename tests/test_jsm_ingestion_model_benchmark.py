@@ -0,0 +1,67 @@
+import gc
+import os
+import json
+import time
+import pytest
+from jsm_ingestion_job import Issue, get_list_adapter
+
+
+def issue_data(issue_id: int) -> dict:
+    return {
+        'id': str(issue_id),
+        'board_id': '12874',
+        'key': f'GOLF-{issue_id}',
+        'fields': {
+            'summary': f'Issue {issue_id}',
+            'customfield_10002': 3.0,
+            'labels': ['fraud'],
+            'components': [{'id': '1', 'name': 'Backend'}],
+            'issuetype': {'id': '1', 'name': 'Bug'},
+            'resolutiondate': '2025-02-13T10:24:48.000+0000',
+            'resolution': {'id': '1', 'name': 'Fixed'},
+            'status': {'id': '10023', 'name': 'Done'},
+            'customfield_11115': {'value': 'Production'},
+            'created': '2025-02-13T09:24:30.000+0000',
+            'updated': '2025-02-13T10:24:48.000+0000',
+            'project': {'key': 'GOLF'},
+            'customfield_10005': 'GOLF-264',
+            'priority': {'name': 'Medium', 'id': '10000'},
+            'fixVersions': [],
+        },
+        'changelog': {
+            'histories': [{
+                'created': f'2025-02-13T09:{h:02d}:31.381+0000',
+                'author': {'displayName': 'Author'},
+                'items': [
+                    {'field': 'status', 'fromString': 'Backlog', 'toString': 'In Progress', 'from': '10013', 'to': '3'},
+                    {'field': 'Sprint', 'fromString': None, 'toString': 'Sprint 1', 'from': None, 'to': '100'},
+                ]
+            } for h in range(20)]
+        }
+    }
+
+
+def test_issue_model_construction():
+    issues = [issue_data(i) for i in range(100)]
+
+    models = get_list_adapter(Issue).validate_python(issues)
+
+    assert models == [Issue.model_validate_json(json.dumps(d)) for d in issues]
+
+
+@pytest.mark.skipif(os.environ.get('RUN_BENCHMARKS') is None, reason='benchmark, set RUN_BENCHMARKS to run')
+def test_issue_model_construction_benchmark():
+    issues = [issue_data(i) for i in range(10000)]
+
+    gc.collect()
+    start_time = time.perf_counter()
+    json_models = [Issue.model_validate_json(json.dumps(d)) for d in issues]
+    json_elapsed = time.perf_counter() - start_time
+
+    gc.collect()
+    start_time = time.perf_counter()
+    models = get_list_adapter(Issue).validate_python(issues)
+    elapsed = time.perf_counter() - start_time
+
+    assert models == json_models
+    assert elapsed < json_elapsed
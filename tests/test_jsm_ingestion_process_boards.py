@@ -0,0 +1,38 @@
+import threading
+import pytest
+from jsm_ingestion_job import Board, BoardResult, JSMProcessor
+
+
+class FakeConfig:
+    def __init__(self, board_workers: int):
+        self.board_workers = board_workers
+
+
+class FakeProcessor(JSMProcessor):
+    def __init__(self, board_workers: int, failing_board_id: str):
+        self.config = FakeConfig(board_workers)
+        self.failing_board_id = failing_board_id
+        self.processed = []
+        self.lock = threading.Lock()
+
+    def process_board(self, board: Board) -> dict[str, int]:
+        if board.board_id == self.failing_board_id:
+            raise ValueError(f"board {board.board_id} configuration not found")
+        with self.lock:
+            self.processed.append(board.board_id)
+        return {'epr_dim_issue_records': int(board.board_id)}
+
+
+@pytest.mark.parametrize('board_workers', [1, 4])
+def test_process_boards_isolates_failures(board_workers: int):
+    boards = [Board(str(i), f'BOARD{i}', False, 0, []) for i in range(1, 7)]
+    processor = FakeProcessor(board_workers, '3')
+
+    results = processor.process_boards(boards)
+
+    assert [r.board_id for r in results] == [b.board_id for b in boards]
+    assert all(isinstance(r, BoardResult) for r in results)
+    assert results[2].error == "board 3 configuration not found"
+    assert results[2].rows == {}
+    assert sorted(processor.processed) == ['1', '2', '4', '5', '6']
+    assert all(r.error is None and r.rows == {'epr_dim_issue_records': int(r.board_id)} for r in results if r.board_id != '3')
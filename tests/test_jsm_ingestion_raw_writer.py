@@ -0,0 +1,123 @@
+import io
+import json
+import pytest
+import jsm_ingestion_job
+from jsm_ingestion_job import APIDataWriter, APIDataReader, APIDataLoader, Board, Issue, TTLCache
+
+
+class NoSuchKey(Exception):
+    pass
+
+
+class FakeS3:
+    class exceptions:
+        NoSuchKey = NoSuchKey
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.put_count = 0
+        self.events = []
+
+    def put_object(self, Body, Bucket, Key):
+        self.put_count += 1
+        self.objects[(Bucket, Key)] = Body.encode('utf-8') if isinstance(Body, str) else Body
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NoSuchKey(Key)
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def create_multipart_upload(self, Bucket, Key):
+        self.uploads[Key] = {}
+        return {'UploadId': Key}
+
+    def upload_part(self, Body, Bucket, Key, PartNumber, UploadId):
+        self.events.append('part')
+        self.uploads[UploadId][PartNumber] = Body
+        return {'ETag': str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[(Bucket, Key)] = b''.join(parts[p['PartNumber']] for p in MultipartUpload['Parts'])
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    fake_s3 = FakeS3()
+    monkeypatch.setitem(jsm_ingestion_job.aws_services.data, 's3', fake_s3)
+    return fake_s3
+
+
+def issues(count: int):
+    for issue_id in range(count):
+        yield Issue.model_validate({'id': issue_id, 'board_id': 12874, 'key': f'GOLF-{issue_id}', 'fields': {'summary': f'issue {issue_id}' * 20}})
+
+
+def test_write_multipart(s3, monkeypatch):
+    monkeypatch.setattr(APIDataWriter, 'PART_SIZE', 1024)
+    board = Board('12874', 'GOLF', False, 0, [])
+
+    APIDataWriter('s3://bucket/raw/').write_issues(board, issues(5000))
+
+    assert s3.put_count == 0
+    assert len(s3.objects[('bucket', 'raw/issues/12874.jsonl.gz')]) < 5000 * 20
+
+    result = list(APIDataReader('s3://bucket/raw/').iter_entity('issue', board.board_id, Issue))
+    assert [i.id for i in result] == list(range(5000))
+    assert result[-1].fields.summary == 'issue 4999' * 20
+
+
+def test_write_single_part(s3):
+    board = Board('12874', 'GOLF', False, 0, [])
+
+    APIDataWriter('s3://bucket/raw/').write_issues(board, issues(3))
+
+    assert s3.put_count == 1
+    assert [i.key for i in APIDataReader('s3://bucket/raw/').read_issues(board)] == ['GOLF-0', 'GOLF-1', 'GOLF-2']
+
+
+def test_read_previous_format(s3):
+    board = Board('12874', 'GOLF', False, 0, [])
+    s3.put_object(Body=json.dumps({'issues': [i.model_dump(by_alias=True) for i in issues(2)]}), Bucket='bucket', Key='raw/issues/12874.json')
+
+    assert [i.id for i in APIDataReader('s3://bucket/raw/').read_issues(board)] == [0, 1]
+
+    with pytest.raises(FileNotFoundError):
+        APIDataReader('s3://bucket/raw/').read_sprints(board)
+
+
+class FakeFetcher:
+    def __init__(self, events: list):
+        self.events = events
+        self.epic_calls = []
+
+    def iter_issues_for_board(self, board: Board, filter_id: str, updated_since=None):
+        for page in range(10):
+            self.events.append('page')
+            yield [{'id': i, 'key': f'GOLF-{i}', 'fields': {'summary': f'issue {i}' * 20, 'customfield_10005': f'GOLF-E{page % 2}'}}
+                   for i in range(page * 500, (page + 1) * 500)]
+
+    def fetch_issues_by_keys(self, keys: list[str], fields: str) -> list:
+        self.epic_calls.append(keys)
+        return [{'key': k, 'fields': {'customfield_10006': f'Epic {k}'}} for k in keys]
+
+
+def test_load_and_write_issues_streams_pages(s3, monkeypatch):
+    monkeypatch.setattr(APIDataWriter, 'PART_SIZE', 1024)
+    monkeypatch.setattr(APIDataLoader, 'epic_name_cache', TTLCache(maxsize=100, ttl=3600))
+    board = Board('12874', 'GOLF', False, 0, [])
+    loader = APIDataLoader.__new__(APIDataLoader)
+    loader.fetcher = FakeFetcher(s3.events)
+    loader.writer = APIDataWriter('s3://bucket/raw/')
+
+    issues = loader.load_and_write_issues(board, '1')
+
+    assert len(issues) == 5000
+    # parts are uploaded while later pages are still being fetched
+    assert s3.events.index('part') < len(s3.events) - s3.events[::-1].index('page') - 1
+    # epic keys of the first pages are resolved together, later pages reuse the names
+    assert loader.fetcher.epic_calls == [['GOLF-E0', 'GOLF-E1']]
+    written = list(APIDataReader('s3://bucket/raw/').iter_entity('issue', board.board_id, Issue))
+    assert [i.id for i in written] == list(range(5000))
+    assert written[-1].fields.epic_name == 'Epic GOLF-E1'
@@ -216,3 +216,13 @@ def test_transform_sprints(issue: Issue):
 
     assert issue_sprint_history.get(issue.id).active_sprint == 30124
     assert len(issue_sprint_history.get(issue.id).history) == 2
+
+def test_changelog_index(issue: Issue):
+    index = IssueTransformer.changelog_index(issue)
+
+    assert [h.to_status for h in index.status_history] == ["Selected for Development", "In Progress", "In Review", "Done"]
+    assert index.sprint_values == [None, "30034", "30034", "30124"]
+    assert IssueTransformer.changelog_index(issue) is index
+
+    IssueTransformer.transform_status_history(issue)
+    assert len(index.status_history) == 4
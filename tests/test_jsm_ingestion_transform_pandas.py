@@ -0,0 +1,86 @@
+import io
+import pytest
+import pandas as pd
+from jsm_ingestion_job import Board, BoardPandasTransformer, Issue, IssueTransformer, Sprint, get_list_adapter
+
+
+BOARD = Board('12874', 'GOLF', True, 50, [])
+
+
+def issue_data(issue_id: int) -> dict:
+    return {
+        'id': issue_id,
+        'key': f'GOLF-{issue_id}',
+        'fields': {
+            'summary': f'Issue {issue_id}',
+            'customfield_10002': 3.0 if issue_id % 2 == 0 else None,
+            'labels': ['fraud'] if issue_id % 3 == 0 else None,
+            'components': [{'name': 'Backend'}],
+            'issuetype': {'name': 'Bug'},
+            'flagged': issue_id % 4 == 0,
+            'resolutiondate': '2025-02-13T10:24:48.000+0000' if issue_id % 2 == 0 else None,
+            'status': {'id': '10023', 'name': 'Done'},
+            'created': '2025-02-13T09:24:30.000+0000' if issue_id % 5 else '2025-02-12T09:24:30.123Z',
+            'project': {'key': 'GOLF'},
+            'fixVersions': [],
+        },
+        'changelog': {
+            'histories': [
+                {'created': '2025-02-14T09:27:35.014+0000', 'items': [
+                    {'field': 'status', 'fromString': 'Backlog', 'toString': 'In Progress'},
+                    {'field': 'Sprint', 'from': None, 'to': '100'},
+                ]},
+                {'created': '2025-02-20T10:24:43.348+0000', 'items': [
+                    {'field': 'status', 'fromString': 'In Progress', 'toString': 'Done'},
+                ]},
+            ] if issue_id % 2 == 0 else []
+        }
+    }
+
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def issues() -> list[Issue]:
+    return get_list_adapter(Issue).validate_python([issue_data(i) for i in range(1, 21)])
+
+
+def test_transform_issue_records(issues: list[Issue]):
+    issues_sprints = IssueTransformer.transform_issues_sprints(issues)
+    columns = {10023: 'Done'}
+
+    df = BoardPandasTransformer.transform_issue_records(BOARD, issues, issues_sprints, columns)
+    expected = pd.DataFrame([BoardPandasTransformer.issue_record_model(BOARD, iss, issues_sprints, columns).model_dump() for iss in issues])
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert to_parquet_bytes(df) == to_parquet_bytes(expected)
+
+
+def test_transform_issue_status_change_history(issues: list[Issue]):
+    df = BoardPandasTransformer.transform_issue_status_change_history(BOARD, issues)
+
+    transitions = IssueTransformer.transform_issues_status_history(issues)
+    expected = pd.DataFrame([BoardPandasTransformer.status_change_model(BOARD, k, v1).model_dump()
+                             for k, v in transitions.items() for v1 in v])
+
+    assert list(df.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(df.iloc[:, :5], expected.iloc[:, :5])
+    assert df['efsc_work_in_days'].iloc[:3].tolist() == [1, 6, pd.NA]
+    assert df['efsc_work_in_days_weekend_excluded'].iloc[:3].tolist() == [1, 4, pd.NA]
+
+
+def test_transform_sprint_records():
+    sprints = get_list_adapter(Sprint).validate_python([
+        {'id': 1, 'board_id': 12874, 'name': 'Sprint 1', 'startDate': '2025-02-13T09:24:30.000Z'},
+        {'id': 2, 'board_id': 12874, 'name': 'Sprint 2'},
+    ])
+
+    df = BoardPandasTransformer.transform_sprint_records(sprints)
+    expected = pd.DataFrame([BoardPandasTransformer.sprint_record_model(s).model_dump() for s in sprints])
+
+    pd.testing.assert_frame_equal(df, expected)
+    assert to_parquet_bytes(df) == to_parquet_bytes(expected)
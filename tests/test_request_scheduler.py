@@ -0,0 +1,126 @@
+import io
+import time
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import requests
+from requests.adapters import HTTPAdapter
+from request_scheduler import HostBudget, RequestScheduler, ScheduledAdapter, get_retry_after
+from jsm_ingestion_job import APIGetClient
+from sn_table_common_ingestion import SNReader
+
+
+def test_token_bucket_rate():
+    budget = HostBudget(rate=50, burst=1, max_concurrency=4)
+
+    start_time = time.monotonic()
+    for _ in range(11):
+        budget.acquire()
+        budget.release(200, 0.01)
+
+    assert time.monotonic() - start_time >= 0.18
+
+
+def test_throttled():
+    budget = HostBudget(rate=100, burst=10, max_concurrency=8)
+    assert budget.concurrency == 4
+
+    budget.acquire()
+    budget.release(429, 0.01, 0.2)
+
+    assert budget.concurrency == 2
+    assert budget.rate == 50
+
+    start_time = time.monotonic()
+    budget.acquire()
+    assert time.monotonic() - start_time >= 0.15
+    budget.release(200, 0.01)
+
+
+def test_ramp_up_and_latency_spike():
+    budget = HostBudget(rate=1000, burst=1000, max_concurrency=8)
+
+    for _ in range(100):
+        budget.acquire()
+        budget.release(200, 0.01)
+    assert budget.concurrency == 8
+
+    budget.acquire()
+    budget.release(200, 1.0)
+    assert budget.concurrency == 7
+
+
+def test_budget_per_host():
+    scheduler = RequestScheduler(rate=10)
+    scheduler.set_budget('jira.sixt.com', rate=5, max_concurrency=2)
+
+    assert scheduler.budget('jira.sixt.com') is scheduler.budget('jira.sixt.com')
+    assert scheduler.budget('jira.sixt.com').max_rate == 5
+    assert scheduler.budget('jira.sixt.com').max_concurrency == 2
+    assert scheduler.budget('sixt.service-now.com').max_rate == 10
+
+
+def test_get_retry_after():
+    assert get_retry_after({'Retry-After': '3'}) == 3
+    assert get_retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0
+    assert get_retry_after({}) is None
+
+
+def test_adapter_retries_throttled(monkeypatch):
+    statuses = [429, 503, 200]
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = statuses.pop(0)
+        response.raw = io.BytesIO(b'')
+        response.headers['Retry-After'] = '0'
+        return response
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+
+    scheduler = RequestScheduler()
+    session = requests.Session()
+    session.mount('https://', ScheduledAdapter(scheduler))
+
+    assert session.get('https://jira.sixt.com/rest/api/2/search').status_code == 200
+    assert statuses == []
+    assert scheduler.budget('jira.sixt.com').concurrency == 2
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        ThrottlingHandler.hits += 1
+        self.send_response(429)
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def throttling_server():
+    server = HTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    ThrottlingHandler.hits = 0
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+@pytest.mark.parametrize('get_session', [
+    lambda scheduler: APIGetClient('key', scheduler=scheduler).obtain_session(),
+    lambda scheduler: SNReader('https://sn/api/now/table/t', 'user', 'password', {}, 10, scheduler=scheduler).get_session(),
+])
+def test_client_throttled_retries_by_scheduler_only(throttling_server: str, get_session):
+    scheduler = RequestScheduler()
+    # adapter of the client, mounted for the plain http test server
+    adapter = get_session(scheduler).get_adapter('https://host')
+    adapter.max_throttle_retries = 2
+    session = requests.Session()
+    session.mount('http://', adapter)
+
+    assert session.get(throttling_server).status_code == 429
+    assert ThrottlingHandler.hits == 3
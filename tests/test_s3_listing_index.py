@@ -0,0 +1,138 @@
+import pytest
+import sqlite3
+import datetime
+
+from types import SimpleNamespace
+from base.s3_listing_index import S3ListingIndex
+from base.base_s3_to_event import BaseS3ToEvent, S3ToEventParams
+
+
+class FakePaginator:
+    def __init__(self, objects: list, page_size: int):
+        self.objects = objects
+        self.page_size = page_size
+        self.calls = []
+
+    def paginate(self, Bucket: str, Prefix: str, StartAfter: str = None):
+        self.calls.append(StartAfter)
+        keys = sorted([o for o in self.objects if o['Key'].startswith(Prefix) and (StartAfter is None or o['Key'] > StartAfter)],
+                      key=lambda o: o['Key'])
+        for i in range(0, len(keys), self.page_size):
+            yield {'Contents': keys[i:i + self.page_size]}
+        if len(keys) == 0:
+            yield {}
+
+
+class FakeS3:
+    def __init__(self, objects: list, page_size: int = 2):
+        self.paginator = FakePaginator(objects, page_size)
+
+    def get_paginator(self, _):
+        return self.paginator
+
+
+def s3_object(key: str, size: int = 10) -> dict:
+    return {'Key': key, 'Size': size, 'ETag': f'"{key}"', 'LastModified': datetime.datetime(2024, 1, 1)}
+
+
+@pytest.fixture
+def listing_index(tmp_path) -> S3ListingIndex:
+    with S3ListingIndex(str(tmp_path / S3ListingIndex.DB_FILE_NAME)) as index:
+        yield index
+
+
+def test_refresh_incremental(listing_index: S3ListingIndex):
+    s3 = FakeS3([s3_object('data/a.csv'), s3_object('data/b.csv'), s3_object('data/c.csv'), s3_object('other/x.csv')])
+
+    assert listing_index.refresh(s3, 'bucket', 'data/') == 3
+    assert listing_index.get_last_key('bucket', 'data/') == 'data/c.csv'
+
+    s3.paginator.objects.append(s3_object('data/d.csv'))
+    assert listing_index.refresh(s3, 'bucket', 'data/') == 1
+    assert s3.paginator.calls == [None, 'data/c.csv']
+
+    assert listing_index.list_keys('bucket', 'data/') == ['data/a.csv', 'data/b.csv', 'data/c.csv', 'data/d.csv']
+    objects = listing_index.list_objects('bucket', 'data/')
+    assert objects[0] == {'Key': 'data/a.csv', 'Size': 10, 'ETag': '"data/a.csv"', 'LastModified': '2024-01-01T00:00:00'}
+
+
+def test_refresh_full(listing_index: S3ListingIndex):
+    s3 = FakeS3([s3_object('data/a.csv'), s3_object('data/b.csv')])
+    listing_index.refresh(s3, 'bucket', 'data/')
+
+    s3.paginator.objects.pop(0)
+    assert listing_index.refresh(s3, 'bucket', 'data/', full=True) == 1
+    assert listing_index.list_keys('bucket', 'data/') == ['data/b.csv']
+
+
+def test_refresh_empty_prefix(listing_index: S3ListingIndex):
+    s3 = FakeS3([])
+    assert listing_index.refresh(s3, 'bucket', 'data/') == 0
+    assert listing_index.get_last_key('bucket', 'data/') is None
+    assert listing_index.list_objects('bucket', 'data/') == []
+
+
+def test_refresh_partition_out_of_order(listing_index: S3ListingIndex):
+    s3 = FakeS3([s3_object('out/year=2024/month=01/day=01/b.csv'), s3_object('out/year=2024/month=01/day=02/c.csv')])
+    listing_index.refresh(s3, 'bucket', 'out/')
+
+    # keys of the latest partition are listed again, in any order
+    s3.paginator.objects.append(s3_object('out/year=2024/month=01/day=02/a.csv'))
+    s3.paginator.objects.append(s3_object('out/year=2024/month=01/day=03/d.csv'))
+    assert listing_index.refresh(s3, 'bucket', 'out/') == 3
+    assert s3.paginator.calls[-1] == 'out/year=2024/month=01/day=02/'
+    assert listing_index.get_last_key('bucket', 'out/') == 'out/year=2024/month=01/day=03/d.csv'
+    assert len(listing_index.list_keys('bucket', 'out/')) == 4
+
+
+def test_refresh_full_interval(listing_index: S3ListingIndex):
+    s3 = FakeS3([s3_object('out/b.csv'), s3_object('out/c.csv')])
+    listing_index.refresh(s3, 'bucket', 'out/')
+
+    s3.paginator.objects.append(s3_object('out/a.csv'))
+    s3.paginator.objects.remove(s3.paginator.objects[0])
+    listing_index.refresh(s3, 'bucket', 'out/')
+    assert listing_index.list_keys('bucket', 'out/') == ['out/b.csv', 'out/c.csv']
+
+    listing_index.full_refresh_interval = 0
+    listing_index.refresh(s3, 'bucket', 'out/')
+    assert listing_index.list_keys('bucket', 'out/') == ['out/a.csv', 'out/c.csv']
+    assert s3.paginator.calls == [None, 'out/c.csv', None]
+
+
+def test_previous_schema(tmp_path):
+    db_file_name = str(tmp_path / S3ListingIndex.DB_FILE_NAME)
+    connection = sqlite3.connect(db_file_name)
+    connection.execute('CREATE TABLE s3_prefixes (bucket TEXT NOT NULL, prefix TEXT NOT NULL, last_key TEXT, refreshed_at TEXT, '
+                       'PRIMARY KEY (bucket, prefix))')
+    connection.execute("INSERT INTO s3_prefixes VALUES ('bucket', 'data/', 'data/a.csv', '2024-01-01T00:00:00')")
+    connection.commit()
+    connection.close()
+
+    with S3ListingIndex(db_file_name) as listing_index:
+        assert listing_index.is_full_refresh_due('bucket', 'data/')
+        s3 = FakeS3([s3_object('data/a.csv')])
+        listing_index.refresh(s3, 'bucket', 'data/')
+        assert s3.paginator.calls == [None]
+        assert not listing_index.is_full_refresh_due('bucket', 'data/')
+
+
+class IndexedS3ToEvent(BaseS3ToEvent):
+    pass
+
+
+def test_indexed_listing_incremental(listing_index: S3ListingIndex):
+    s3 = FakeS3([s3_object('in/c_timestamp=1.csv'), s3_object('out/year=2024/month=01/day=01/c_timestamp=1.csv')])
+    s3_to_event = IndexedS3ToEvent(SimpleNamespace(s3=s3), S3ToEventParams('dev', 'in-{}', 'in/', 'out-{}', 'out/', None, 3),
+                                   listing_index)
+
+    assert [f['Key'] for f in s3_to_event.list_files()] == ['in/c_timestamp=1.csv']
+    assert s3_to_event.list_output_file_names('bucket', 'out/') == ['out/year=2024/month=01/day=01/c_timestamp=1.csv']
+
+    s3.paginator.objects.append(s3_object('in/d_timestamp=1.csv'))
+    s3.paginator.objects.append(s3_object('out/year=2024/month=01/day=01/a_timestamp=2.csv'))
+    s3.paginator.calls.clear()
+    assert [f['Key'] for f in s3_to_event.list_files()] == ['in/c_timestamp=1.csv', 'in/d_timestamp=1.csv']
+    assert s3_to_event.list_output_file_names('bucket', 'out/') == ['out/year=2024/month=01/day=01/a_timestamp=2.csv',
+                                                                    'out/year=2024/month=01/day=01/c_timestamp=1.csv']
+    assert s3.paginator.calls == ['in/c_timestamp=1.csv', 'out/year=2024/month=01/day=01/']
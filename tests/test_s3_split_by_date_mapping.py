@@ -0,0 +1,99 @@
+import os
+import re
+import time
+import pytest
+
+from base.base_s3_split_by_date import BaseS3SplitByDate, S3SplitByDateParams
+
+
+class FakePaginator:
+    def __init__(self, keys: list):
+        self.keys = keys
+        self.prefixes = []
+
+    def paginate(self, Bucket: str, Prefix: str):
+        self.prefixes.append(Prefix)
+        yield {'Contents': [{'Key': k} for k in self.keys if k.startswith(Prefix)]}
+
+
+class FakeS3:
+    def __init__(self, keys: list):
+        self.paginator = FakePaginator(keys)
+
+    def get_paginator(self, _):
+        return self.paginator
+
+    def head_object(self, Bucket: str, Key: str):
+        raise AssertionError('head_object should not be called')
+
+
+class FakeConfig:
+    def __init__(self, s3: FakeS3):
+        self.env = 'dev'
+        self.s3 = s3
+
+
+def source_file(date: str) -> dict:
+    return {'Key': f'src/file_{date}.csv', 'Size': 1}
+
+
+@pytest.fixture
+def params() -> S3SplitByDateParams:
+    return S3SplitByDateParams('dev', False, 'bucket-{}', 'src', 'tgt', r'\d{4}-\d{2}-\d{2}', date_shift=1)
+
+
+def test_get_mapping(params: S3SplitByDateParams):
+    s3 = FakeS3(['tgt/year=2024/month=01/day=02/file_2024-01-01.csv'])
+    split_by_date = BaseS3SplitByDate(FakeConfig(s3), params)
+
+    mapping = split_by_date.get_mapping([source_file('2024-01-01'), source_file('2024-01-31'), {'Key': 'src/no_date.csv', 'Size': 1}])
+
+    assert mapping == [('src/file_2024-01-31.csv', 'tgt/year=2024/month=02/day=01/file_2024-01-31.csv')]
+    assert s3.paginator.prefixes == ['tgt/year=2024/month=01/day=02/', 'tgt/year=2024/month=02/day=01/']
+
+
+def test_get_mapping_many_partitions(params: S3SplitByDateParams):
+    s3 = FakeS3([])
+    split_by_date = BaseS3SplitByDate(FakeConfig(s3), params)
+
+    files = [source_file(f'2024-{m:02d}-{d:02d}') for m in range(1, 13) for d in range(1, 29)]
+    mapping = split_by_date.get_mapping(files)
+
+    assert len(mapping) == len(files)
+    assert s3.paginator.prefixes == ['tgt/']
+
+
+def test_get_mapping_parses_each_date_once(params: S3SplitByDateParams, monkeypatch):
+    s3 = FakeS3([])
+    compiled = []
+    original_compile = re.compile
+    monkeypatch.setattr(re, 'compile', lambda *args: compiled.append(args) or original_compile(*args))
+    split_by_date = BaseS3SplitByDate(FakeConfig(s3), params)
+
+    dates = [f'2024-{m:02d}-{d:02d}' for m in range(1, 13) for d in range(1, 29)]
+    files = [{'Key': f'src/file_{i}_{dates[i % len(dates)]}.csv', 'Size': 1} for i in range(10_000)]
+    partition_tokens = []
+    get_partition_path = split_by_date.get_partition_path
+    monkeypatch.setattr(split_by_date, 'get_partition_path', lambda token: partition_tokens.append(token) or get_partition_path(token))
+
+    mapping = split_by_date.get_mapping(files)
+
+    assert len(mapping) == len(files)
+    assert len(compiled) == 1
+    assert sorted(partition_tokens) == sorted(dates)
+
+
+@pytest.mark.skipif(os.environ.get('RUN_BENCHMARKS') is None, reason='benchmark, set RUN_BENCHMARKS to run')
+def test_get_mapping_benchmark(params: S3SplitByDateParams):
+    s3 = FakeS3([])
+    split_by_date = BaseS3SplitByDate(FakeConfig(s3), params)
+
+    dates = [f'2024-{m:02d}-{d:02d}' for m in range(1, 13) for d in range(1, 29)]
+    files = [{'Key': f'src/file_{i}_{dates[i % len(dates)]}.csv', 'Size': 1} for i in range(500_000)]
+
+    start_time = time.perf_counter()
+    mapping = split_by_date.get_mapping(files)
+    elapsed = time.perf_counter() - start_time
+
+    assert len(mapping) == len(files)
+    assert elapsed < 1.0
@@ -0,0 +1,96 @@
+import threading
+import pytest
+from boto3.exceptions import S3UploadFailedError
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+from base.base_s3_split_by_date import BaseS3SplitByDate, S3SplitByDateParams
+
+
+class FakeS3:
+    def __init__(self, failing_keys: dict, error: Exception = None):
+        self.failing_keys = failing_keys
+        self.error = error or ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Slow down'}}, 'CopyObject')
+        self.copied = []
+        self.multipart_copied = []
+        self.delete_calls = []
+        self.lock = threading.Lock()
+
+    def _fail(self, key: str):
+        with self.lock:
+            if self.failing_keys.get(key, 0) > 0:
+                self.failing_keys[key] -= 1
+                raise self.error
+
+    def copy_object(self, CopySource: dict, Bucket: str, Key: str):
+        self._fail(CopySource['Key'])
+        with self.lock:
+            self.copied.append((CopySource['Key'], Key))
+
+    def copy(self, copy_source: dict, bucket: str, key: str):
+        self._fail(copy_source['Key'])
+        with self.lock:
+            self.multipart_copied.append((copy_source['Key'], key))
+
+    def delete_objects(self, Bucket: str, Delete: dict) -> dict:
+        self.delete_calls.append([o['Key'] for o in Delete['Objects']])
+        return {}
+
+
+class FakeConfig:
+    def __init__(self, s3: FakeS3):
+        self.env = 'dev'
+        self.s3 = s3
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(BaseS3SplitByDate, 'RETRY_BACKOFF', 0)
+
+
+def test_move_files():
+    s3 = FakeS3({'src/1.csv': 1, 'src/2.csv': 10})
+    params = S3SplitByDateParams('dev', False, 'bucket-{}', 'src', 'tgt', r'\d{4}-\d{2}-\d{2}', move_concurrency=4)
+    split_by_date = BaseS3SplitByDate(FakeConfig(s3), params)
+
+    mapping = [(f'src/{i}.csv', f'tgt/{i}.csv') for i in range(1500)]
+    sizes = {f'src/{i}.csv': 1 for i in range(1500)}
+    sizes['src/0.csv'] = BaseS3SplitByDate.MULTIPART_COPY_THRESHOLD
+    results = split_by_date.move_files(mapping, sizes)
+
+    assert s3.multipart_copied == [('src/0.csv', 'tgt/0.csv')]
+    assert len(s3.copied) == 1498
+    assert [len(c) for c in s3.delete_calls] == [1000, 499]
+    assert 'src/2.csv' not in [k for c in s3.delete_calls for k in c]
+
+    assert results[1].attempts == 2 and results[1].error is None
+    assert results[2].attempts == BaseS3SplitByDate.MAX_ATTEMPTS and results[2].error is not None
+    assert 'errors: 1' in BaseS3SplitByDate.summarize(results, 1.0)
+
+
+@pytest.mark.parametrize('error', [
+    EndpointConnectionError(endpoint_url='https://s3.eu-central-1.amazonaws.com'),
+    S3UploadFailedError('Failed to upload'),
+])
+def test_move_files_transfer_errors(error: Exception):
+    s3 = FakeS3({'src/1.csv': 1, 'src/2.csv': 10}, error)
+    params = S3SplitByDateParams('dev', False, 'bucket-{}', 'src', 'tgt', r'\d{4}-\d{2}-\d{2}', move_concurrency=2)
+    split_by_date = BaseS3SplitByDate(FakeConfig(s3), params)
+
+    mapping = [(f'src/{i}.csv', f'tgt/{i}.csv') for i in range(3)]
+    results = split_by_date.move_files(mapping, {k: 1 for k, _ in mapping})
+
+    assert [r.error is None for r in results] == [True, True, False]
+    assert s3.delete_calls == [['src/0.csv', 'src/1.csv']]
+
+
+def test_copy_backoff(monkeypatch):
+    delays = []
+    monkeypatch.setattr(BaseS3SplitByDate, 'RETRY_BACKOFF', 0.5)
+    monkeypatch.setattr('base.base_s3_split_by_date.time.sleep', delays.append)
+    params = S3SplitByDateParams('dev', False, 'bucket-{}', 'src', 'tgt', r'\d{4}-\d{2}-\d{2}')
+    split_by_date = BaseS3SplitByDate(FakeConfig(FakeS3({'src/1.csv': 10})), params)
+
+    result = split_by_date.move_files([('src/1.csv', 'tgt/1.csv')], {'src/1.csv': 1})[0]
+
+    assert result.attempts == BaseS3SplitByDate.MAX_ATTEMPTS and result.error is not None
+    assert delays == [0.5, 1.0]
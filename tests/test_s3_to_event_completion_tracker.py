@@ -0,0 +1,134 @@
+import json
+import pytest
+from types import SimpleNamespace
+
+import base.base_s3_to_event as base_s3_to_event
+
+from base.base_s3_to_event import BaseS3ToEvent, S3ToEventParams, CompletionTracker, LambdaInvocationResult, s3_to_event_run_automated
+
+
+class FakePaginator:
+    def __init__(self, s3):
+        self.s3 = s3
+
+    def paginate(self, Bucket: str, Prefix: str):
+        self.s3.prefixes.append(Prefix)
+        yield {'Contents': [{'Key': k, 'Size': 1} for k in self.s3.keys if k.startswith(Prefix)]}
+
+
+class FakeS3:
+    def __init__(self):
+        self.keys = []
+        self.prefixes = []
+
+    def get_paginator(self, name: str) -> FakePaginator:
+        return FakePaginator(self)
+
+
+class FakeS3ToEvent(BaseS3ToEvent):
+    def __init__(self, params: S3ToEventParams):
+        super().__init__(SimpleNamespace(s3=FakeS3(), data_path=None, env='dev'), params)
+        self.files = []
+
+    @property
+    def output_file_names(self) -> list:
+        return self.config.s3.keys
+
+    @output_file_names.setter
+    def output_file_names(self, keys: list):
+        self.config.s3.keys = keys
+
+    def get_files_to_process(self) -> list:
+        done = {BaseS3ToEvent.extract_file_name(k) for k in self.output_file_names}
+        return [f for f in self.files if BaseS3ToEvent.extract_file_name(f['Key']) not in done]
+
+
+@pytest.fixture
+def s3_to_event() -> FakeS3ToEvent:
+    return FakeS3ToEvent(S3ToEventParams('dev', 'in-{}', 'data', 'out-{}', 'out', None, 3))
+
+
+def input_file(name: str) -> dict:
+    return {'Key': f'data/{name}_timestamp=2024-01-01T00:00:00.csv', 'Size': 1}
+
+
+def test_check(s3_to_event: FakeS3ToEvent):
+    tracker = CompletionTracker(s3_to_event, 900)
+    files = [input_file('a'), input_file('b'), input_file('c')]
+    tracker.add(files, [
+        LambdaInvocationResult(files[0]['Key'], 200, None, None, 0.1),
+        LambdaInvocationResult(files[1]['Key'], 200, 'Unhandled', '{}', 0.1),
+        LambdaInvocationResult(files[2]['Key'], 200, None, None, 0.1),
+    ])
+    assert tracker.failed == [files[1]['Key']]
+    assert set(tracker.in_flight.keys()) == {'a', 'c'}
+
+    s3_to_event.output_file_names = ['out/a_timestamp=2024-01-02T00:00:00.csv', 'out/other_timestamp=2024-01-02T00:00:00.csv']
+    assert tracker.check() == 1
+    assert tracker.completed == [files[0]['Key']]
+    assert set(tracker.in_flight.keys()) == {'c'}
+    assert s3_to_event.config.s3.prefixes == ['out']
+
+
+def test_check_partitioned_output(s3_to_event: FakeS3ToEvent):
+    tracker = CompletionTracker(s3_to_event, 900)
+    files = [input_file('a'), input_file('b')]
+    tracker.add(files, [])
+
+    s3_to_event.output_file_names = ['out/year=2024/month=01/day=02/a_timestamp=2024-01-02T00:00:00.csv']
+    assert tracker.check() == 1
+    assert tracker.completed == [files[0]['Key']]
+    assert set(tracker.in_flight.keys()) == {'b'}
+
+
+def test_check_deadline(s3_to_event: FakeS3ToEvent):
+    tracker = CompletionTracker(s3_to_event, 0)
+    files = [input_file('a')]
+    tracker.add(files, [])
+
+    assert tracker.check() == 0
+    assert tracker.stragglers == [files[0]['Key']]
+    assert len(tracker.in_flight) == 0
+
+
+def test_params_in_flight_limit():
+    assert S3ToEventParams('dev', 'in', 'data', 'out', 'out', None, 3).in_flight_limit == 3
+    assert S3ToEventParams('dev', 'in', 'data', 'out', 'out', None, 3, in_flight_limit=10).in_flight_limit == 10
+
+
+@pytest.mark.parametrize('failing', [False, True])
+def test_run_automated(monkeypatch, tmp_path, failing: bool):
+    params = S3ToEventParams('dev', 'in-{}', 'data', 'out-{}', 'out', None, 2, in_flight_limit=3, completion_deadline=60)
+    s3_to_event = FakeS3ToEvent(params)
+    s3_to_event.config.data_path = str(tmp_path)
+    s3_to_event.files = [input_file(n) for n in 'abcdefg']
+    dispatched = []
+
+    class FakeLambdaRunner:
+        def __init__(self, config, spool_file_name: str, concurrency: int, invocation_type: str):
+            with open(spool_file_name) as f:
+                self.keys = [json.loads(json.loads(line)['body'])['Records'][0]['s3']['object']['key'] for line in f]
+
+        def run(self) -> list:
+            results = []
+            for key in self.keys:
+                dispatched.append(key)
+                name = BaseS3ToEvent.extract_file_name(key)
+                if failing and name == 'b':
+                    results.append(LambdaInvocationResult(key, 200, 'Unhandled', '{}', 0.1))
+                else:
+                    results.append(LambdaInvocationResult(key, 200, None, None, 0.1))
+                    s3_to_event.output_file_names.append(f'out/{name}_timestamp=2024-01-02T00:00:00.csv')
+                # file arriving while the run is in progress
+                if name == 'g' and len(s3_to_event.files) == 7:
+                    s3_to_event.files.append(input_file('h'))
+            return results
+
+    monkeypatch.setattr(base_s3_to_event, 'LambdaRunner', FakeLambdaRunner)
+    monkeypatch.setattr(CompletionTracker, 'INITIAL_DELAY', 0.01)
+
+    s3_to_event_run_automated(s3_to_event.config, params, s3_to_event)
+
+    assert sorted(BaseS3ToEvent.extract_file_name(k) for k in dispatched) == list('abcdefgh')
+    done = sorted(BaseS3ToEvent.extract_file_name(k) for k in s3_to_event.output_file_names)
+    assert done == [n for n in 'abcdefgh' if not (failing and n == 'b')]
@@ -0,0 +1,89 @@
+import io
+import os
+import json
+import threading
+import pytest
+from botocore.exceptions import ReadTimeoutError
+
+from base.base_s3_to_event import LambdaRunner, get_checkpoint_file_name, read_checkpoint, write_checkpoint
+
+
+class FakeLambda:
+    def __init__(self, failed_keys: set, timeout_keys: set = frozenset()):
+        self.failed_keys = failed_keys
+        self.timeout_keys = timeout_keys
+        self.invocation_types = []
+        self.lock = threading.Lock()
+
+    def invoke(self, FunctionName: str, InvocationType: str, Payload: bytes, Qualifier: str) -> dict:
+        with self.lock:
+            self.invocation_types.append(InvocationType)
+        key = LambdaRunner.get_record_key(json.loads(Payload)['Records'][0])
+        if key in self.timeout_keys:
+            raise ReadTimeoutError(endpoint_url='https://lambda.eu-central-1.amazonaws.com')
+        response = {'StatusCode': 202 if InvocationType == 'Event' else 200, 'Payload': io.BytesIO(b'{}')}
+        if key in self.failed_keys:
+            response['FunctionError'] = 'Unhandled'
+            response['Payload'] = io.BytesIO(b'{"errorMessage": "failed"}')
+        return response
+
+
+class FakeConfig:
+    def __init__(self, lam: FakeLambda):
+        self.env = 'dev'
+        self.lam = lam
+
+
+@pytest.fixture
+def event_file_name(tmp_path) -> str:
+    file_name = str(tmp_path / 'event.jsonl')
+    with open(file_name, 'w') as f:
+        for i in range(20):
+            record = {'body': json.dumps({'Records': [{'s3': {'bucket': {'name': 'bucket'}, 'object': {'key': f'data/{i}.csv', 'size': 1}}}]})}
+            f.write(json.dumps(record) + '\n')
+    return file_name
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_run(event_file_name: str, concurrency: int):
+    lam = FakeLambda({'data/3.csv'})
+    results = LambdaRunner(FakeConfig(lam), event_file_name, concurrency).run()
+
+    assert [r.key for r in results] == [f'data/{i}.csv' for i in range(20)]
+    assert [r.key for r in results if r.function_error is not None] == ['data/3.csv']
+    assert results[3].payload == '{"errorMessage": "failed"}'
+    assert all(r.status_code == 200 for r in results)
+    assert 'errors: 1' in LambdaRunner.summarize(results, 1.0)
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_run_transport_error(event_file_name: str, concurrency: int):
+    lam = FakeLambda(set(), {'data/5.csv'})
+    results = LambdaRunner(FakeConfig(lam), event_file_name, concurrency).run()
+
+    assert [r.key for r in results] == [f'data/{i}.csv' for i in range(20)]
+    assert results[5].status_code is None and 'timeout' in results[5].function_error.lower()
+    assert all(r.function_error is None for r in results if r.key != 'data/5.csv')
+    assert 'errors: 1' in LambdaRunner.summarize(results, 1.0)
+
+
+def test_run_event_invocation(event_file_name: str):
+    lam = FakeLambda(set())
+    results = LambdaRunner(FakeConfig(lam), event_file_name, 8, LambdaRunner.INVOCATION_TYPE_EVENT).run()
+
+    assert set(lam.invocation_types) == {'Event'}
+    assert all(r.status_code == 202 for r in results)
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_run_resume(event_file_name: str, concurrency: int):
+    lam = FakeLambda(set())
+    LambdaRunner(FakeConfig(lam), event_file_name, concurrency).run()
+    assert read_checkpoint(get_checkpoint_file_name(event_file_name)) == os.path.getsize(event_file_name)
+
+    with open(event_file_name, 'rb') as f:
+        offset = sum(len(f.readline()) for _ in range(15))
+    write_checkpoint(get_checkpoint_file_name(event_file_name), offset)
+
+    results = LambdaRunner(FakeConfig(lam), event_file_name, concurrency, resume=True).run()
+    assert [r.key for r in results] == [f'data/{i}.csv' for i in range(15, 20)]
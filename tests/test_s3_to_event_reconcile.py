@@ -0,0 +1,58 @@
+import os
+import time
+import pytest
+
+from base.base_s3_to_event import BaseS3ToEvent, reconcile_files
+
+
+def input_file(name: str) -> dict:
+    return {'Key': f'data/{name}_timestamp=2024-01-01T00:00:00.csv', 'Size': 1}
+
+
+def output_key(name: str) -> str:
+    return f'out/{name}_timestamp=2024-01-02T00:00:00.csv'
+
+
+def test_extract_file_name():
+    assert BaseS3ToEvent.extract_file_name('data/a_timestamp=2024-01-01T00:00:00.csv') == 'a'
+    assert BaseS3ToEvent.extract_file_name('a_timestamp=2024-01-01T00:00:00.csv') == 'a'
+    assert BaseS3ToEvent.extract_file_name('data/sub/a.csv') == 'a.csv'
+
+
+def test_reconcile_files():
+    files = [input_file('a'), input_file('b'), input_file('c')]
+    result = reconcile_files(files, [output_key('a')], [], [files[2]['Key']])
+
+    assert result.done == [files[0]]
+    assert result.pending == [files[1]]
+    assert result.excluded == [files[2]]
+    assert result.errored == []
+
+
+def test_reconcile_files_errors():
+    files = [input_file('a'), input_file('b'), input_file('c')]
+    result = reconcile_files(files, [output_key('a')], ['errors/a_timestamp=x.csv', 'errors/b_timestamp=x.csv'], [])
+
+    assert result.done == [files[0]]
+    assert result.errored == [files[1]]
+    assert result.pending == [files[1]]
+
+
+@pytest.mark.skipif(os.environ.get('RUN_BENCHMARKS') is None, reason='benchmark, set RUN_BENCHMARKS to run')
+@pytest.mark.parametrize('size', [1_000_000])
+def test_reconcile_files_linear(size: int):
+    def run(n: int) -> float:
+        files = [input_file(f'file_{i}') for i in range(n)]
+        outputs = [output_key(f'file_{i}') for i in range(0, n, 2)]
+        excluded = [files[i]['Key'] for i in range(1, n, 10)]
+
+        start_time = time.perf_counter()
+        result = reconcile_files(files, outputs, [], excluded)
+        elapsed = time.perf_counter() - start_time
+
+        assert len(result.done) + len(result.pending) + len(result.excluded) == n
+        return elapsed
+
+    small, large = run(size // 10), run(size)
+    # linear time gives a ratio close to 10, quadratic would be close to 100
+    assert large / small < 30
@@ -0,0 +1,72 @@
+import datetime
+import pytest
+
+import base.startup as startup
+from base.cfg import CachedCredentialProvider, get_cached_session
+from base.startup import check_credentials_expiration, read_credentials_file
+
+
+@pytest.fixture
+def credentials_file_name(tmp_path) -> str:
+    expired = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)).isoformat()
+    valid = (datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)).isoformat()
+    file_name = str(tmp_path / 'credentials')
+    with open(file_name, 'w') as f:
+        f.write('\n'.join([
+            '[dev]',
+            'aws_access_key_id = dev_key',
+            'aws_secret_access_key = dev_secret',
+            'aws_session_token = dev_token',
+            f'x_security_token_expires = {valid}',
+            '',
+            '[prod]',
+            'aws_access_key_id = prod_key',
+            'aws_secret_access_key = prod_secret',
+            'aws_session_token = prod_token',
+            f'x_security_token_expires = {expired}',
+            '',
+            '[sso]',
+            'aws_access_key_id = sso_key',
+            'aws_secret_access_key = sso_secret',
+        ]))
+    return file_name
+
+
+def test_check_credentials_expiration(credentials_file_name: str):
+    check_credentials_expiration('dev', credentials_file_name)
+    check_credentials_expiration('sso', credentials_file_name)
+    check_credentials_expiration('missing', credentials_file_name)
+
+    with pytest.raises(RuntimeError, match='run saml2aws'):
+        check_credentials_expiration('prod', credentials_file_name)
+
+
+def test_read_credentials_file(credentials_file_name: str, monkeypatch):
+    parsed = []
+    read = startup.configparser.ConfigParser.read
+    monkeypatch.setattr(startup.configparser.ConfigParser, 'read', lambda self, *args: parsed.append(args) or read(self, *args))
+
+    assert read_credentials_file(credentials_file_name) is read_credentials_file(credentials_file_name)
+    check_credentials_expiration('dev', credentials_file_name)
+    assert len(parsed) <= 1
+
+    with open(credentials_file_name, 'a') as f:
+        f.write('\n[new]\n')
+    startup.os.utime(credentials_file_name, ns=(0, 0))
+    assert read_credentials_file(credentials_file_name).has_section('new')
+
+
+def test_cached_session(credentials_file_name: str, tmp_path, monkeypatch):
+    monkeypatch.setenv('AWS_SHARED_CREDENTIALS_FILE', credentials_file_name)
+    monkeypatch.setenv('AWS_CONFIG_FILE', str(tmp_path / 'config'))
+    for name in ['AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN', 'AWS_PROFILE']:
+        monkeypatch.delenv(name, raising=False)
+
+    credentials = get_cached_session('dev', 'eu-west-1').get_credentials()
+    assert (credentials.access_key, credentials.token, credentials.method) == ('dev_key', 'dev_token', CachedCredentialProvider.METHOD)
+
+    # profiles without expiration are resolved by the default chain
+    assert get_cached_session('sso', 'eu-west-1').get_credentials().method == 'shared-credentials-file'
+
+    with pytest.raises(RuntimeError, match='run saml2aws'):
+        get_cached_session('prod', 'eu-west-1').get_credentials()
@@ -4,8 +4,8 @@ import os
 from sn_table_cco_ingestion_job import SNTransformer
 
 
-def test_transform_full():
-    input_data = [
+def get_input_data() -> list:
+    return [
         {
             "duration": "12 Minutes",
             "number": "OUT0160898",
@@ -31,6 +31,10 @@ def test_transform_full():
             "begin": "07.11.2024 11:49:38"
         }
     ]
+
+
+def test_transform_full():
+    input_data = get_input_data()
     output_data =         [
         r'number,cmdb_ci,type,begin,end,task_number,task_number.cmdb_ci,task_number.short_description,task_number.ref_incident.u_workstation,duration,u_affected_services',
         r'OUT0160898,GoOrange,Outage,07.11.2024 10:48:33,07.11.2024 11:01:19,INC1046091,,GoOrange - Working not possible,not relevant,766,Orange rental software| Operations App (OAPP)',
@@ -43,3 +47,10 @@ def test_transform_full():
     assert len(csv_lines) == len(output_data)
     for line_number in range(len(csv_lines)):
             assert csv_lines[line_number] == output_data[line_number]
+
+
+def test_transform_to_list():
+    lst = SNTransformer.transform_to_list(get_input_data())
+
+    assert [(r['begin'], r['end']) for r in lst] == [('07.11.2024 10:48:33', '07.11.2024 11:01:19'), ('07.11.2024 10:49:38', '07.11.2024 10:53:13')]
+    assert SNTransformer.transform_to_pd(lst).equals(SNTransformer.transform(get_input_data()))
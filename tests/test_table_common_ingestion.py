@@ -0,0 +1,310 @@
+import pytest
+import io
+import os
+import zoneinfo
+import datetime
+import time
+import threading
+import pandas as pd
+from urllib.parse import parse_qsl, urlsplit
+
+import sn_table_common_ingestion as common
+from sn_table_common_ingestion import SNReader, SNPartitionedReader, SNPipeline, SNWriter
+
+common.logger = common.get_logger(__name__)
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> dict:
+        return self.data
+
+
+class FakeSession:
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.queries = []
+
+    def get(self, url: str) -> FakeResponse:
+        params = dict(parse_qsl(urlsplit(url).query))
+        self.queries.append(params['sysparm_query'])
+        after = params['sysparm_query'].split('^ORDERBY')[0].rsplit('sys_id>', 1)
+        rows = [r for r in self.rows if len(after) == 1 or r['sys_id'] > after[1]]
+        return FakeResponse({'result': rows[:int(params['sysparm_limit'])]})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_get_keyset_query():
+    filter_query = SNReader.get_filter_query("ORDERBYsys_created_on^type=daily^ORtype=weekly")
+    assert filter_query == "type=daily^ORtype=weekly"
+
+    assert SNReader.get_keyset_query(filter_query, SNReader.KEYSET_FIELDS, None) == \
+        "type=daily^ORtype=weekly^ORDERBYsys_created_on^ORDERBYsys_id"
+    assert SNReader.get_keyset_query(filter_query, SNReader.KEYSET_FIELDS, ('2024-11-07 10:48:33', 'a1')) == \
+        "type=daily^ORtype=weekly^sys_created_on>2024-11-07 10:48:33" \
+        "^NQtype=daily^ORtype=weekly^sys_created_on=2024-11-07 10:48:33^sys_id>a1" \
+        "^ORDERBYsys_created_on^ORDERBYsys_id"
+    assert SNReader.get_keyset_query("", ('sys_id',), ('a1',)) == "sys_id>a1^ORDERBYsys_id"
+
+
+def test_read_keyset(monkeypatch):
+    rows = [{'sys_id': f'{i:032x}', 'number': f'OUT{i}'} for i in range(25)]
+    session = FakeSession(rows)
+    reader = SNReader('https://sn/api/now/table/cmdb_ci_outage', 'user', 'password',
+                      {'sysparm_query': 'ORDERBYsys_created_on^type=planned', 'sysparm_fields': 'number'}, 10,
+                      keyset_fields=SNReader.KEYSET_DISPLAY_VALUE_FIELDS)
+    monkeypatch.setattr(reader, 'get_session', lambda: session)
+
+    pages = list(reader.read())
+
+    assert [len(p) for p in pages] == [10, 10, 5]
+    assert [r['number'] for p in pages for r in p] == [r['number'] for r in rows]
+    assert session.queries[0] == 'type=planned^ORDERBYsys_id'
+    assert session.queries[1] == f"type=planned^sys_id>{rows[9]['sys_id']}^ORDERBYsys_id"
+
+
+def test_get_filter_query_rejects_nq():
+    with pytest.raises(ValueError):
+        SNReader.get_filter_query("type=daily^NQtype=weekly")
+
+
+class FakeTableSession:
+    """
+    Serves stats and offset pages of rows filtered by sys_created_on range conditions
+    """
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.queries = []
+
+    def filter_rows(self, query: str) -> list:
+        rows = self.rows
+        for condition in query.split('^'):
+            if condition.startswith('sys_created_on>='):
+                rows = [r for r in rows if r['sys_created_on'] >= condition.split('>=')[1]]
+            elif condition.startswith('sys_created_on<'):
+                rows = [r for r in rows if r['sys_created_on'] < condition.split('<')[1]]
+        return rows
+
+    def get(self, url: str) -> FakeResponse:
+        params = dict(parse_qsl(urlsplit(url).query))
+        rows = self.filter_rows(params['sysparm_query'])
+        if '/api/now/stats/' in url:
+            dates = [r['sys_created_on'] for r in rows]
+            return FakeResponse({'result': {'stats': {'count': str(len(rows)), 'min': {'sys_created_on': min(dates)}, 'max': {'sys_created_on': max(dates)}}}})
+        self.queries.append(params['sysparm_query'])
+        offset, limit = int(params['sysparm_offset']), int(params['sysparm_limit'])
+        return FakeResponse({'result': rows[offset:offset + limit]})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_get_range_queries():
+    queries = SNPartitionedReader.get_range_queries(datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 4), 3)
+
+    assert queries == [
+        "sys_created_on<2024-01-02 00:00:00",
+        "sys_created_on>=2024-01-02 00:00:00^sys_created_on<2024-01-03 00:00:00",
+        "sys_created_on>=2024-01-03 00:00:00",
+    ]
+
+
+def test_read_partitioned(monkeypatch):
+    rows = [{'number': f'OUT{i}', 'sys_created_on': (datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S')}
+            for i in range(95)]
+    session = FakeTableSession(rows)
+    monkeypatch.setattr(SNReader, 'get_session', lambda self: session)
+    reader = SNPartitionedReader('https://sn/api/now/table/cmdb_ci_outage', 'user', 'password',
+                                 {'sysparm_query': 'ORDERBYsys_created_on^type=planned'}, 10, partitions=4)
+
+    pages = list(reader.read())
+
+    assert sorted(r['number'] for p in pages for r in p) == sorted(r['number'] for r in rows)
+    assert all(len(p) <= 10 for p in pages)
+    assert len({q for q in session.queries}) == 4
+
+
+class FakeWriter:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.frames = []
+
+    def write_to_bucket(self, df: pd.DataFrame):
+        if self.fail:
+            raise IOError("upload failed")
+        time.sleep(self.delay)
+        self.frames.append(df)
+
+
+def test_pipeline():
+    def pages():
+        for i in range(20):
+            yield [{'number': f'OUT{i}_{j}'} for j in range(i + 1)]
+
+    writer = FakeWriter(delay=0.01)
+    pipeline = SNPipeline(pd.DataFrame, writer, transform_workers=2, queue_size=2)
+
+    result = pipeline.run(pages())
+
+    assert (result.pages, result.rows) == (20, sum(range(1, 21)))
+    assert sorted(len(df) for df in writer.frames) == list(range(1, 21))
+
+
+def test_pipeline_back_pressure():
+    read_count = []
+
+    def pages():
+        for i in range(50):
+            read_count.append(i)
+            yield [{'number': i}]
+
+    class BlockingWriter(FakeWriter):
+        def write_to_bucket(self, df: pd.DataFrame):
+            # reader may run ahead by the queued pages and the pages held by stages only
+            assert len(read_count) - len(self.frames) <= 2 + 2 + 2 + 2
+            super().write_to_bucket(df)
+
+    writer = BlockingWriter(delay=0.005)
+    assert SNPipeline(pd.DataFrame, writer, transform_workers=2, queue_size=2).run(pages()).pages == 50
+
+
+def test_pipeline_errors():
+    read_errors = []
+
+    def failing_pages():
+        yield [{'number': 1}]
+        raise ValueError("read failed")
+
+    with pytest.raises(ValueError):
+        SNPipeline(pd.DataFrame, FakeWriter(), read_error_handler=read_errors.append).run(failing_pages())
+    assert len(read_errors) == 1
+
+    with pytest.raises(IOError):
+        SNPipeline(pd.DataFrame, FakeWriter(fail=True)).run(iter([[{'number': 1}]] * 10))
+
+
+def test_pipeline_stops_partition_readers(monkeypatch):
+    rows = [{'number': f'OUT{i}', 'sys_created_on': (datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S')}
+            for i in range(400)]
+    monkeypatch.setattr(SNReader, 'get_session', lambda self: FakeTableSession(rows))
+    monkeypatch.setattr(SNPipeline, 'POLL_INTERVAL', 0.05)
+    reader = SNPartitionedReader('https://sn/api/now/table/cmdb_ci_outage', 'user', 'password',
+                                 {'sysparm_query': 'ORDERBYsys_created_on'}, 5, partitions=4)
+    threads = set(threading.enumerate())
+
+    with pytest.raises(IOError):
+        SNPipeline(pd.DataFrame, FakeWriter(fail=True)).run(reader.read())
+
+    assert [t for t in threading.enumerate() if t not in threads and t.is_alive()] == []
+
+
+@pytest.fixture
+def uploads(monkeypatch) -> dict:
+    uploaded = {}
+    monkeypatch.setattr(common.wr.s3, 'upload', lambda local_file, path: uploaded.setdefault(path, local_file.read()))
+    return uploaded
+
+
+def test_writer_coalesces_pages(uploads: dict):
+    target_file_size = 64 * 1024
+    with SNWriter('s3://bucket/output/', target_file_size=target_file_size) as writer:
+        for i in range(30):
+            writer.write_to_bucket(pd.DataFrame({'number': [f'OUT{i}_{j}' for j in range(2000)], 'duration': range(2000)}))
+    report = writer.report
+
+    assert len(uploads) == report.files
+    assert 1 < report.files < 30
+    # sized on the Parquet output once the compression ratio is known, the last file holds the rest
+    sizes = [len(d) for d in uploads.values()]
+    assert all(target_file_size <= size < 2 * target_file_size for size in sizes[1:-1])
+    assert report.rows == 30 * 2000
+    assert report.bytes == sum(len(d) for d in uploads.values())
+    df = pd.concat([pd.read_parquet(io.BytesIO(d)) for d in uploads.values()])
+    assert len(df) == 30 * 2000
+    assert df['duration'].dtype == 'int64'
+
+
+def test_writer_flushes_on_exit(uploads: dict):
+    page = pd.DataFrame({'number': ['OUT1', 'OUT2']})
+    with SNWriter('s3://bucket/output') as writer:
+        writer.write_to_bucket(page)
+        assert uploads == {}
+    assert writer.report.files == 1
+
+    with pytest.raises(ValueError):
+        with SNWriter('s3://bucket/failed') as writer:
+            writer.write_to_bucket(page)
+            raise ValueError("read failed")
+    assert writer.report.files == 0
+    assert len(uploads) == 1
+
+
+def test_writer_hive_partitions(uploads: dict):
+    writer = SNWriter('s3://bucket/output', partition_column='begin', partition_date_format='%d.%m.%Y %H:%M:%S')
+    writer.write_to_bucket(pd.DataFrame({'number': ['OUT1', 'OUT2'], 'begin': ['07.11.2024 10:48:33', '08.11.2024 01:00:00']}))
+    writer.write_to_bucket(pd.DataFrame({'number': ['OUT3', 'OUT4'], 'begin': ['07.11.2024 23:00:00', '']}))
+    report = writer.flush()
+
+    assert report.files == 3
+    partitions = {p.rsplit('/', 1)[0]: pd.read_parquet(io.BytesIO(d))['number'].tolist() for p, d in uploads.items()}
+    assert partitions == {
+        's3://bucket/output/date=2024-11-07': ['OUT1', 'OUT3'],
+        's3://bucket/output/date=2024-11-08': ['OUT2'],
+        's3://bucket/output/date=__HIVE_DEFAULT_PARTITION__': ['OUT4'],
+    }
+
+
+def convert_date_str(date_str: str) -> str:
+    return datetime.datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')\
+        .replace(tzinfo=zoneinfo.ZoneInfo('Europe/Berlin'))\
+        .astimezone(zoneinfo.ZoneInfo('UTC'))\
+        .strftime('%d.%m.%Y %H:%M:%S')
+
+
+def test_convert_date_column_dst_edges():
+    values = pd.Series([
+        '2024-03-31 01:59:59', '2024-03-31 02:30:00', '2024-03-31 03:00:00',
+        '2024-10-27 01:59:59', '2024-10-27 02:30:00', '2024-10-27 03:00:00',
+        '2024-08-01 07:00:00', '2024-12-06 07:00:00',
+    ])
+
+    converted = common.convert_date_column(values, '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S')
+
+    assert converted.tolist() == [convert_date_str(v) for v in values]
+    assert common.convert_date_column(pd.Series(['', '2024-08-01 07:00:00']), '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S').tolist() == \
+        ['', '01.08.2024 05:00:00']
+
+
+def test_date_column_to_seconds():
+    assert common.date_column_to_seconds(pd.Series(['1970-01-01 00:00:00', '1970-01-01 01:05:34']), '%Y-%m-%d %H:%M:%S').tolist() == [0, 3934]
+
+
+@pytest.mark.skipif(os.environ.get('RUN_BENCHMARKS') is None, reason='benchmark, set RUN_BENCHMARKS to run')
+def test_convert_date_column_benchmark():
+    values = pd.Series([(datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=7 * i)).strftime('%Y-%m-%d %H:%M:%S')
+                        for i in range(10000)])
+
+    start_time = time.perf_counter()
+    per_cell = [convert_date_str(v) for v in values]
+    per_cell_elapsed = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    vectorised = common.convert_date_column(values, '%Y-%m-%d %H:%M:%S', '%d.%m.%Y %H:%M:%S')
+    vectorised_elapsed = time.perf_counter() - start_time
+
+    common.logger.info(f"10000 row page date column: per cell {per_cell_elapsed:.3f}s, vectorised {vectorised_elapsed:.3f}s")
+    assert vectorised.tolist() == per_cell
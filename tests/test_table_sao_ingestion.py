@@ -24,8 +24,9 @@ def test_transform_convert_date(input_date: str, expected_date: str):
 def test_transform_date_to_duration(input_date: str, duration: str):
     assert SNTransformer.date_to_duration(input_date) == duration
 
-def test_transform_full():
-    input_data = [{
+
+def get_input_data() -> list:
+    return [{
             "scheduled_downtime": "1970-01-01 00:07:06",
             "scheduled_availability": "99.34259",
             "absolute_downtime": "1970-01-01 00:07:06",
@@ -59,12 +60,22 @@ def test_transform_full():
                 "value": "f324e70793ea7d1036e475518bba1051"
             }
         }]
-    output_data =         [
+
+
+def get_output_data() -> list:
+    return [
             'start,end,type,service_offering,service_commitment,allowed_downtime,scheduled_downtime,scheduled_availability',
             '30.08.2024 20:00:00,31.08.2024 20:00:00,Daily,Counter Service - CC 42874,Counter Service Availability - CC 42874,426,426,99.34259',
             '30.07.2024 20:00:00,31.07.2024 20:00:00,Daily,Counter Service - CC 42874,Counter Service Availability - CC 42874,463,463,99.28549'
         ]
-    df = SNTransformer.transform(input_data)
+
+
+def test_transform_full():
+    df = SNTransformer.transform(get_input_data())
     csv = df.to_csv(sep=',', index=False).rstrip(os.linesep)
 
-    assert csv == os.linesep.join(output_data)
\ No newline at end of file
+    assert csv == os.linesep.join(get_output_data())
+
+
+def test_transform_to_csv_rows():
+    assert SNTransformer.transform_to_csv_rows(SNTransformer.transform_to_list(get_input_data())) == get_output_data()
\ No newline at end of file